@@ -0,0 +1,114 @@
+"""
+Benchmark de los backends de decodificación (`src/decoder.py`).
+
+Genera archivos con el mismo formato que `scripts/generator.py` y mide, por
+backend y por tarea, el tiempo de decodificar todos los archivos y recorrer sus
+eventos con la lógica de consumo de esa tarea. La columna `speedup` es relativa
+al backend `json` de la biblioteca estándar.
+
+Uso:
+  python benchmarks/bench_decoder.py --num-files 2000 --events-per-file 100
+"""
+
+import argparse
+import json
+import pathlib
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import decoder  # noqa: E402
+import task_1  # noqa: E402
+import task_2  # noqa: E402
+import task_4  # noqa: E402
+
+STATUSES = [200, 201, 202, 203, 400, 401, 402, 403, 404, 500]
+SERVICES = ["training", "evaluation", "inference", "monitoring"]
+
+
+def _write_files(directory: pathlib.Path, num_files: int, events_per_file: int) -> list[pathlib.Path]:
+    rng = random.Random(42)
+    paths = []
+    for i in range(num_files):
+        ts = 1760564618.215106 + i
+        events = [
+            {
+                "service": rng.choice(SERVICES),
+                "timestamp": ts,
+                "message": f"HTTP Status Code: {rng.choice(STATUSES)}",
+            }
+            for _ in range(events_per_file)
+        ]
+        path = directory / f"{i:08d}.json"
+        path.write_text(json.dumps(events))
+        paths.append(path)
+    return paths
+
+
+def _consumers() -> dict[str, Callable[[list[Any]], None]]:
+    bloom = task_4.BloomFilter(1_000_000, 7)
+    bloom.add("HTTP Status Code: 500")
+
+    def consume_task_1(events: list[Any]) -> None:
+        metrics: dict[str, dict[str, int]] = {}
+        for event in events:
+            task_1.process_event(event, metrics)
+
+    def consume_task_2(events: list[Any]) -> None:
+        for event in events:
+            task_2.is_failure(event)
+
+    def consume_task_3(events: list[Any]) -> None:
+        for event in events:
+            event["message"].split(": ")[-1]
+
+    def consume_task_4(events: list[Any]) -> None:
+        for event in events:
+            _ = event["message"] in bloom
+
+    return {
+        "decode only": lambda events: None,
+        "task_1": consume_task_1,
+        "task_2": consume_task_2,
+        "task_3": consume_task_3,
+        "task_4": consume_task_4,
+    }
+
+
+def _run(paths: list[pathlib.Path], backend: str, consume: Callable[[list[Any]], None]) -> float:
+    events_decoder = decoder.get_decoder(backend)
+    start = time.perf_counter()
+    for path in paths:
+        consume(events_decoder.load(path))
+    return time.perf_counter() - start
+
+
+def main(num_files: int, events_per_file: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _write_files(pathlib.Path(tmp), num_files, events_per_file)
+        for path in paths:  # calentar la caché de páginas
+            path.read_bytes()
+        backends = decoder.available_backends()
+        print(f"{num_files} archivos x {events_per_file} eventos, mejor de {repeat}")
+        print(f"{'path':<12} {'backend':<8} {'segundos':>9} {'speedup':>8}")
+
+        for label, consume in _consumers().items():
+            baseline = None
+            for backend in reversed(backends):  # json primero
+                elapsed = min(_run(paths, backend, consume) for _ in range(repeat))
+                baseline = baseline or elapsed
+                print(f"{label:<12} {backend:<8} {elapsed:>9.3f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--num-files", type=int, default=2000)
+    parser.add_argument("--events-per-file", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    main(args.num_files, args.events_per_file, args.repeat)
@@ -0,0 +1,118 @@
+"""
+Benchmark de contención entre el hilo de ingesta y los lectores de task_3.
+
+Un hilo escritor procesa lotes de códigos con `task_3.SkipReservoir` mientras
+`--readers` hilos leen el resultado cada `--read-interval` segundos (como una
+UI o una API muy activa). Se compara:
+
+- `lock`: el esquema anterior, escritor y lectores comparten un
+  `threading.Condition`; el escritor lo retiene durante todo el lote.
+- `published`: el escritor publica una instantánea inmutable por lote
+  (`published.Published`) y los lectores solo leen la referencia.
+
+Se reporta el tiempo de ingesta por lote y la latencia de lectura (p50/p99).
+
+Uso:
+  python benchmarks/bench_published.py --batches 500 --readers 4
+"""
+
+import argparse
+import pathlib
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import task_3  # noqa: E402
+from published import Published  # noqa: E402
+
+
+def _batches(count: int, batch_size: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    codes = rng.choice([200, 201, 400, 404, 500, 503], size=count * batch_size)
+    return np.split(codes.astype(np.int16), count)
+
+
+def _readers(
+    count: int, read, stop: threading.Event, interval: float
+) -> tuple[list[threading.Thread], list[list[float]]]:
+    latencies: list[list[float]] = [[] for _ in range(count)]
+
+    def loop(out: list[float]) -> None:
+        while not stop.wait(interval):
+            start = time.perf_counter()
+            read()
+            out.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=loop, args=(out,), daemon=True) for out in latencies]
+    return threads, latencies
+
+
+def run(
+    mode: str, batches: list[np.ndarray], size: int, readers: int, interval: float
+) -> tuple[float, np.ndarray]:
+    reservoir = task_3.SkipReservoir(size)
+    stop = threading.Event()
+
+    if mode == "lock":
+        condition = threading.Condition()
+
+        def ingest(batch: np.ndarray) -> None:
+            with condition:
+                reservoir.update(batch)
+                condition.notify_all()
+
+        def read() -> object:
+            with condition:
+                return reservoir.mode(), reservoir.seen
+    else:
+        published: Published[tuple] = Published()
+
+        def ingest(batch: np.ndarray) -> None:
+            reservoir.update(batch)
+            published.publish((reservoir.mode(), reservoir.seen))
+
+        def read() -> object:
+            return published.get()
+
+    threads, latencies = _readers(readers, read, stop, interval)
+    for thread in threads:
+        thread.start()
+    start = time.perf_counter()
+    for batch in batches:
+        ingest(batch)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return elapsed, np.concatenate([np.asarray(out) for out in latencies])
+
+
+def main(batches: int, batch_size: int, size: int, readers: int, interval: float) -> None:
+    data = _batches(batches, batch_size)
+    print(
+        f"{batches} lotes de {batch_size}, reservorio de {size:,}, "
+        f"{readers} lectores cada {interval * 1e3:g} ms"
+    )
+    for mode in ("lock", "published"):
+        elapsed, latencies = run(mode, data, size, readers, interval)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+        print(
+            f"{mode:>9}: ingesta {elapsed / batches * 1e6:.1f} us/lote, "
+            f"lectura p50 {p50:.1f} us, p99 {p99:.1f} us, {len(latencies):,} lecturas"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batches", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--reservoir-size", type=int, default=100_000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--read-interval", type=float, default=0.001)
+    args = parser.parse_args()
+
+    main(args.batches, args.batch_size, args.reservoir_size, args.readers, args.read_interval)
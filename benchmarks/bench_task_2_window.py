@@ -0,0 +1,154 @@
+"""
+Benchmark de la ventana deslizante de fallas de task_2.
+
+Simula una tormenta sostenida de fallas (por defecto 1M por minuto, en lotes
+de 1000 eventos) y compara:
+
+- `list`: la implementación anterior, que reconstruía la lista de
+  `(timestamp, evento)` de cada servicio con una comprensión en cada lote.
+- `deque`: `task_2.FailureWindow`, con un deque de timestamps por servicio,
+  con lotes en orden y con uno de cada dos lotes `--late-seconds` tarde
+  (el caso normal con el jitter del generador).
+- `buckets`: `task_2.MultiHorizonFailureWindow` con una sola ventana y con
+  las cuatro de `--horizons`, para medir el costo de los horizontes extra.
+
+Para la versión `list` solo se ejecutan `--legacy-batches` lotes (su costo por
+lote crece con el tamaño de la ventana) y se reporta el costo por lote.
+
+Uso:
+  python benchmarks/bench_task_2_window.py --failures-per-minute 1000000 --minutes 3
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import task_2  # noqa: E402
+
+WINDOW = task_2.SLIDING_WINDOW_SECONDS
+
+
+def _batches(failures_per_minute: int, minutes: float, batch_size: int, late_seconds: float = 0.0):
+    """Lotes de timestamps crecientes; con `late_seconds`, uno de cada dos llega así de tarde."""
+    rate = failures_per_minute / 60.0
+    total = int(failures_per_minute * minutes)
+    timestamps = np.arange(total, dtype=np.float64) / rate
+    for index, start in enumerate(range(0, total, batch_size)):
+        batch = timestamps[start : start + batch_size]
+        yield batch - late_seconds if index % 2 else batch
+
+
+def run_list(batches, limit: int) -> tuple[float, int]:
+    """Versión anterior: lista de (ts, evento) reconstruida en cada lote."""
+    failure_window: dict[str, list] = {}
+    processed = 0
+    start = time.perf_counter()
+    for batch in batches:
+        entries = failure_window.setdefault("monitoring", [])
+        for ts in batch.tolist():
+            entries.append((ts, {"service": "monitoring", "timestamp": ts, "message": "HTTP Status Code: 500"}))
+        window_start = batch[-1] - WINDOW
+        for service in list(failure_window.keys()):
+            failure_window[service] = [(ts, e) for ts, e in failure_window[service] if ts >= window_start]
+        processed += 1
+        if processed >= limit:
+            break
+    return time.perf_counter() - start, processed
+
+
+def run_deque(batches) -> tuple[float, int, int]:
+    window = task_2.FailureWindow(WINDOW)
+    processed = 0
+    start = time.perf_counter()
+    for batch in batches:
+        window.add("monitoring", batch)
+        window.advance(batch.max())
+        processed += 1
+    return time.perf_counter() - start, processed, window.count("monitoring")
+
+
+def run_buckets(batches, horizons: list[float]) -> tuple[float, int, list[int]]:
+    window = task_2.MultiHorizonFailureWindow(horizons)
+    processed = 0
+    start = time.perf_counter()
+    for batch in batches:
+        window.add("monitoring", batch)
+        window.advance(batch[-1])
+        # Como en compute: se consulta cada horizonte en cada lote
+        counts = [window.count("monitoring", h) for h in horizons]
+        processed += 1
+    return time.perf_counter() - start, processed, counts
+
+
+def main(
+    failures_per_minute: int,
+    minutes: float,
+    batch_size: int,
+    legacy_batches: int,
+    horizons: list[float],
+    late_seconds: float,
+) -> None:
+    total = int(failures_per_minute * minutes)
+    print(f"{total:,} fallas ({failures_per_minute:,}/min), lotes de {batch_size}")
+
+    for label, late in (("deque", 0.0), (f"deque ({late_seconds:g} s tarde)", late_seconds)):
+        tracemalloc.start()
+        elapsed, processed, in_window = run_deque(_batches(failures_per_minute, minutes, batch_size, late))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{label}: {elapsed:.3f} s, {elapsed / processed * 1e6:.1f} us/lote, "
+            f"{total / elapsed:,.0f} fallas/s, {in_window:,} en ventana, pico {peak / 2**20:.1f} MiB"
+        )
+
+    for label, selected in (("buckets x1", horizons[:1]), (f"buckets x{len(horizons)}", horizons)):
+        tracemalloc.start()
+        elapsed, processed, counts = run_buckets(
+            _batches(failures_per_minute, minutes, batch_size), selected
+        )
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{label}: {elapsed:.3f} s, {elapsed / processed * 1e6:.1f} us/lote, "
+            f"en ventana {counts}, pico {peak / 2**20:.1f} MiB"
+        )
+
+    # La versión anterior se mide sobre los lotes del final, con la ventana llena
+    warm = _batches(failures_per_minute, minutes, batch_size)
+    skip = max(0, total // batch_size - legacy_batches)
+    for _ in range(skip):
+        next(warm)
+    tracemalloc.start()
+    elapsed, processed = run_list(warm, legacy_batches)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"list:  {elapsed / processed * 1e6:.1f} us/lote sobre {processed} lotes "
+        f"(ventana parcial: arranca vacía), pico {peak / 2**20:.1f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--failures-per-minute", type=int, default=1_000_000)
+    parser.add_argument("--minutes", type=float, default=3)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--legacy-batches", type=int, default=200)
+    parser.add_argument("--horizons", type=float, nargs="+", default=[60, 300, 900, 3600])
+    parser.add_argument("--late-seconds", type=float, default=30)
+    args = parser.parse_args()
+
+    main(
+        args.failures_per_minute,
+        args.minutes,
+        args.batch_size,
+        args.legacy_batches,
+        args.horizons,
+        args.late_seconds,
+    )
@@ -0,0 +1,104 @@
+"""
+Benchmark del muestreo de reservorio de task_3.
+
+Compara, sobre los mismos lotes de códigos HTTP:
+
+- `per-event`: la implementación original, un `np.random.randint` por evento
+  dentro de un bucle de Python (Algoritmo R).
+- `skip`: `task_3.SkipReservoir` (Algoritmo L), que solo sortea para los
+  eventos que entran al reservorio y salta directo a su índice en el lote.
+
+También mide la consulta de la moda en un reservorio de `--mode-size`
+elementos: `Counter(sample)` (lo que hacía el consumidor) contra
+`SkipReservoir.mode()`, mantenida de forma incremental.
+
+Uso:
+  python benchmarks/bench_task_3_reservoir.py --events 1000000 --batch-size 10000
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import task_3  # noqa: E402
+
+
+def _batches(events: int, batch_size: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    codes = rng.choice([200, 201, 400, 404, 500, 503], size=events).astype(np.int16)
+    return [codes[start : start + batch_size] for start in range(0, events, batch_size)]
+
+
+def run_per_event(batches: list[np.ndarray], size: int) -> float:
+    sample: list[int] = []
+    count = 0
+    start = time.perf_counter()
+    for batch in batches:
+        for code in batch.tolist():
+            count += 1
+            if len(sample) < size:
+                sample.append(code)
+            else:
+                slot = np.random.randint(0, count)
+                if slot < size:
+                    sample[slot] = code
+    return time.perf_counter() - start
+
+
+def run_skip(batches: list[np.ndarray], size: int) -> float:
+    reservoir = task_3.SkipReservoir(size)
+    start = time.perf_counter()
+    for batch in batches:
+        reservoir.update(batch)
+    return time.perf_counter() - start
+
+
+def run_mode(batches: list[np.ndarray], size: int, queries: int) -> tuple[float, float]:
+    reservoir = task_3.SkipReservoir(size)
+    for batch in batches:
+        reservoir.update(batch)
+
+    start = time.perf_counter()
+    for _ in range(queries):
+        Counter(reservoir.sample).most_common(1)
+    counter = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    for _ in range(queries):
+        reservoir.mode()
+    incremental = (time.perf_counter() - start) / queries
+    return counter, incremental
+
+
+def main(events: int, batch_size: int, size: int, mode_size: int) -> None:
+    batches = _batches(events, batch_size)
+    print(f"{events:,} eventos en lotes de {batch_size}, reservorio de {size}")
+    for name, run in (("per-event", run_per_event), ("skip", run_skip)):
+        elapsed = run(batches, size)
+        print(
+            f"{name:>9}: {elapsed:.3f} s, {elapsed / len(batches) * 1e6:.1f} us/lote, "
+            f"{events / elapsed:,.0f} eventos/s"
+        )
+
+    counter, incremental = run_mode(batches, mode_size, queries=20)
+    print(
+        f"moda con reservorio de {mode_size:,}: Counter {counter * 1e3:.2f} ms, "
+        f"incremental {incremental * 1e6:.2f} us"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--reservoir-size", type=int, default=10)
+    parser.add_argument("--mode-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    main(args.events, args.batch_size, args.reservoir_size, args.mode_size)
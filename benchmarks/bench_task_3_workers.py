@@ -0,0 +1,65 @@
+"""
+Benchmark de task_3 con reservorios combinables en varios procesos.
+
+Genera `--files` archivos de `--events` eventos cada uno en un directorio
+temporal y mide `task_3.sample_directory` con distinta cantidad de procesos.
+Cada proceso decodifica su parte de los archivos y construye su reservorio; el
+coordinador los combina con `SkipReservoir.merge`.
+
+Uso:
+  python benchmarks/bench_task_3_workers.py --files 200 --events 5000 --workers 1 2 4
+"""
+
+import argparse
+import json
+import pathlib
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import task_3  # noqa: E402
+
+
+def _write_files(directory: pathlib.Path, files: int, events: int) -> None:
+    rng = np.random.default_rng(0)
+    for i in range(files):
+        codes = rng.choice([200, 201, 400, 404, 500, 503], size=events)
+        with open(directory / f"{i:06d}.json", "w") as f:
+            json.dump(
+                [
+                    {"service": "monitoring", "timestamp": 1.7e9 + i + j * 1e-3, "message": f"HTTP Status Code: {code}"}
+                    for j, code in enumerate(codes.tolist())
+                ],
+                f,
+            )
+
+
+def main(files: int, events: int, workers: list[int], reservoir_size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = pathlib.Path(tmp)
+        _write_files(directory, files, events)
+        total = files * events
+        print(f"{files} archivos x {events} eventos, reservorio de {reservoir_size}")
+        for count in workers:
+            start = time.perf_counter()
+            reservoir = task_3.sample_directory(directory, reservoir_size, workers=count)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{count:>2} procesos: {elapsed:.2f} s, {total / elapsed:,.0f} eventos/s, "
+                f"moda {reservoir.mode()}, {reservoir.seen:,} vistos"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--reservoir-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    main(args.files, args.events, args.workers, args.reservoir_size)
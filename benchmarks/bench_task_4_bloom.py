@@ -0,0 +1,75 @@
+"""
+Benchmark de los filtros de Bloom de task_4.
+
+Compara `task_4.BloomFilter` (un SHA-256 por índice, bits en un bytearray)
+con `task_4.FastBloomFilter` (un hash de 128 bits y doble hashing, bits en
+NumPy, consultas por lote) al construir el filtro con `--patterns` cadenas y
+al consultar `--queries` mensajes distintos. También reporta la tasa de
+falsos positivos observada y el tiempo de arranque de `load_bloom_filter`
+construyendo el filtro desde el archivo frente a abrirlo desde la caché mmap.
+
+Uso:
+  python benchmarks/bench_task_4_bloom.py --patterns 100000 --queries 100000
+"""
+
+import argparse
+import pathlib
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import task_4  # noqa: E402
+
+
+def main(patterns: int, queries: int, m_bits: int, k_hashes: int) -> None:
+    known = [f"HTTP Status Code: {i}" for i in range(patterns)]
+    probes = [f"Unknown message {i}" for i in range(queries)]
+    print(f"{patterns:,} patrones, {queries:,} consultas, m={m_bits:,}, k={k_hashes}")
+
+    for name, bloom in (
+        ("sha256", task_4.BloomFilter(m_bits, k_hashes)),
+        ("fast", task_4.FastBloomFilter(m_bits, k_hashes)),
+    ):
+        start = time.perf_counter()
+        if isinstance(bloom, task_4.FastBloomFilter):
+            bloom.add_many(known)
+        else:
+            for value in known:
+                bloom.add(value)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if isinstance(bloom, task_4.FastBloomFilter):
+            hits = int(bloom.contains_many(probes).sum())
+        else:
+            hits = sum(value in bloom for value in probes)
+        query = time.perf_counter() - start
+
+        print(
+            f"{name:>6}: construcción {build:.3f} s, consulta {query / queries * 1e6:.2f} us/mensaje, "
+            f"falsos positivos {hits / queries:.4%}"
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        patterns_file = pathlib.Path(tmp) / "patterns.txt"
+        patterns_file.write_text("\n".join(known) + "\n")
+        cache_dir = pathlib.Path(tmp) / "cache"
+        task_4.load_bloom_filter(patterns_file, m_bits, k_hashes, "fast", cache_dir)  # Llena la caché
+
+        for label, cache in (("sin caché", None), ("caché mmap", cache_dir)):
+            start = time.perf_counter()
+            task_4.load_bloom_filter(patterns_file, m_bits, k_hashes, "fast", cache)
+            print(f"arranque {label}: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--patterns", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=100_000)
+    parser.add_argument("--m-bits", type=int, default=1_000_000)
+    parser.add_argument("--k-hashes", type=int, default=7)
+    args = parser.parse_args()
+
+    main(args.patterns, args.queries, args.m_bits, args.k_hashes)
@@ -0,0 +1,115 @@
+"""
+Benchmark del modo de subcadenas de task_4 (`match="substring"`).
+
+Para cada tamaño de `--patterns` construye los autómatas con firmas
+`host-NNNNNNN` (`task_4.AhoCorasick`, en Python puro, y
+`task_4.CompiledAhoCorasick` si pyahocorasick está instalado), mide el tiempo
+y la memoria de construcción y el rendimiento al clasificar `--messages`
+líneas de log (una parte contiene una firma y otra es exactamente una firma).
+Se compara el autómata solo, el autómata con el filtro de Bloom delante
+(`SubstringMatcher`) y, para el conjunto más chico, la búsqueda ingenua
+`any(p in mensaje for p in patrones)` sobre una muestra de mensajes.
+
+Referencia del autómata en Python puro (una máquina de desarrollo):
+
+    patrones    construcción   memoria
+       10.000          0,1 s      2 MB
+      100.000          1,1 s     15 MB
+    1.000.000         10,7 s    153 MB
+
+Con patrones sin prefijos comunes la memoria crece con el total de
+caracteres; por encima de unos 10^5 patrones conviene pyahocorasick.
+
+Uso:
+  python benchmarks/bench_task_4_substring.py --patterns 10000 1000000 --messages 100000
+"""
+
+import argparse
+import functools
+import pathlib
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import task_4  # noqa: E402
+
+NAIVE_LIMIT = 10_000  # Patrones a partir de los cuales no se mide la búsqueda ingenua
+NAIVE_SAMPLE = 200
+
+
+def _messages(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        host = f"host-{rng.randrange(10_000_000):07d}"
+        if rng.random() < 0.1:
+            messages.append(host)  # Coincidencia exacta: el prefiltro la manda a la comprobación exacta
+        else:
+            messages.append(f"request to {host}.cluster.local failed after {rng.randrange(5000)} ms")
+    return messages
+
+
+def _rate(fn, messages: list[str]) -> tuple[float, int]:
+    start = time.perf_counter()
+    hits = int(fn(messages).sum())
+    return len(messages) / (time.perf_counter() - start), hits
+
+
+def _naive(patterns: list[str], values: list[str]):
+    return task_4.np.array([any(p in v for p in patterns) for v in values])
+
+
+def _build(automaton_class, patterns: list[str]):
+    """El autómata, su tiempo de construcción y la memoria que reservó Python."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    automaton = automaton_class(patterns)
+    build = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return automaton, build, memory
+
+
+def main(sizes: list[int], messages: int) -> None:
+    probes = _messages(messages)
+    mb = sum(len(m) for m in probes) / 1e6
+    print(f"{messages:,} mensajes ({mb:.1f} MB)")
+    automata = [("python", task_4.AhoCorasick)]
+    if task_4.ahocorasick is not None:
+        automata.append(("pyahocorasick", task_4.CompiledAhoCorasick))
+    else:
+        print("pyahocorasick no está instalado: solo se mide el autómata en Python puro")
+
+    for size in sizes:
+        patterns = [f"host-{i:07d}" for i in range(size)]
+        bloom = task_4.FastBloomFilter(max(1024, size * 20), 7)
+        bloom.add_many(patterns)
+        print(f"\n{size:,} patrones")
+
+        for name, automaton_class in automata:
+            # tracemalloc no ve la memoria de C de pyahocorasick: solo cuenta la de Python
+            automaton, build, memory = _build(automaton_class, patterns)
+            print(f"{name:>22}: construido en {build:.2f} s, {memory / 1e6:,.0f} MB en Python")
+            for label, matcher in (
+                (name, task_4.SubstringMatcher(automaton)),
+                (f"bloom + {name}", task_4.SubstringMatcher(automaton, bloom)),
+            ):
+                rate, hits = _rate(matcher.contains_many, probes)
+                print(f"{label:>22}: {rate:>12,.0f} mensajes/s, {rate * mb / messages:.2f} MB/s, coincidencias {hits / messages:.2%}")
+            del automaton
+
+        if size <= NAIVE_LIMIT:
+            rate, _ = _rate(functools.partial(_naive, patterns), probes[:NAIVE_SAMPLE])
+            print(f"{'ingenuo':>22}: {rate:>12,.0f} mensajes/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--patterns", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--messages", type=int, default=100_000)
+    args = parser.parse_args()
+
+    main(args.patterns, args.messages)
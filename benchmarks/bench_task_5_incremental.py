@@ -0,0 +1,63 @@
+"""
+Benchmark de la ejecución incremental de task_5 (`--state_dir`).
+
+Simula ejecuciones periódicas sobre una carpeta que crece: en cada ronda
+llegan `--new` archivos y se mide `process_data_lazy` completo frente a
+`process_data_incremental`, que solo lee los archivos nuevos y combina sus
+agregados con los guardados.
+
+Uso:
+  python benchmarks/bench_task_5_incremental.py --history 50000 --new 1000 --rounds 3
+"""
+
+import argparse
+import contextlib
+import io
+import pathlib
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src" / "task_5"))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from bench_task_5_scan import _generate  # noqa: E402
+
+import main as task_5  # noqa: E402
+
+
+def _timed(fn) -> tuple[float, object]:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(history: int, new: int, rounds: int, events: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = pathlib.Path(tmp) / "data"
+        state = pathlib.Path(tmp) / "state"
+        folder.mkdir()
+        _generate(folder, history, events)
+        elapsed, _ = _timed(lambda: task_5.process_data_incremental(str(folder), str(state)))
+        print(f"{history:,} archivos iniciales: primera ejecución incremental {elapsed:.2f} s")
+
+        for round_ in range(1, rounds + 1):
+            _generate(folder, new, events, start=history + (round_ - 1) * new)
+            full_time, full = _timed(
+                lambda: task_5.process_data_lazy(str(folder), window_duration="10s").collect()
+            )
+            incr_time, incr = _timed(lambda: task_5.process_data_incremental(str(folder), str(state)))
+            assert incr.equals(full)
+            print(f"ronda {round_} (+{new:,} archivos): completa {full_time:.2f} s, incremental {incr_time:.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--history", type=int, default=50_000)
+    parser.add_argument("--new", type=int, default=1_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--events", type=int, default=20)
+    args = parser.parse_args()
+
+    main(args.history, args.new, args.rounds, args.events)
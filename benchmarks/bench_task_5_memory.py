@@ -0,0 +1,88 @@
+"""
+Benchmark del pico de memoria de task_5 al crecer la carpeta de entrada.
+
+Genera `--files` archivos y luego 10 veces más, y ejecuta en un proceso
+aparte cada vez (para medir ru_maxrss por separado):
+
+- `plan`: `process_data_lazy`, un único plan con todos los eventos.
+- `chunked`: `process_data_chunked` con `--memory_budget`, trozo a trozo.
+
+Con presupuesto el pico debe quedarse plano al multiplicar la entrada por
+10, y el resultado debe ser idéntico al del plan único.
+
+Uso:
+  python benchmarks/bench_task_5_memory.py --files 10000 --events 20 --memory_budget 64MB
+"""
+
+import argparse
+import contextlib
+import io
+import pathlib
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src" / "task_5"))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from bench_task_5_scan import _generate  # noqa: E402
+
+import main as task_5  # noqa: E402
+
+OPTIONS = dict(window_duration="10s", slide_duration="5s", watermark="30s", max_files_per_trigger=1000)
+
+
+def _run(mode: str, folder: str, budget: str, output: str) -> None:
+    """Ejecuta un modo en este proceso, guarda el resultado e imprime tiempo y memoria."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "plan":
+            result = task_5.process_data_lazy(folder, **OPTIONS).collect()
+        else:
+            result = task_5.process_data_chunked(folder, memory_budget=budget, **OPTIONS)
+    elapsed = time.perf_counter() - start
+    result.write_parquet(output)
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:>8}: {elapsed:6.2f} s, pico de memoria {rss_mb:5.0f} MB, {int(result['total'].sum()):,} eventos")
+
+
+def main(files: int, events: int, budget: str) -> None:
+    import polars as pl
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = pathlib.Path(tmp) / "data"
+        folder.mkdir()
+        generated = 0
+        for total in (files, 10 * files):
+            _generate(folder, total - generated, events, start=generated)
+            generated = total
+            size_mb = sum(p.stat().st_size for p in folder.iterdir()) / 1024 ** 2
+            print(f"{total:,} archivos x {events} eventos ({size_mb:.0f} MB de JSON), presupuesto {budget}")
+            outputs = {}
+            for mode in ("plan", "chunked"):
+                outputs[mode] = pathlib.Path(tmp) / f"{mode}.parquet"
+                child = subprocess.run(
+                    [sys.executable, __file__, "--run", mode, str(folder), budget, str(outputs[mode])],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                print(child.stdout.splitlines()[-1])
+            same = pl.read_parquet(outputs["plan"]).equals(pl.read_parquet(outputs["chunked"]))
+            print(f"  resultados idénticos: {same}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--memory_budget", default="64MB")
+    parser.add_argument("--run", nargs=4, metavar=("MODE", "FOLDER", "BUDGET", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        _run(*args.run)
+    else:
+        main(args.files, args.events, args.memory_budget)
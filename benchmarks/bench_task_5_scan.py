@@ -0,0 +1,101 @@
+"""
+Benchmark de la lectura de la carpeta de entrada en task_5.
+
+Genera `--files` archivos JSON como los de `scripts/generator.py` y ejecuta
+`process_data_lazy` con dos formas de cargar los datos, cada una en su propio
+proceso para medir el pico de memoria (ru_maxrss) por separado:
+
+- `read_json`: la versión anterior, `pl.read_json` por archivo en un solo
+  hilo y `pl.concat(...).lazy()`.
+- `scan`: `task_5.main.scan_events`, que lista y decodifica los archivos
+  por grupos dentro del escaneo, en paralelo y solo con las columnas usadas.
+- `parquet`: después de `task_5/compact.py`, que pasa la carpeta a Parquet
+  particionado por fecha y hora (se reporta también cuánto tarda compactar).
+
+Uso:
+  python benchmarks/bench_task_5_scan.py --files 100000 --events 20
+"""
+
+import argparse
+import json
+import pathlib
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src" / "task_5"))
+
+import compact  # noqa: E402
+import polars as pl  # noqa: E402
+
+import main as task_5  # noqa: E402
+
+SERVICES = ["auth", "billing", "search", "checkout"]
+CODES = [200, 201, 301, 400, 404, 500, 503]
+
+
+def _generate(folder: pathlib.Path, files: int, events: int, start: int = 0) -> None:
+    rng = random.Random(start)
+    for i in range(start, start + files):
+        batch = [
+            {
+                "service": rng.choice(SERVICES),
+                "timestamp": 1_760_000_000 + i + rng.random(),
+                "message": f"HTTP Status Code: {rng.choice(CODES)} request_id={rng.getrandbits(64):x}",
+            }
+            for _ in range(events)
+        ]
+        with open(folder / f"20251015_{i:09d}.json", "w") as f:
+            json.dump(batch, f)
+
+
+def _run(mode: str, folder: str) -> None:
+    """Ejecuta un modo en este proceso e imprime tiempo y pico de memoria."""
+    if mode == "read_json":
+        original = task_5.scan_events
+        task_5.scan_events = lambda source, **_: pl.concat(
+            [pl.read_json(path) for path in task_5.glob.glob(task_5.os.path.join(source, "*.json"))]
+        ).lazy()
+    start = time.perf_counter()
+    result = task_5.process_data_lazy(folder, window_duration="10s").collect()
+    elapsed = time.perf_counter() - start
+    if mode == "read_json":
+        task_5.scan_events = original
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:>9}: {elapsed:.2f} s, pico de memoria {rss_mb:.0f} MB, {int(result['total'].sum()):,} eventos")
+
+
+def main(files: int, events: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = pathlib.Path(tmp)
+        _generate(folder, files, events)
+        print(f"{files:,} archivos x {events} eventos")
+        for mode in ("read_json", "scan", "parquet"):
+            if mode == "parquet":
+                start = time.perf_counter()
+                compact.compact(str(folder), min_age=0)
+                print(f"  compactación: {time.perf_counter() - start:.2f} s")
+            # `process_data_lazy` imprime su progreso: solo interesa la última línea
+            child = subprocess.run(
+                [sys.executable, __file__, "--run", mode, str(folder)],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            print(child.stdout.splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--run", nargs=2, metavar=("MODE", "FOLDER"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        _run(*args.run)
+    else:
+        main(args.files, args.events)
@@ -0,0 +1,136 @@
+"""
+Benchmark de la latencia por disparador de task_6 al crecer el estado.
+
+Ejecuta `task_6.producer` en Spark local y, en cada paso, escribe
+`--files_per_step` archivos JSON con eventos que avanzan en el tiempo y
+procesa un disparador (`processAllAvailable`). Para cada modo reporta
+`durationMs.triggerExecution` del último progreso y las filas de estado:
+
+- `antes`: `outputMode('complete')` con `df.rdd.isEmpty()` en el
+  `foreachBatch`, como estaba `compute`.
+- `complete`: igual, pero solo con el `collect` de `compute`.
+- `update` y `append`: sin ordenar; la marca de agua descarta el estado
+  de las ventanas cerradas, así que su latencia no crece con los pasos.
+
+Requiere pyspark. Uso:
+  python benchmarks/bench_task_6_trigger.py --steps 40 --files_per_step 5
+"""
+
+import argparse
+import json
+import pathlib
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from pyspark.sql import SparkSession  # noqa: E402
+
+import task_6  # noqa: E402
+
+SERVICES = ["auth", "billing", "search", "checkout"]
+CODES = [200, 201, 301, 400, 404, 500, 503]
+MODES = ("antes", "complete", "update", "append")
+BASE = 1_760_000_000
+
+
+def _write_step(folder: pathlib.Path, step: int, files: int, events: int, seconds: int) -> None:
+    """Archivos del paso `step`: sus eventos caen en los `seconds` segundos siguientes."""
+    rng = random.Random(step)
+    start = BASE + step * seconds
+    for i in range(files):
+        batch = [
+            {
+                "service": rng.choice(SERVICES),
+                "timestamp": start + rng.uniform(0, seconds),
+                "message": f"HTTP Status Code: {rng.choice(CODES)}",
+            }
+            for _ in range(events)
+        ]
+        with open(folder / f"{step:06d}_{i:04d}.json", "w") as f:
+            json.dump(batch, f)
+
+
+def _foreach_batch(check_empty: bool):
+    """Réplica del `foreachBatch` de `task_6.compute`, con o sin `df.rdd.isEmpty()`."""
+
+    def run(df, batch_id):
+        if check_empty and df.rdd.isEmpty():
+            return
+        df.select('service', 'window_start', 'window_end', 'total', 'successes', 'success_rate').collect()
+
+    return run
+
+
+def _run_mode(spark: SparkSession, mode: str, tmp: pathlib.Path, args: argparse.Namespace) -> list[tuple]:
+    """(paso, filas de estado, ms del disparador) de cada paso."""
+    source = tmp / mode / "input"
+    source.mkdir(parents=True)
+    output_mode = "complete" if mode == "antes" else mode
+    sdf = task_6.producer(
+        spark,
+        str(source),
+        window_duration=args.window,
+        slide_duration=args.window,
+        watermark=args.watermark,
+        max_files_per_trigger=args.files_per_step,
+        output_mode=output_mode,
+    )
+    query = (
+        sdf.writeStream
+        .foreachBatch(_foreach_batch(check_empty=mode == "antes"))
+        .outputMode(output_mode)
+        .option('checkpointLocation', str(tmp / mode / "checkpoint"))
+        .start()
+    )
+    samples = []
+    try:
+        for step in range(args.steps):
+            _write_step(source, step, args.files_per_step, args.events, args.seconds_per_step)
+            query.processAllAvailable()
+            progress = query.lastProgress
+            state_rows = sum(op.get("numRowsTotal", 0) for op in progress.get("stateOperators", []))
+            samples.append((step + 1, state_rows, progress["durationMs"].get("triggerExecution", 0)))
+    finally:
+        query.stop()
+    return samples
+
+
+def main(args: argparse.Namespace) -> None:
+    spark = (
+        SparkSession.builder
+        .master("local[*]")
+        .appName("bench_task_6_trigger")
+        .config("spark.sql.session.timeZone", "UTC")
+        .config("spark.sql.shuffle.partitions", "4")
+        .config("spark.ui.enabled", "false")
+        .getOrCreate()
+    )
+    spark.sparkContext.setLogLevel("ERROR")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = {mode: _run_mode(spark, mode, pathlib.Path(tmp), args) for mode in MODES}
+    finally:
+        spark.stop()
+
+    print(f"{args.steps} pasos de {args.files_per_step} archivos x {args.events} eventos, "
+          f"ventana {args.window}, marca de agua {args.watermark}")
+    print("paso  " + "  ".join(f"{mode:>18}" for mode in MODES))
+    for i in range(0, args.steps, max(args.steps // 10, 1)):
+        cells = []
+        for mode in MODES:
+            _, state_rows, ms = results[mode][i]
+            cells.append(f"{ms:>6} ms {state_rows:>5} est.")
+        print(f"{results[MODES[0]][i][0]:>4}  " + "  ".join(f"{cell:>18}" for cell in cells))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--steps", type=int, default=40)
+    parser.add_argument("--files_per_step", type=int, default=5)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--seconds_per_step", type=int, default=60)
+    parser.add_argument("--window", default="10 seconds")
+    parser.add_argument("--watermark", default="30 seconds")
+    main(parser.parse_args())
@@ -1,6 +1,6 @@
 import datetime
-from typing import NamedTuple, TypedDict
-
+from dataclasses import dataclass
+from typing import TypedDict
 
 # class Result(NamedTuple):
 #     value: float
@@ -8,8 +8,6 @@ from typing import NamedTuple, TypedDict
 #     oldest_considered: datetime.datetime
 
 
-from dataclasses import dataclass
-
 @dataclass
 class Result:
     value: float
@@ -14,7 +14,6 @@ import json
 import pathlib
 import random
 import time
-import uuid
 from typing import Any, Callable, Iterator
 
 import boto3
@@ -0,0 +1,118 @@
+"""
+Checkpoints locales para las tareas en vivo (task_1 a task_3).
+
+Equivalente, para las tareas en Python puro, al `checkpointLocation` de Spark
+en task_6: el estado de cada operador junto con la posición de ingesta (el
+último archivo procesado) se guarda periódicamente como JSON en un directorio
+local. La escritura es atómica (archivo temporal + `os.replace`), así que un
+reinicio siempre encuentra el último checkpoint completo o ninguno.
+
+La posición solo se guarda y se aplica con `ingest.high_water_mark`, que
+requiere nombres ordenables (los `%Y%m%d_%H%M%S_%f.json` del generador). Sin
+ella, un archivo que llegue durante la caída con un nombre menor (p. ej. los
+uuid de `data/`) se saltaría para siempre. Con `ingest.archive` lo pendiente
+es lo que queda en el directorio: las tareas observan con `defer_archive` y
+archivan cada archivo solo después de guardar el checkpoint que lo cubre, así
+que una caída antes del guardado lo vuelve a procesar en lugar de perderlo.
+Sin ninguna de las dos un reinicio volvería a contar todos los archivos, por
+eso `require_resumable` rechaza esa combinación.
+"""
+
+import json
+import os
+import pathlib
+import tempfile
+import time
+from typing import Any, Callable, Optional
+
+FORMAT_VERSION = 1
+
+
+class Checkpointer:
+    """Guarda y recupera el estado de una tarea en `<directory>/<name>.json`."""
+
+    def __init__(self, directory: str | pathlib.Path, name: str, interval: float = 5.0):
+        self.directory = pathlib.Path(directory)
+        self.path = self.directory / f"{name}.json"
+        self.interval = interval
+        self._last_save = time.monotonic()
+
+    def load(self) -> Optional[dict[str, Any]]:
+        """Devuelve el último estado guardado, o None si no hay checkpoint válido."""
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[CHECKPOINT] Ignorando checkpoint ilegible {self.path}: {e}", flush=True)
+            return None
+
+        if payload.get("version") != FORMAT_VERSION:
+            print(f"[CHECKPOINT] Versión no soportada en {self.path}", flush=True)
+            return None
+        return payload["state"]
+
+    def save(self, state: dict[str, Any]) -> None:
+        """Escribe el estado de forma atómica."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        payload = {"version": FORMAT_VERSION, "saved_at": time.time(), "state": state}
+
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            pathlib.Path(tmp_name).unlink(missing_ok=True)
+            raise
+        _fsync_directory(self.directory)
+        self._last_save = time.monotonic()
+
+    def maybe_save(self, state_fn: Callable[[], dict[str, Any]]) -> bool:
+        """Guarda `state_fn()` si pasó al menos `interval` segundos desde el último guardado."""
+        if time.monotonic() - self._last_save < self.interval:
+            return False
+        self.save(state_fn())
+        return True
+
+
+def _fsync_directory(directory: pathlib.Path) -> None:
+    """Persiste el renombrado en el directorio (no disponible en todas las plataformas)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def tracks_position(ingest: Optional[dict[str, Any]]) -> bool:
+    """Indica si la ingesta permite reanudar por posición (`high_water_mark`)."""
+    return bool(ingest and ingest.get("high_water_mark"))
+
+
+def require_resumable(ingest: Optional[dict[str, Any]]) -> None:
+    """Falla si con `ingest` un reinicio no sabría qué archivos ya se procesaron."""
+    if not (tracks_position(ingest) or (ingest and ingest.get("archive"))):
+        raise ValueError("checkpoint_dir requires ingest.high_water_mark or ingest.archive")
+
+
+def resume_ingest(
+    ingest: Optional[dict[str, Any]], state: Optional[dict[str, Any]]
+) -> dict[str, Any]:
+    """Opciones del observador que continúan desde la posición guardada en `state`.
+
+    Sin `high_water_mark` la posición no se aplica: lo pendiente es lo que
+    el observador encuentre en el directorio.
+    """
+    options = dict(ingest or {})
+    if tracks_position(options) and state and state.get("position") is not None:
+        options.setdefault("start_after", state["position"])
+    return options
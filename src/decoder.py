@@ -0,0 +1,129 @@
+"""
+Decodificación de los archivos de eventos.
+
+Todas las tareas leen archivos JSON con una lista de `domain.Events` (o un
+único evento). Este módulo elige el backend más rápido disponible:
+
+- `msgspec`: decodifica y valida directamente contra `domain.Events` en C.
+- `orjson`: decodifica en C y valida el esquema en Python.
+- `json`: biblioteca estándar, siempre disponible.
+
+La validación se hace una sola vez al ingerir el archivo, de modo que los
+consumidores pueden indexar `event["message"]` sin `get` ni valores por defecto.
+"""
+
+import json
+import pathlib
+from typing import Any, Callable
+
+try:
+    from . import domain
+except ImportError:
+    import domain  # type: ignore[no-redef]
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depende del entorno
+    msgspec = None  # type: ignore[assignment]
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None  # type: ignore[assignment]
+
+
+class DecodeError(ValueError):
+    """El archivo no es JSON válido o no cumple el esquema de `domain.Events`."""
+
+
+class Decoder:
+    """Convierte el contenido de un archivo en una lista validada de eventos."""
+
+    name = "json"
+
+    def decode(self, data: bytes | str) -> list[domain.Events]:
+        try:
+            payload = json.loads(data)
+        except ValueError as e:
+            raise DecodeError(str(e)) from e
+        return _validate(payload)
+
+    def load(self, path: str | pathlib.Path) -> list[domain.Events]:
+        with open(path, "rb") as f:
+            return self.decode(f.read())
+
+    def load_batch(self, path: str | pathlib.Path) -> domain.EventBatch:
+        """Lee un archivo directamente como `domain.EventBatch` columnar."""
+        return domain.EventBatch.from_events(self.load(path))
+
+
+class OrjsonDecoder(Decoder):
+    name = "orjson"
+
+    def decode(self, data: bytes | str) -> list[domain.Events]:
+        try:
+            payload = orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            raise DecodeError(str(e)) from e
+        return _validate(payload)
+
+
+class MsgspecDecoder(Decoder):
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        self._decoder = msgspec.json.Decoder(list[domain.Events] | domain.Events)
+
+    def decode(self, data: bytes | str) -> list[domain.Events]:
+        try:
+            payload = self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise DecodeError(str(e)) from e
+        return payload if isinstance(payload, list) else [payload]
+
+
+_BACKENDS: dict[str, Callable[[], Decoder]] = {"json": Decoder}
+if orjson is not None:
+    _BACKENDS["orjson"] = OrjsonDecoder
+if msgspec is not None:
+    _BACKENDS["msgspec"] = MsgspecDecoder
+
+_PREFERENCE = ("msgspec", "orjson", "json")
+_instances: dict[str, Decoder] = {}
+
+
+def available_backends() -> list[str]:
+    """Backends instalados, del más rápido al más lento."""
+    return [name for name in _PREFERENCE if name in _BACKENDS]
+
+
+def get_decoder(backend: str = "auto") -> Decoder:
+    """Devuelve (y reutiliza) el decodificador del backend pedido."""
+    if backend == "auto":
+        backend = available_backends()[0]
+    if backend not in _BACKENDS:
+        raise ValueError(f"Invalid JSON backend: {backend}")
+    if backend not in _instances:
+        _instances[backend] = _BACKENDS[backend]()
+    return _instances[backend]
+
+
+def _validate(payload: Any) -> list[domain.Events]:
+    """Comprueba el esquema de `domain.Events` y normaliza el timestamp a float."""
+    events = payload if isinstance(payload, list) else [payload]
+    for event in events:
+        if not isinstance(event, dict):
+            raise DecodeError(f"Se esperaba un objeto, se obtuvo {type(event).__name__}")
+        try:
+            service = event["service"]
+            timestamp = event["timestamp"]
+            message = event["message"]
+        except KeyError as e:
+            raise DecodeError(f"Falta el campo {e} en el evento") from e
+        if not isinstance(service, str) or not isinstance(message, str):
+            raise DecodeError("Los campos 'service' y 'message' deben ser texto")
+        if type(timestamp) is not float:
+            if not isinstance(timestamp, int) or isinstance(timestamp, bool):
+                raise DecodeError("El campo 'timestamp' debe ser numérico")
+            event["timestamp"] = float(timestamp)
+    return events
@@ -1,6 +1,8 @@
 import datetime
-from typing import NamedTuple, TypedDict
+from dataclasses import dataclass, field
+from typing import Callable, TypedDict
 
+import numpy as np
 
 # class Result(NamedTuple):
 #     value: float
@@ -8,15 +10,101 @@ from typing import NamedTuple, TypedDict
 #     oldest_considered: datetime.datetime
 
 
-from dataclasses import dataclass
-
 @dataclass
 class Result:
     value: float
     newest_considered: datetime.datetime
     oldest_considered: datetime.datetime
+    # Valores adicionales por clave (p. ej. por servicio); no entran en la igualdad
+    breakdown: dict[str, float] = field(default_factory=dict, compare=False)
 
 class Events(TypedDict):
     service: str
     timestamp: float
     message: str
+
+
+# Código de estado para los mensajes que no traen "HTTP Status Code: N"
+NO_STATUS = -1
+_STATUS_TAG = "HTTP Status Code: "
+_INT16_MAX = np.iinfo(np.int16).max
+
+
+def parse_status(message: str) -> int:
+    """Extrae el código HTTP de un mensaje, o `NO_STATUS` si no lo tiene."""
+    _, tag, rest = message.partition(_STATUS_TAG)
+    if not tag:
+        return NO_STATUS
+    parts = rest.split(maxsplit=1)
+    code = parts[0] if parts else ""
+    if not code.isdigit() or int(code) > _INT16_MAX:
+        return NO_STATUS
+    return int(code)
+
+
+@dataclass(frozen=True)
+class EventBatch:
+    """Eventos de un archivo en forma columnar.
+
+    Se construye una sola vez al ingerir el archivo. Los servicios y los
+    mensajes se codifican como diccionario: `service_ids` y `message_ids`
+    indexan las tuplas `services` y `messages`, y `status` guarda el código
+    HTTP ya extraído de cada mensaje.
+    """
+
+    timestamps: np.ndarray  # float64
+    service_ids: np.ndarray  # int32, índices en `services`
+    services: tuple[str, ...]
+    message_ids: np.ndarray  # int32, índices en `messages`
+    messages: tuple[str, ...]
+    status: np.ndarray  # int16, NO_STATUS si el mensaje no trae código
+
+    @classmethod
+    def from_events(cls, events: list[Events]) -> "EventBatch":
+        n = len(events)
+        service_index: dict[str, int] = {}
+        message_index: dict[str, int] = {}
+
+        timestamps = np.fromiter((e["timestamp"] for e in events), dtype=np.float64, count=n)
+        service_ids = np.fromiter(
+            (service_index.setdefault(e["service"], len(service_index)) for e in events),
+            dtype=np.int32,
+            count=n,
+        )
+        message_ids = np.fromiter(
+            (message_index.setdefault(e["message"], len(message_index)) for e in events),
+            dtype=np.int32,
+            count=n,
+        )
+        messages = tuple(message_index)
+        # El código se extrae una vez por mensaje distinto, no por evento
+        status_by_message = np.fromiter(
+            (parse_status(m) for m in messages), dtype=np.int16, count=len(messages)
+        )
+
+        return cls(
+            timestamps=timestamps,
+            service_ids=service_ids,
+            services=tuple(service_index),
+            message_ids=message_ids,
+            messages=messages,
+            status=status_by_message[message_ids],
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def newest(self) -> float:
+        return float(self.timestamps.max())
+
+    @property
+    def oldest(self) -> float:
+        return float(self.timestamps.min())
+
+    def map_messages(self, fn: Callable[[str], object], dtype: type = bool) -> np.ndarray:
+        """Aplica `fn` una vez por mensaje distinto y lo expande a cada evento."""
+        per_message: np.ndarray = np.fromiter(
+            (fn(m) for m in self.messages), dtype=dtype, count=len(self.messages)
+        )
+        return per_message[self.message_ids]
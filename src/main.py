@@ -1,13 +1,19 @@
 import datetime
 import json
 import pathlib
-from typing import Iterator
 import threading
+from typing import Iterator
+
 from textual.app import App, ComposeResult
 from textual.containers import Container
 from textual.widgets import DataTable, Footer, Header
 
-import task_1, task_3, task_4, domain
+import domain
+import task_1
+import task_2
+import task_3
+import task_4
+
 
 def main(
     source: str,
@@ -17,6 +23,8 @@ def main(
     match task:
         case "task_1":
             method = task_1.compute
+        case "task_2":
+            method = task_2.compute
         case "task_3":
             method = task_3.compute
         case "task_4":
@@ -67,6 +75,8 @@ class LiveDataApp(App):
 
         table.clear()
         table.add_row("Value", f"{result.value:.4f}")
+        for key, value in result.breakdown.items():
+            table.add_row(key, f"{value:.4f}")
         table.add_row(
             "Newest Considered", result.newest_considered.strftime("%Y-%m-%d %H:%M:%S")
         )
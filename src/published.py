@@ -0,0 +1,47 @@
+"""
+Publicación de instantáneas entre hilos.
+
+Las tareas con un consumidor en segundo plano (task_3) procesan los lotes en
+un hilo de ingesta y leen el resultado desde el generador (la UI). En lugar
+de compartir el estado bajo un candado, el hilo de ingesta publica después de
+cada lote un objeto inmutable con lo que necesitan los lectores, y estos solo
+leen la referencia (una asignación atómica en CPython): una lectura nunca
+espera a un lote en curso ni lo retrasa.
+"""
+
+import threading
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Published(Generic[T]):
+    """Última instantánea publicada por un único hilo escritor."""
+
+    def __init__(self, initial: Optional[T] = None):
+        self._value = initial
+        self._version = 0 if initial is None else 1
+        # Solo para quien quiera esperar una publicación; leer no lo usa
+        self._changed = threading.Condition()
+
+    def publish(self, value: T) -> None:
+        """Reemplaza la instantánea; `value` no debe modificarse después."""
+        self._value = value
+        self._version += 1
+        with self._changed:
+            self._changed.notify_all()
+
+    def get(self) -> Optional[T]:
+        """Instantánea actual (None si aún no se publicó ninguna), sin bloquear."""
+        return self._value
+
+    @property
+    def version(self) -> int:
+        """Número de publicaciones hechas hasta ahora."""
+        return self._version
+
+    def wait(self, version: int, timeout: Optional[float] = None) -> Optional[T]:
+        """Espera (hasta `timeout`) una publicación posterior a `version`."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._version != version, timeout)
+        return self._value
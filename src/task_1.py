@@ -1,18 +1,27 @@
-import json
 import pathlib
-import threading
 import queue
+import threading
 import time
-from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
 
 # ---------------------------------------------------------------------
 # Importación robusta de Result
 # ---------------------------------------------------------------------
 try:
-    from src.domain import Result  # Para entorno de paquete
+    from src import checkpoint, decoder, watcher
+    from src.domain import NO_STATUS, EventBatch, Result  # Para entorno de paquete
 except ModuleNotFoundError:
-    from domain import Result  # Para ejecución directa (modo script)
+    import checkpoint
+    import decoder
+    import watcher
+    from domain import (  # Para ejecución directa (modo script)
+        NO_STATUS,
+        EventBatch,
+        Result,
+    )
 
 # ---------------------------------------------------------------------
 # Funciones de utilidad
@@ -40,9 +49,9 @@ def get_service_metrics(service_metrics: Dict[str, Dict[str, int]], service_name
 
 
 def process_event(log_event: Dict[str, Any], service_metrics: Dict[str, Dict[str, int]]) -> None:
-    """Procesa un evento, actualizando las métricas por servicio."""
-    service_name = log_event.get("service", "unknown_service")
-    message = log_event.get("message", "")
+    """Procesa un evento (ya validado por `decoder`), actualizando las métricas por servicio."""
+    service_name = log_event["service"]
+    message = log_event["message"]
 
     metrics = get_service_metrics(service_metrics, service_name)
 
@@ -65,95 +74,230 @@ def get_service_success_rate(service_metrics: Dict[str, Dict[str, int]], service
 
 
 # ---------------------------------------------------------------------
-# Productor (monitoreo de archivos nuevos)
+# Motor vectorizado para todos los servicios
 # ---------------------------------------------------------------------
-def producer(source: str, q: queue.Queue, stop: threading.Event) -> None:
-    """Monitorea un directorio para archivos JSON nuevos y los pone en la cola."""
-    path = pathlib.Path(source)
-    seen = set()
+class SuccessRateEngine:
+    """Contadores de éxito y total por servicio guardados en arreglos NumPy.
 
-    print(f"[PRODUCER] Monitoreando: {path.resolve()}", flush=True)
+    Cada servicio recibe un índice global la primera vez que aparece; los
+    identificadores locales de cada `EventBatch` se traducen a esos índices y
+    los contadores se actualizan con `np.bincount`, así que procesar un lote
+    cuesta O(lote) en C y no depende de cuántos servicios se reporten.
+    """
 
-    while not stop.is_set():
-        if not path.is_dir():
-            print(f"[PRODUCER] Error: Directorio no encontrado: {source}", flush=True)
-            time.sleep(1)
-            continue
+    def __init__(self, services: Optional[List[str]] = None):
+        self.services: List[str] = []
+        self._index: Dict[str, int] = {}
+        self.success_counts = np.zeros(0, dtype=np.int64)
+        self.log_counts = np.zeros(0, dtype=np.int64)
+        # Subconjunto a reportar en `rates` (None = todos)
+        self.reported = list(services) if services else None
+        for service in services or []:
+            self._service_id(service)
+
+    def _service_id(self, service: str) -> int:
+        service_id = self._index.get(service)
+        if service_id is None:
+            service_id = self._index[service] = len(self.services)
+            self.services.append(service)
+        return service_id
+
+    def _grow(self) -> None:
+        missing = len(self.services) - len(self.log_counts)
+        if missing > 0:
+            self.success_counts = np.concatenate([self.success_counts, np.zeros(missing, np.int64)])
+            self.log_counts = np.concatenate([self.log_counts, np.zeros(missing, np.int64)])
+
+    def update(self, batch: EventBatch) -> None:
+        """Suma un lote columnar a los contadores (solo eventos con código HTTP)."""
+        local_to_global = np.fromiter(
+            (self._service_id(s) for s in batch.services), dtype=np.intp, count=len(batch.services)
+        )
+        self._grow()
+
+        status = batch.status
+        has_status = status != NO_STATUS
+        success = has_status & (status >= 200) & (status < 300)
+        service_ids = local_to_global[batch.service_ids]
+
+        n = len(self.services)
+        self.log_counts += np.bincount(service_ids[has_status], minlength=n)
+        self.success_counts += np.bincount(service_ids[success], minlength=n)
+
+    def rate(self, service: str) -> float:
+        """Tasa de éxito de un servicio (0.0 si aún no tiene eventos)."""
+        service_id = self._index.get(service)
+        if service_id is None or self.log_counts[service_id] == 0:
+            return 0.0
+        return float(self.success_counts[service_id] / self.log_counts[service_id])
+
+    def rates(self) -> Dict[str, float]:
+        """Tasas de éxito de los servicios reportados, calculadas en una pasada."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(self.log_counts > 0, self.success_counts / self.log_counts, 0.0)
+        services = self.reported if self.reported is not None else self.services
+        return {service: float(values[self._index[service]]) for service in services}
+
+    def to_metrics(self) -> Dict[str, Dict[str, int]]:
+        """Contadores con el mismo formato que `get_service_metrics` (para checkpoints)."""
+        return {
+            service: {
+                "success_count": int(self.success_counts[i]),
+                "log_count": int(self.log_counts[i]),
+            }
+            for i, service in enumerate(self.services)
+        }
+
+    def load_metrics(self, service_metrics: Dict[str, Dict[str, int]]) -> None:
+        """Restaura contadores guardados con `to_metrics`."""
+        for service in service_metrics:
+            self._service_id(service)
+        self._grow()
+        for service, metrics in service_metrics.items():
+            service_id = self._index[service]
+            self.success_counts[service_id] = metrics["success_count"]
+            self.log_counts[service_id] = metrics["log_count"]
 
-        for file in path.glob("*.json"):
-            if file.name in seen or not file.is_file():
-                continue
 
+# ---------------------------------------------------------------------
+# Productor (monitoreo de archivos nuevos)
+# ---------------------------------------------------------------------
+def producer(
+    directory: watcher.DirectoryWatcher,
+    q: queue.Queue,
+    stop: threading.Event,
+    json_backend: str = "auto",
+) -> None:
+    """Recibe del observador los archivos JSON nuevos y los pone en la cola.
+
+    Los archivos que no aportan eventos se archivan enseguida (con
+    `defer_archive` el resto lo archiva el consumidor tras el checkpoint).
+    """
+    events_decoder = decoder.get_decoder(json_backend)
+
+    print(f"[PRODUCER] Monitoreando: {directory.path.resolve()}", flush=True)
+
+    for files in directory.batches(stop):
+        for file in files:
             try:
-                with open(file, "r") as f:
-                    data = json.load(f)
-            except json.JSONDecodeError:
+                data = events_decoder.load_batch(file)
+            except decoder.DecodeError:
                 print(f"[PRODUCER] Archivo no JSON válido o vacío: {file.name}", flush=True)
-                seen.add(file.name)
+                directory.archive_files([file])
                 continue
             except Exception as e:
                 print(f"[PRODUCER] Error leyendo {file.name}: {e}", flush=True)
-                seen.add(file.name)
+                directory.archive_files([file])
                 continue
 
-            if not isinstance(data, list):
-                data = [data]
-
-            if data:
-                q.put(data)
-                seen.add(file.name)
-
-        time.sleep(1)
+            if len(data):
+                q.put((file, data))
+            else:
+                directory.archive_files([file])
 
 
 # ---------------------------------------------------------------------
 # Consumidor / Procesamiento de datos
 # ---------------------------------------------------------------------
-def compute(source: str, stop: threading.Event, data_dir: str | None = None, **_: Any) -> Iterator[Result]:
+def compute(
+    source: str,
+    stop: threading.Event,
+    data_dir: str | None = None,
+    ingest: Optional[Dict[str, Any]] = None,
+    checkpoint_dir: str | None = None,
+    checkpoint_interval: float = 5.0,
+    json_backend: str = "auto",
+    service: str = "monitoring",
+    services: Optional[List[str]] = None,
+    **_: Any,
+) -> Iterator[Result]:
     """
     Procesa lotes de la cola, actualiza métricas acumuladas
     y emite resultados (Result) con ventana temporal global.
+
+    Todos los servicios se agregan en una sola pasada (`SuccessRateEngine`):
+    `value` es la tasa de `service` y `breakdown` trae la tasa de cada servicio
+    (o solo de `services`, si se configura).
+
+    `ingest` se pasa tal cual al observador de directorios (`watcher.watch`) y
+    `json_backend` elige el decodificador (`decoder.get_decoder`). Con
+    `checkpoint_dir` las métricas y la posición de ingesta se guardan cada
+    `checkpoint_interval` segundos y se restauran al reiniciar; requiere
+    `ingest.high_water_mark` o `ingest.archive` (ver `checkpoint`).
     """
     q: queue.Queue = queue.Queue()
-    service_metrics: Dict[str, Dict[str, int]] = {}
+    engine = SuccessRateEngine(services)
 
     global_newest_timestamp = 0.0
     global_oldest_timestamp = float("inf")
-
-    producer_thread = threading.Thread(target=producer, args=(source, q, stop), daemon=True)
+    position: Optional[str] = None
+
+    # La posición solo es fiable con nombres ordenables (ver `checkpoint`)
+    track_position = checkpoint.tracks_position(ingest)
+
+    checkpointer = None
+    if checkpoint_dir is not None:
+        checkpoint.require_resumable(ingest)
+        checkpointer = checkpoint.Checkpointer(checkpoint_dir, "task_1", checkpoint_interval)
+        state = checkpointer.load()
+        if state is not None:
+            engine.load_metrics(state["service_metrics"])
+            global_newest_timestamp = state["newest_timestamp"]
+            global_oldest_timestamp = state["oldest_timestamp"]
+            position = state["position"]
+        ingest = checkpoint.resume_ingest(ingest, state)
+
+    def snapshot() -> Dict[str, Any]:
+        return {
+            "service_metrics": engine.to_metrics(),
+            "newest_timestamp": global_newest_timestamp,
+            "oldest_timestamp": global_oldest_timestamp,
+            "position": position,
+        }
+
+    # Con checkpoint, un archivo solo se archiva cuando ya está guardado
+    directory = watcher.DirectoryWatcher(
+        source, defer_archive=checkpointer is not None, **(ingest or {})
+    )
+    unarchived: List[pathlib.Path] = []
+
+    def archive_saved() -> None:
+        directory.archive_files(unarchived)
+        unarchived.clear()
+
+    producer_thread = threading.Thread(target=producer, args=(directory, q, stop, json_backend), daemon=True)
     producer_thread.start()
 
     try:
         while not stop.is_set():
             try:
-                batch: List[Dict[str, Any]] = q.get(timeout=0.1)
+                file, batch = q.get(timeout=0.1)
             except queue.Empty:
                 continue
 
-            newest_timestamp = 0.0
-            oldest_timestamp = float("inf")
+            engine.update(batch)
 
-            for event in batch:
-                process_event(event, service_metrics)
-                ts = event.get("timestamp", 0.0)
-                if ts > newest_timestamp:
-                    newest_timestamp = ts
-                if ts < oldest_timestamp and ts != 0.0:
-                    oldest_timestamp = ts
+            newest_timestamp = batch.newest
+            nonzero = batch.timestamps[batch.timestamps != 0.0]
+            oldest_timestamp = float(nonzero.min()) if len(nonzero) else float("inf")
 
             if newest_timestamp > global_newest_timestamp:
                 global_newest_timestamp = newest_timestamp
             if oldest_timestamp < global_oldest_timestamp and oldest_timestamp != float("inf"):
                 global_oldest_timestamp = oldest_timestamp
+            if track_position and (position is None or file.name > position):
+                position = file.name
+            if checkpointer is not None:
+                unarchived.append(file)
+                if checkpointer.maybe_save(snapshot):
+                    archive_saved()
 
             if global_newest_timestamp > 0.0 and global_oldest_timestamp != float("inf"):
-                target_service = "monitoring"
-                average_value = get_service_success_rate(service_metrics, target_service)
-
                 yield Result(
-                    value=average_value,
+                    value=engine.rate(service),
                     newest_considered=datetime.fromtimestamp(global_newest_timestamp),
                     oldest_considered=datetime.fromtimestamp(global_oldest_timestamp),
+                    breakdown=engine.rates(),
                 )
 
             q.task_done()
@@ -162,6 +306,9 @@ def compute(source: str, stop: threading.Event, data_dir: str | None = None, **_
         # Aseguramos que el productor se detenga correctamente
         stop.set()
         producer_thread.join(timeout=1)
+        if checkpointer is not None:
+            checkpointer.save(snapshot())
+            archive_saved()
 
 
 # ---------------------------------------------------------------------
@@ -1,12 +1,23 @@
+import heapq
 import json
 import os
-import time
-from typing import Dict, Any, Generator, List, Tuple
-from datetime import datetime, timedelta
-# Asumo que domain.py está en el mismo directorio (src)
-from domain import Result 
 import pathlib
 import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Generator, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    from src import checkpoint, decoder, watcher
+    from src.domain import EventBatch, Result  # Para entorno de paquete
+except ModuleNotFoundError:
+    # Asumo que domain.py está en el mismo directorio (src)
+    import checkpoint
+    import decoder
+    import watcher
+    from domain import EventBatch, Result
 
 # The sliding window is 60 seconds (1 minute)
 SLIDING_WINDOW_SECONDS = 60
@@ -14,111 +25,546 @@ SLIDING_WINDOW_SECONDS = 60
 
 def is_failure(log_event: Dict[str, Any]) -> bool:
     """Checks if a log event represents a failure (i.e., not a 200 HTTP status)."""
-    message = log_event.get("message", "")
-    return "HTTP Status Code: 200" not in message
+    return "HTTP Status Code: 200" not in log_event["message"]
+
+
+def failure_timestamps(batch: EventBatch) -> Dict[str, np.ndarray]:
+    """Vectorized counterpart of `is_failure`: failure timestamps per service."""
+    failures = batch.status != 200
+    failed_services = batch.service_ids[failures]
+    failed_timestamps = batch.timestamps[failures]
+    return {
+        service: failed_timestamps[failed_services == service_id]
+        for service_id, service in enumerate(batch.services)
+        if (failed_services == service_id).any()
+    }
+
+
+class FailureWindow:
+    """
+    Failure timestamps per service, kept sorted in one deque per service.
+
+    Only the timestamps are retained. Advancing the window pops expired
+    entries from the left, so each timestamp is appended and removed exactly
+    once: O(1) amortized per failure instead of rebuilding every list on
+    every batch. Late timestamps that still fall inside the window go to a
+    per-service min-heap instead of being inserted into the deque (O(window)
+    each): counting and expiry only need the oldest entry, so a late failure
+    costs O(log window). Those already older than the window start are dropped.
+    """
+
+    def __init__(self, window_seconds: float = SLIDING_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self.window_start = float("-inf")
+        self.window_end = float("-inf")
+        self._failures: Dict[str, Deque[float]] = {}
+        self._late: Dict[str, List[float]] = {}
+
+    def add(self, service: str, timestamps: Iterable[float]) -> None:
+        ordered = np.sort(np.asarray(timestamps, dtype=np.float64))
+        ordered = ordered[ordered >= self.window_start]
+        if not len(ordered):
+            return
+
+        window = self._failures.setdefault(service, deque())
+        split = int(np.searchsorted(ordered, window[-1])) if window else 0
+        if split:
+            late = self._late.setdefault(service, [])
+            for ts in ordered[:split].tolist():
+                heapq.heappush(late, ts)
+        window.extend(ordered[split:].tolist())  # In-order arrivals
+
+    def advance(self, window_end: float) -> float:
+        """Moves the window to end at `window_end` and returns its start."""
+        self.window_end = max(self.window_end, window_end)
+        self.window_start = max(self.window_start, window_end - self.window_seconds)
+        for service in list(self._failures):  # Copy to allow deletion
+            window = self._failures[service]
+            while window and window[0] < self.window_start:
+                window.popleft()
+            late = self._late.get(service)
+            while late and late[0] < self.window_start:
+                heapq.heappop(late)
+            if not late:
+                self._late.pop(service, None)
+            if not window and not late:
+                del self._failures[service]
+        return self.window_start
+
+    def count(self, service: str) -> int:
+        return len(self._failures.get(service, ())) + len(self._late.get(service, ()))
+
+    def to_state(self) -> Dict[str, List[float]]:
+        return {
+            service: list(heapq.merge(window, sorted(self._late.get(service, ()))))
+            for service, window in self._failures.items()
+        }
+
+    def load_state(self, state: Dict[str, List[float]]) -> None:
+        for service, timestamps in state.items():
+            self.add(service, timestamps)
+
+
+# Bucket id of the unused slots of a ring
+_NO_BUCKET = np.iinfo(np.int64).min
+
+
+def bucket_counts(buckets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct bucket ids (sorted) and how many entries fall in each."""
+    low = int(buckets.min())
+    span = int(buckets.max()) - low + 1
+    if span <= 4 * len(buckets):
+        # Dense batch (the usual case): a bincount is cheaper than sorting
+        totals = np.bincount(buckets - low, minlength=span)
+        present = np.flatnonzero(totals)
+        return present + low, totals[present]
+    return np.unique(buckets, return_counts=True)
+
+
+class BucketedFailureWindow:
+    """
+    Failure counts per service in fixed time buckets, driven by a watermark.
+
+    Like task_6's `withWatermark`, the watermark trails the newest event time
+    seen by `allowed_lateness` seconds and the reported window is the one that
+    ends at the watermark, so events up to `allowed_lateness` late still land
+    in their bucket before it is reported. Events older than the window start
+    are too late: they are dropped and counted in `late_events`.
+
+    Each service keeps a ring of `window + lateness` buckets (as NumPy
+    arrays), so memory is bounded by window / bucket size, not by the number
+    of events, and each batch is first reduced to one count per bucket.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = SLIDING_WINDOW_SECONDS,
+        bucket_seconds: float = 1.0,
+        allowed_lateness: float = 0.0,
+    ):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.allowed_lateness = allowed_lateness
+        self.window_buckets = max(1, int(np.ceil(window_seconds / bucket_seconds)))
+        # Live buckets span at most the window plus the lateness (plus edges)
+        self.capacity = self.window_buckets + int(np.ceil(allowed_lateness / bucket_seconds)) + 2
+
+        self.max_event_time = float("-inf")
+        self.window_start = float("-inf")
+        self.window_end = float("-inf")
+        self.late_events = 0
+        self._low = _NO_BUCKET + 1  # First bucket of the reported window
+        self._high = _NO_BUCKET + 1  # Bucket that contains the watermark
+        self._rings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def advance(self, newest: float) -> float:
+        """Moves the watermark to `newest - allowed_lateness`; returns the window start."""
+        if newest > self.max_event_time:
+            self.max_event_time = newest
+            self.window_end = newest - self.allowed_lateness
+            self._high = int(np.floor(self.window_end / self.bucket_seconds))
+            self._low = self._high - self.window_buckets + 1
+            self.window_start = self._low * self.bucket_seconds
+        return self.window_start
+
+    def _ring(self, service: str) -> Tuple[np.ndarray, np.ndarray]:
+        ring = self._rings.get(service)
+        if ring is None:
+            ids = np.full(self.capacity, _NO_BUCKET, dtype=np.int64)
+            ring = self._rings[service] = (ids, np.zeros(self.capacity, dtype=np.int64))
+        return ring
+
+    def _insert(self, service: str, buckets: np.ndarray, counts: np.ndarray) -> None:
+        # `buckets` are distinct and live, so their slots are distinct too
+        ids, totals = self._ring(service)
+        slots = buckets % self.capacity
+        # A slot still holding another bucket holds an expired one: recycle it
+        stale = ids[slots] != buckets
+        totals[slots[stale]] = 0
+        ids[slots[stale]] = buckets[stale]
+        totals[slots] += counts
+
+    def add(self, service: str, timestamps: Iterable[float]) -> None:
+        values = np.asarray(timestamps, dtype=np.float64)
+        if not len(values):
+            return
+        buckets = np.floor(values / self.bucket_seconds).astype(np.int64)
+        self.add_buckets(service, *bucket_counts(buckets), newest=float(values.max()))
+
+    def add_buckets(
+        self, service: str, buckets: np.ndarray, counts: np.ndarray, newest: float
+    ) -> None:
+        """Adds pre-aggregated failures: `counts[i]` failures in bucket `buckets[i]`."""
+        # Events are judged against the watermark before this batch, as Spark does
+        on_time = buckets >= self._low
+        self.late_events += int(counts[~on_time].sum())
+        buckets, counts = buckets[on_time], counts[on_time]
+        if not len(buckets):
+            return
+        # Advancing first keeps every live bucket inside the ring's span;
+        # buckets the batch itself pushes out of the window are just expired
+        self.advance(newest)
+        live = buckets >= self._low
+        if live.any():
+            self._insert(service, buckets[live], counts[live])
+
+    def count(self, service: str) -> int:
+        return self.count_buckets(service, self._low, self._high)
+
+    def count_buckets(self, service: str, low: int, high: int) -> int:
+        """Failures of `service` in the live buckets `low..high` (inclusive)."""
+        ring = self._rings.get(service)
+        if ring is None:
+            return 0
+        ids, totals = ring
+        return int(totals[(ids >= max(low, self._low)) & (ids <= high)].sum())
+
+    def to_state(self) -> Dict[str, Any]:
+        buckets = {}
+        for service, (ids, totals) in self._rings.items():
+            live = (ids >= self._low) & (totals > 0)
+            buckets[service] = np.stack([ids[live], totals[live]], axis=1).tolist()
+        return {
+            "max_event_time": self.max_event_time,
+            "late_events": self.late_events,
+            "buckets": buckets,
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        self.advance(state["max_event_time"])
+        self.late_events = state["late_events"]
+        for service, pairs in state["buckets"].items():
+            if pairs:
+                ids, totals = np.asarray(pairs, dtype=np.int64).T
+                keep = ids >= self._low
+                self._insert(service, ids[keep], totals[keep])
+
+
+class MultiHorizonFailureWindow:
+    """
+    Several window lengths (e.g. 1m/5m/15m/1h) kept in one pass.
+
+    Two bucket levels share the same watermark: fine buckets of
+    `bucket_seconds` covering the horizons up to `rollup_seconds`, and
+    roll-up buckets of `rollup_seconds` covering the longest horizon. Each
+    failure is added to both levels, so an extra horizon costs one masked
+    sum over a few dozen buckets instead of another copy of the task.
+
+    Horizons up to `rollup_seconds` are exact to the bucket. Longer ones
+    start on a roll-up boundary (they cover between `horizon - rollup_seconds`
+    and `horizon` seconds) and take the current, still open roll-up bucket
+    from the fine level so events past the watermark are not counted early.
+    """
+
+    def __init__(
+        self,
+        horizons: Iterable[float] = (SLIDING_WINDOW_SECONDS,),
+        bucket_seconds: float = 1.0,
+        rollup_seconds: float = 60.0,
+        allowed_lateness: float = 0.0,
+    ):
+        self.horizons = list(horizons)
+        if not self.horizons:
+            raise ValueError("At least one window length is required")
+        self.primary = self.horizons[0]
+
+        ratio = rollup_seconds / bucket_seconds
+        if ratio < 1 or not np.isclose(ratio, round(ratio)):
+            raise ValueError("rollup_seconds must be a multiple of bucket_seconds")
+        self.buckets_per_rollup = int(round(ratio))
+        self.rollup_seconds = rollup_seconds
+
+        fine_span = max([h for h in self.horizons if h <= rollup_seconds] + [rollup_seconds])
+        self.fine = BucketedFailureWindow(fine_span, bucket_seconds, allowed_lateness)
+        self.coarse: Optional[BucketedFailureWindow] = None
+        if max(self.horizons) > fine_span:
+            self.coarse = BucketedFailureWindow(
+                max(self.horizons), rollup_seconds, allowed_lateness
+            )
+
+    @property
+    def window_end(self) -> float:
+        return self.fine.window_end
+
+    @property
+    def late_events(self) -> int:
+        # Late for the longest horizon (the fine level drops earlier on purpose)
+        return (self.coarse or self.fine).late_events
+
+    def _levels(self) -> List[BucketedFailureWindow]:
+        return [self.fine] if self.coarse is None else [self.fine, self.coarse]
+
+    def add(self, service: str, timestamps: Iterable[float]) -> None:
+        values = np.asarray(timestamps, dtype=np.float64)
+        if not len(values):
+            return
+        newest = float(values.max())
+        buckets, counts = bucket_counts(
+            np.floor(values / self.fine.bucket_seconds).astype(np.int64)
+        )
+        self.fine.add_buckets(service, buckets, counts, newest)
+        if self.coarse is not None:
+            # Roll-up: the (sorted) fine counts are summed into coarse buckets
+            rolled = buckets // self.buckets_per_rollup
+            starts = np.flatnonzero(np.r_[True, rolled[1:] != rolled[:-1]])
+            self.coarse.add_buckets(
+                service, rolled[starts], np.add.reduceat(counts, starts), newest
+            )
 
+    def advance(self, newest: float) -> float:
+        for level in self._levels():
+            level.advance(newest)
+        return self.window_start()
 
-# Define un tipo para las métricas:
-# {service_name: [(timestamp, log_event), ...]}
-ServiceMetrics = Dict[str, List[Tuple[float, Dict[str, Any]]]]
+    def _rollup_for(self, horizon: float) -> Optional[BucketedFailureWindow]:
+        """The roll-up level if `horizon` is longer than the fine level covers."""
+        if self.coarse is not None and horizon > self.fine.window_seconds:
+            return self.coarse
+        return None
 
+    def window_start(self, horizon: Optional[float] = None) -> float:
+        horizon = self.primary if horizon is None else horizon
+        coarse = self._rollup_for(horizon)
+        if coarse is not None:
+            low = coarse._high - int(np.ceil(horizon / self.rollup_seconds)) + 1
+            return low * self.rollup_seconds
+        fine = self.fine
+        return (fine._high - int(np.ceil(horizon / fine.bucket_seconds)) + 1) * fine.bucket_seconds
 
-def compute(data_path: str, stop_event: threading.Event, **kwargs) -> Generator[Result, None, None]:
+    def count(self, service: str, horizon: Optional[float] = None) -> int:
+        horizon = self.primary if horizon is None else horizon
+        fine = self.fine
+        coarse = self._rollup_for(horizon)
+        if coarse is None:
+            low = fine._high - int(np.ceil(horizon / fine.bucket_seconds)) + 1
+            return fine.count_buckets(service, low, fine._high)
+
+        # Closed roll-up buckets, then the open one from the fine level
+        open_bucket = coarse._high
+        low = open_bucket - int(np.ceil(horizon / self.rollup_seconds)) + 1
+        closed = coarse.count_buckets(service, low, open_bucket - 1)
+        current = fine.count_buckets(service, open_bucket * self.buckets_per_rollup, fine._high)
+        return closed + current
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "fine": self.fine.to_state(),
+            "coarse": None if self.coarse is None else self.coarse.to_state(),
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        self.fine.load_state(state["fine"])
+        if self.coarse is not None and state["coarse"] is not None:
+            self.coarse.load_state(state["coarse"])
+
+
+Window = Union[FailureWindow, MultiHorizonFailureWindow]
+
+
+def horizon_label(seconds: float) -> str:
+    """Short label for a window length: 60 -> '1m', 3600 -> '1h', 45 -> '45s'."""
+    for unit, size in (("h", 3600), ("m", 60)):
+        if seconds >= size and seconds % size == 0:
+            return f"{int(seconds // size)}{unit}"
+    return f"{seconds:g}s"
+
+
+def make_window(
+    engine: Optional[str] = None,
+    windows: Iterable[float] = (SLIDING_WINDOW_SECONDS,),
+    bucket_seconds: Optional[float] = None,
+    rollup_seconds: Optional[float] = None,
+    allowed_lateness: Optional[float] = None,
+) -> Window:
+    """
+    Builds the failure window for the `engine` config key.
+
+    Without an explicit engine a single window is exact and several windows
+    use the bucketed multi-horizon structure. The exact window has no
+    buckets and no watermark, so setting `bucket_seconds`, `rollup_seconds`
+    or `allowed_lateness` also selects "bucketed", and passing them with
+    engine="exact" is an error. Unset options keep the bucketed defaults.
+    """
+    windows = list(windows)
+    options = {
+        name: value
+        for name, value in (
+            ("bucket_seconds", bucket_seconds),
+            ("rollup_seconds", rollup_seconds),
+            ("allowed_lateness", allowed_lateness),
+        )
+        if value is not None
+    }
+    if engine is None:
+        engine = "exact" if len(windows) == 1 and not options else "bucketed"
+    if engine == "exact":
+        if len(windows) != 1:
+            raise ValueError("The exact engine supports a single window; use engine='bucketed'")
+        if options:
+            raise ValueError(f"The exact engine ignores {', '.join(options)}; use engine='bucketed'")
+        return FailureWindow(windows[0])
+    if engine == "bucketed":
+        return MultiHorizonFailureWindow(windows, **options)
+    raise ValueError(f"Invalid window engine: {engine}")
+
+
+def compute(
+    data_path: str,
+    stop_event: threading.Event,
+    ingest: Optional[Dict[str, Any]] = None,
+    checkpoint_dir: Optional[str] = None,
+    checkpoint_interval: float = 5.0,
+    json_backend: str = "auto",
+    engine: Optional[str] = None,
+    windows: Optional[List[float]] = None,
+    bucket_seconds: Optional[float] = None,
+    rollup_seconds: Optional[float] = None,
+    allowed_lateness: Optional[float] = None,
+    **kwargs: Any,
+) -> Generator[Result, None, None]:
     """
     Computes the number of 'monitoring' service failures in a 60-second sliding window 
     by continuously watching for new log files.
     
-    Note: The original implementation lacked the 'stop_event' argument 
-    required by the main application logic. It has been added here.
+    New files are delivered in batches by the shared directory watcher; `ingest`
+    is forwarded to `watcher.watch` unchanged and `json_backend` selects the
+    decoder (see `decoder.get_decoder`). With `checkpoint_dir` the failure
+    timestamps and the ingestion position are snapshotted every
+    `checkpoint_interval` seconds and restored on restart; this requires
+    `ingest.high_water_mark` or `ingest.archive` (see `checkpoint`), and with
+    `archive` a file is only archived once a checkpoint covering it is saved.
+
+    `engine` selects the window: "exact" keeps every failure timestamp and
+    ends the window at the newest event; "bucketed" keeps per-service counts
+    in `bucket_seconds` buckets and ends the window at the watermark (newest
+    event minus `allowed_lateness`), so out-of-order events from the
+    generator's jitter are still counted in their bucket. Without `engine`,
+    setting any of the bucketed options selects "bucketed" (see `make_window`).
+
+    `windows` lists several window lengths in seconds (e.g. [60, 300, 900,
+    3600]); they are kept together in one `MultiHorizonFailureWindow` whose
+    fine buckets roll up into `rollup_seconds` buckets. The first length is
+    the reported value and every length gets a `failures_<label>` entry in
+    the result breakdown.
     """
-    failure_window: ServiceMetrics = {}
-    processed_files = set()
+    windows = list(windows or [SLIDING_WINDOW_SECONDS])
+    failure_window = make_window(
+        engine, windows, bucket_seconds, rollup_seconds, allowed_lateness
+    )
+    # The checkpoint only restores a window built with the same layout: bucket
+    # ids saved at another scale would be loaded as wrong counts
+    layout = {
+        "engine": type(failure_window).__name__,
+        "windows": windows,
+        "bucket_seconds": bucket_seconds,
+        "rollup_seconds": rollup_seconds,
+        "allowed_lateness": allowed_lateness,
+    }
     newest_timestamp = 0.0
+    position: Optional[str] = None
     
     # Inicializa oldest_timestamp solo si es necesario, 
     # pero para el cálculo de la ventana, solo necesitamos newest_timestamp.
 
-    while not stop_event.is_set():
-        # Get list of files in directory
-        try:
-            current_files = set(os.listdir(data_path))
-        except FileNotFoundError:
-            print(f"Error: Directory not found at {data_path}")
-            time.sleep(1)
-            continue
-            
-        new_files = sorted(list(current_files - processed_files))
-
-        if new_files:
-            new_data_processed = False
-            for file_name in new_files:
-                file_path = os.path.join(data_path, file_name)
+    events_decoder = decoder.get_decoder(json_backend)
+
+    # Position is only reliable with sortable names (see `checkpoint`)
+    track_position = checkpoint.tracks_position(ingest)
+
+    checkpointer = None
+    if checkpoint_dir is not None:
+        checkpoint.require_resumable(ingest)
+        checkpointer = checkpoint.Checkpointer(checkpoint_dir, "task_2", checkpoint_interval)
+        state = checkpointer.load()
+        if state is not None:
+            if state.get("layout", layout) == layout:
+                failure_window.load_state(state["failures"])
+            else:
+                print("[CHECKPOINT] Ventana guardada con otra configuración, se reinicia", flush=True)
+            newest_timestamp = state["newest_timestamp"]
+            position = state["position"]
+        ingest = checkpoint.resume_ingest(ingest, state)
+
+    def snapshot() -> Dict[str, Any]:
+        return {
+            "layout": layout,
+            "failures": failure_window.to_state(),
+            "newest_timestamp": newest_timestamp,
+            "position": position,
+        }
 
+    directory = watcher.DirectoryWatcher(
+        data_path, defer_archive=checkpointer is not None, **(ingest or {})
+    )
+    # Files processed since the last checkpoint, archived once it is saved
+    unarchived: List[pathlib.Path] = []
+
+    def archive_saved() -> None:
+        directory.archive_files(unarchived)
+        unarchived.clear()
+
+    try:
+        for new_files in directory.batches(stop_event):
+            new_data_processed = False
+            for file_path in new_files:
                 try:
-                    with open(file_path, 'r') as f:
-                        log_events = json.load(f)
+                    batch = events_decoder.load_batch(file_path)
                 except Exception as e:
                     # Ignorar archivos que no son JSON válidos o no se pueden abrir
-                    print(f"Skipping file {file_name} due to error: {e}")
+                    print(f"Skipping file {file_path.name} due to error: {e}")
+                    continue
+                if not len(batch):
                     continue
-
-                if not isinstance(log_events, list):
-                    log_events = [log_events]
 
                 # 1. Process events and update metrics
-                for event in log_events:
-                    ts = event.get("timestamp", 0.0)
-                    service_name = event.get("service")
-
-                    # Update newest considered timestamp
-                    if ts > newest_timestamp:
-                        newest_timestamp = ts
-                        new_data_processed = True
-                        
-                    if service_name and is_failure(event):
-                        if service_name not in failure_window:
-                            failure_window[service_name] = []
-                        failure_window[service_name].append((ts, event))
-
-                processed_files.add(file_name)
-            
+                # Update newest considered timestamp
+                if batch.newest > newest_timestamp:
+                    newest_timestamp = batch.newest
+                    new_data_processed = True
+
+                for service_name, timestamps in failure_timestamps(batch).items():
+                    failure_window.add(service_name, timestamps)
+        
+            if track_position and new_files and (position is None or new_files[-1].name > position):
+                position = new_files[-1].name
+            if checkpointer is not None:
+                unarchived.extend(new_files)
+
             # 2. Compute sliding window statistics only if new data was processed
             if new_data_processed and newest_timestamp > 0.0:
-                window_end_time = newest_timestamp
-                window_start_time = window_end_time - SLIDING_WINDOW_SECONDS
-                
-                # Prune old events and count failures in the window
-                for service in list(failure_window.keys()): # Iterate over a copy to allow deletion
-                    failure_window[service] = [
-                        (ts, event)
-                        for ts, event in failure_window[service]
-                        if ts >= window_start_time
-                    ]
-                    if not failure_window[service]:
-                        del failure_window[service]
+                # Slide the window: expired failures are popped from the left
+                window_start_time = failure_window.advance(newest_timestamp)
+
+                if checkpointer is not None and checkpointer.maybe_save(snapshot):
+                    archive_saved()
 
                 # Calculate the metric (failures in 'monitoring' service)
-                monitoring_failures_count = len(failure_window.get("monitoring", []))
+                monitoring_failures_count = failure_window.count("monitoring")
                 average_value = float(monitoring_failures_count) 
 
-                # Prepare the result timestamps
-                newest_dt = datetime.fromtimestamp(newest_timestamp)
+                # Prepare the result timestamps (the bucketed window ends at the watermark)
+                newest_dt = datetime.fromtimestamp(failure_window.window_end)
                 oldest_dt = datetime.fromtimestamp(window_start_time)
 
+                breakdown = {}
+                if isinstance(failure_window, MultiHorizonFailureWindow):
+                    for horizon in failure_window.horizons:
+                        breakdown[f"failures_{horizon_label(horizon)}"] = float(
+                            failure_window.count("monitoring", horizon)
+                        )
+                    breakdown["late_events"] = float(failure_window.late_events)
+
                 # 3. Yield the result
                 yield Result(
                     value=average_value,
                     newest_considered=newest_dt,
                     oldest_considered=oldest_dt,
+                    breakdown=breakdown,
                 )
-            
-            # Add a small delay to prevent high CPU usage when no new files are found
-            if not new_files:
-                time.sleep(0.1)
-                
-        else:
-            # If no new files, wait a bit before checking again
-            time.sleep(0.5)
+    finally:
+        if checkpointer is not None:
+            checkpointer.save(snapshot())
+            archive_saved()
 
 # --- Bloque de Prueba (Descomentar para ejecutar task_2.py directamente) ---
 
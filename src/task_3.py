@@ -1,118 +1,684 @@
-import time
-import uuid
+import concurrent.futures
+import datetime
 import json
+import math
+import os
 import pathlib
-import threading
 import queue
-import datetime
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
 import numpy as np
-from collections import Counter
-from typing import Iterator, Any
 
 try:
-    from . import domain
+    from . import checkpoint, decoder, domain, watcher
+    from .published import Published
 except ImportError:
+    import checkpoint
+    import decoder
     import domain
+    import watcher
+    from published import Published
+
+
+class ModeCounter:
+    """Frecuencias de los códigos con la moda mantenida en O(1).
+
+    Además de `counts` (código -> frecuencia) se agrupan los códigos por
+    frecuencia en `_buckets`; como cada alta o baja mueve un código a la
+    frecuencia contigua, la máxima solo puede cambiar en uno y la moda se
+    consulta sin recorrer el reservorio.
+    """
+
+    def __init__(self) -> None:
+        self.counts: dict[int, int] = {}
+        # Frecuencia -> códigos con esa frecuencia (dict como conjunto ordenado)
+        self._buckets: dict[int, dict[int, None]] = {}
+        self.max_count = 0
+
+    def _move(self, code: int, old: int, new: int) -> None:
+        if old:
+            bucket = self._buckets[old]
+            del bucket[code]
+            if not bucket:
+                del self._buckets[old]
+        if new:
+            self._buckets.setdefault(new, {})[code] = None
+            self.counts[code] = new
+        else:
+            del self.counts[code]
+
+    def add(self, code: int) -> None:
+        count = self.counts.get(code, 0)
+        self._move(code, count, count + 1)
+        if count + 1 > self.max_count:
+            self.max_count = count + 1
+
+    def remove(self, code: int) -> None:
+        count = self.counts[code]
+        self._move(code, count, count - 1)
+        if count == self.max_count and self.max_count not in self._buckets:
+            self.max_count -= 1
+
+    def replace(self, old: int, new: int) -> None:
+        if old != new:
+            self.add(new)
+            self.remove(old)
+
+    def mode(self) -> int | None:
+        """Código más frecuente (entre empates, el que llegó antes a esa frecuencia)."""
+        if not self.max_count:
+            return None
+        return next(iter(self._buckets[self.max_count]))
+
+
+class SkipReservoir:
+    """Muestreo de reservorio con saltos geométricos (Algoritmo L de Vitter).
+
+    En lugar de sortear un número por evento, se sortea cuántos eventos saltar
+    hasta el próximo que entra al reservorio. Con un lote se salta
+    directamente a ese índice, así que n eventos cuestan O(k log(n/k))
+    sorteos en lugar de O(n).
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.sample: list[int] = []
+        self.seen = 0  # Eventos vistos en total
+        self.w = 1.0  # Umbral actual del algoritmo (la mayor clave del reservorio)
+        self.next_index = 0  # Índice global del próximo evento que entra
+        self.frequencies = ModeCounter()
+
+    def _schedule(self) -> None:
+        """Sortea el salto hasta el próximo evento que reemplaza a uno del reservorio."""
+        skip = math.floor(math.log(1.0 - np.random.random()) / math.log1p(-self.w))
+        self.next_index += skip + 1
+
+    def _start(self) -> None:
+        # El reservorio acaba de llenarse con los eventos 0..size-1
+        self.w = math.exp(math.log(1.0 - np.random.random()) / self.size)
+        self.next_index = self.size - 1
+        self._schedule()
+
+    def update(self, codes: np.ndarray) -> None:
+        """Procesa un lote de códigos, en orden, a continuación de los ya vistos."""
+        start = self.seen
+        self.seen += len(codes)
+        if self.size <= 0:
+            return
+
+        fill = min(max(self.size - len(self.sample), 0), len(codes))
+        if fill:
+            added = codes[:fill].tolist()
+            self.sample.extend(added)
+            for code in added:
+                self.frequencies.add(code)
+            if len(self.sample) == self.size:
+                self._start()
+
+        while len(self.sample) == self.size and self.next_index < self.seen:
+            slot = np.random.randint(self.size)
+            code = int(codes[self.next_index - start])
+            self.frequencies.replace(self.sample[slot], code)
+            self.sample[slot] = code
+            self.w *= math.exp(math.log(1.0 - np.random.random()) / self.size)
+            self._schedule()
+
+    def mode(self) -> int | None:
+        return self.frequencies.mode()
+
+    def update_batch(self, batch: domain.EventBatch) -> None:
+        self.update(batch.status[batch.status != domain.NO_STATUS])
+
+    def breakdown(self) -> dict[str, float]:
+        return {}
+
+    def summary(self) -> str:
+        # Solo el inicio del reservorio si es grande
+        sample = self.sample
+        content = f"{sample[:20]}..." if len(sample) > 20 else f"{sample}"
+        return f"[Reservoir Update] Size: {len(sample)}/{self.size} | Content: {content} | Total events: {self.seen}"
+
+    def merge(self, other: "SkipReservoir") -> "SkipReservoir":
+        """Reservorio uniforme de la unión de dos flujos disjuntos.
+
+        Una muestra uniforme de k elementos de n1 + n2 toma de la primera
+        parte una cantidad hipergeométrica(n1, n2, k); dada esa cantidad, se
+        eligen uniformemente de cada reservorio (que ya es uniforme en su parte).
+        """
+        if other.size != self.size:
+            raise ValueError("Only reservoirs of the same size can be merged")
+        total = self.seen + other.seen
+        take = min(self.size, total)
+        from_self = int(np.random.hypergeometric(self.seen, other.seen, take)) if take else 0
+
+        chosen = [self.sample[i] for i in np.random.choice(len(self.sample), from_self, replace=False)]
+        chosen += [other.sample[i] for i in np.random.choice(len(other.sample), take - from_self, replace=False)]
+        merged = SkipReservoir(self.size)
+        # Sin estado de salto: `load_state` lo sortea para el total combinado
+        merged.load_state({"sample": chosen, "count": total})
+        return merged
+
+    def to_state(self) -> dict[str, Any]:
+        return {"sample": list(self.sample), "count": self.seen, "w": self.w, "next": self.next_index}
+
+    def load_state(self, state: dict[str, Any]) -> None:
+        self.sample[:] = state["sample"][: self.size]
+        self.seen = state["count"]
+        self.frequencies = ModeCounter()
+        for code in self.sample:
+            self.frequencies.add(code)
+        if len(self.sample) < self.size or self.size <= 0:
+            return
+        if "w" in state and len(state["sample"]) == self.size:
+            self.w = state["w"]
+            self.next_index = state["next"]
+        else:
+            # Checkpoint sin el estado del salto (o de otro tamaño): dado un
+            # reservorio uniforme, el umbral es la k-ésima menor de `seen`
+            # claves uniformes, que sigue una Beta(k, seen - k + 1).
+            self.w = float(np.random.beta(self.size, self.seen - self.size + 1))
+            self.next_index = self.seen - 1
+            self._schedule()
+
+
+class SpaceSaving:
+    """Resumen Space-Saving de los códigos más frecuentes, con memoria acotada.
+
+    Guarda como mucho `capacity` contadores. El conteo de un código puede
+    sobrestimar el real en a lo sumo su `error` (el real está en
+    `[count - error, count]`) y un código ausente aparece como mucho
+    `max_error <= total / capacity` veces, así que todo código con más de
+    `total / capacity` apariciones está en el resumen. Dos resúmenes se
+    pueden combinar con `merge`.
+    """
+
+    def __init__(self, capacity: int = 16):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.total = 0
+        self.counts: dict[int, int] = {}
+        self.errors: dict[int, int] = {}
+
+    def add(self, code: int, weight: int = 1) -> None:
+        self.total += weight
+        if code in self.counts:
+            self.counts[code] += weight
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[code] = weight
+            self.errors[code] = 0
+            return
+        # Resumen lleno: el nuevo código hereda el contador mínimo como error
+        victim = min(self.counts, key=self.counts.__getitem__)
+        floor = self.counts.pop(victim)
+        del self.errors[victim]
+        self.counts[code] = floor + weight
+        self.errors[code] = floor
+
+    def update(self, codes: np.ndarray) -> None:
+        """Agrega un lote: un `add` ponderado por código distinto."""
+        values, weights = np.unique(codes, return_counts=True)
+        for code, weight in zip(values.tolist(), weights.tolist(), strict=True):
+            self.add(code, weight)
+
+    @property
+    def max_error(self) -> int:
+        """Cota de apariciones de cualquier código que no está en el resumen."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def top(self, k: int | None = None) -> list[tuple[int, int, int]]:
+        """Los `k` códigos más frecuentes como `(código, conteo, error)`."""
+        ranked = sorted(self.counts, key=lambda code: (-self.counts[code], code))
+        return [(code, self.counts[code], self.errors[code]) for code in ranked[:k]]
+
+    def mode(self) -> int | None:
+        top = self.top(1)
+        return top[0][0] if top else None
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Combina dos resúmenes (p. ej. de trabajadores en paralelo)."""
+        # Un código ausente en un resumen lleno pudo aparecer hasta su `max_error` veces
+        floor, other_floor = self.max_error, other.max_error
+        merged = SpaceSaving(max(self.capacity, other.capacity))
+        merged.total = self.total + other.total
+        candidates = {}
+        for code in self.counts.keys() | other.counts.keys():
+            count = self.counts.get(code, floor) + other.counts.get(code, other_floor)
+            error = self.errors.get(code, floor) + other.errors.get(code, other_floor)
+            candidates[code] = (count, error)
+        kept = sorted(candidates, key=lambda code: (-candidates[code][0], code))[: merged.capacity]
+        for code in kept:
+            merged.counts[code], merged.errors[code] = candidates[code]
+        return merged
+
+    def to_state(self) -> dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "counters": [list(entry) for entry in self.top()],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "SpaceSaving":
+        sketch = cls(state["capacity"])
+        sketch.total = state["total"]
+        for code, count, error in state["counters"]:
+            sketch.counts[code] = count
+            sketch.errors[code] = error
+        return sketch
+
+
+class HeavyHitters:
+    """Códigos más frecuentes, global y por servicio, con resúmenes Space-Saving."""
+
+    def __init__(self, capacity: int = 16, top_k: int = 3):
+        self.capacity = capacity
+        self.top_k = top_k
+        self.overall = SpaceSaving(capacity)
+        self.by_service: dict[str, SpaceSaving] = {}
+
+    @property
+    def seen(self) -> int:
+        return self.overall.total
+
+    def update_batch(self, batch: domain.EventBatch) -> None:
+        valid = batch.status != domain.NO_STATUS
+        codes = batch.status[valid]
+        self.overall.update(codes)
+
+        # Pares (servicio, código) contados de una vez: un add por par distinto
+        pairs = (batch.service_ids[valid].astype(np.int64) << 16) | codes.astype(np.int64)
+        values, weights = np.unique(pairs, return_counts=True)
+        for pair, weight in zip(values.tolist(), weights.tolist(), strict=True):
+            service = batch.services[pair >> 16]
+            sketch = self.by_service.get(service)
+            if sketch is None:
+                sketch = self.by_service[service] = SpaceSaving(self.capacity)
+            sketch.add(pair & 0xFFFF, weight)
 
+    def mode(self) -> int | None:
+        return self.overall.mode()
 
-def compute (source: str, stop: threading.Event, reservoir_size: int = 10, **_: Any) -> Iterator[domain.Result]:
-    sample : list[str] = []
+    def breakdown(self) -> dict[str, float]:
+        values: dict[str, float] = {}
+        for code, count, error in self.overall.top(self.top_k):
+            values[f"status {code}"] = float(count)
+            values[f"status {code} error"] = float(error)
+        values["max_error"] = float(self.overall.max_error)
+        for service, sketch in sorted(self.by_service.items()):
+            service_mode = sketch.mode()
+            if service_mode is not None:
+                values[f"{service} mode"] = float(service_mode)
+            for code, count, error in sketch.top(self.top_k):
+                values[f"{service} status {code}"] = float(count)
+                values[f"{service} status {code} error"] = float(error)
+        return values
+
+    def merge(self, other: "HeavyHitters") -> "HeavyHitters":
+        merged = HeavyHitters(max(self.capacity, other.capacity), self.top_k)
+        merged.overall = self.overall.merge(other.overall)
+        for service in self.by_service.keys() | other.by_service.keys():
+            mine = self.by_service.get(service, SpaceSaving(self.capacity))
+            theirs = other.by_service.get(service, SpaceSaving(other.capacity))
+            merged.by_service[service] = mine.merge(theirs)
+        return merged
+
+    def summary(self) -> str:
+        return f"[Heavy Hitters] Top: {self.overall.top(self.top_k)} | Total events: {self.seen}"
+
+    def to_state(self) -> dict[str, Any]:
+        return {
+            "overall": self.overall.to_state(),
+            "by_service": {service: sketch.to_state() for service, sketch in self.by_service.items()},
+        }
+
+    def load_state(self, state: dict[str, Any]) -> None:
+        self.overall = SpaceSaving.from_state(state["overall"])
+        self.by_service = {
+            service: SpaceSaving.from_state(sketch) for service, sketch in state["by_service"].items()
+        }
+
+
+def merge_estimators(
+    first: SkipReservoir | HeavyHitters, second: SkipReservoir | HeavyHitters
+) -> SkipReservoir | HeavyHitters:
+    """Combina dos estimadores del mismo modo con su `merge`."""
+    if isinstance(first, SkipReservoir) and isinstance(second, SkipReservoir):
+        return first.merge(second)
+    if isinstance(first, HeavyHitters) and isinstance(second, HeavyHitters):
+        return first.merge(second)
+    raise ValueError("Only estimators of the same mode can be merged")
+
+
+def make_estimator(
+    mode: str,
+    reservoir_size: int,
+    sketch_size: int,
+    top_k: int,
+) -> SkipReservoir | HeavyHitters:
+    """Estimador del código más común según la clave `mode` del config."""
+    if mode == "reservoir":
+        return SkipReservoir(reservoir_size)
+    if mode == "space_saving":
+        return HeavyHitters(sketch_size, top_k)
+    raise ValueError(f"Invalid mode: {mode}")
+
+
+@dataclass
+class Partial:
+    """Estimador construido por un trabajador sobre su parte de los archivos."""
+
+    estimator: SkipReservoir | HeavyHitters
+    newest: float | None = None
+    oldest: float | None = None
+
+    def merge(self, other: "Partial") -> "Partial":
+        newest = [t for t in (self.newest, other.newest) if t is not None]
+        oldest = [t for t in (self.oldest, other.oldest) if t is not None]
+        return Partial(
+            merge_estimators(self.estimator, other.estimator),
+            max(newest, default=None),
+            min(oldest, default=None),
+        )
+
+
+def estimate_files(
+    paths: list[pathlib.Path],
+    mode: str = "reservoir",
+    reservoir_size: int = 10,
+    sketch_size: int = 16,
+    top_k: int = 3,
+    json_backend: str = "auto",
+) -> Partial:
+    """Construye un estimador sobre `paths` (se ejecuta en un proceso trabajador)."""
+    events_decoder = decoder.get_decoder(json_backend)
+    partial = Partial(make_estimator(mode, reservoir_size, sketch_size, top_k))
+    for file_path in paths:
+        try:
+            batch = events_decoder.load_batch(file_path)
+        except (decoder.DecodeError, OSError) as e:
+            print(f"[WORKER] Ignorando {file_path.name}: {e}")
+            continue
+        partial.estimator.update_batch(batch)
+        if len(batch):
+            partial.newest = batch.newest if partial.newest is None else max(partial.newest, batch.newest)
+            partial.oldest = batch.oldest if partial.oldest is None else min(partial.oldest, batch.oldest)
+    return partial
+
+
+def _shards(paths: list[pathlib.Path], workers: int) -> list[list[pathlib.Path]]:
+    return [shard for shard in (paths[i::workers] for i in range(workers)) if shard]
+
+
+def sample_directory(
+    path: str | pathlib.Path,
+    reservoir_size: int = 10,
+    workers: int | None = None,
+    mode: str = "reservoir",
+    sketch_size: int = 16,
+    top_k: int = 3,
+    json_backend: str = "auto",
+) -> SkipReservoir | HeavyHitters:
+    """Estimador de todos los archivos `*.json` de `path`, repartidos entre procesos.
+
+    Cada trabajador procesa su parte de los archivos y el coordinador combina
+    los resultados con `merge`, que conserva el muestreo uniforme (o las
+    cotas de Space-Saving).
+    """
+    paths = sorted(pathlib.Path(path).glob("*.json"))
+    workers = workers or os.cpu_count() or 1
+    merged = make_estimator(mode, reservoir_size, sketch_size, top_k)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(estimate_files, shard, mode, reservoir_size, sketch_size, top_k, json_backend)
+            for shard in _shards(paths, workers)
+        ]
+        for future in futures:
+            merged = merge_estimators(merged, future.result().estimator)
+    return merged
+
+
+@dataclass(frozen=True)
+class ReservoirSnapshot:
+    """Estado que ven los lectores de task_3, publicado tras cada lote."""
+
+    mode: int
+    count: int
+    newest: datetime.datetime
+    oldest: datetime.datetime
+    breakdown: dict[str, float] = field(default_factory=dict)
+
+
+def compute(
+    source: str,
+    stop: threading.Event,
+    reservoir_size: int = 10,
+    ingest: dict[str, Any] | None = None,
+    checkpoint_dir: str | None = None,
+    checkpoint_interval: float = 5.0,
+    json_backend: str = "auto",
+    mode: str = "reservoir",
+    sketch_size: int = 16,
+    top_k: int = 3,
+    workers: int = 1,
+    **_: Any,
+) -> Iterator[domain.Result]:
+    """Código HTTP más común hasta el momento.
+
+    Con `mode="reservoir"` (por defecto) se estima desde una muestra aleatoria
+    de `reservoir_size` eventos; con `mode="space_saving"` desde resúmenes
+    Space-Saving de `sketch_size` contadores, global y por servicio, que dan
+    los `top_k` códigos con su cota de error en el `breakdown`.
+
+    Con `workers > 1` los archivos de cada lote se reparten entre procesos
+    que decodifican y construyen su propio estimador, y el hilo de ingesta
+    los combina con `merge`.
+
+    `checkpoint_dir` requiere `ingest.high_water_mark` o `ingest.archive`
+    (ver `checkpoint`); con `archive` cada archivo se archiva después de
+    guardar el checkpoint que lo incluye.
+    """
+    estimator = make_estimator(mode, reservoir_size, sketch_size, top_k)
     newest = datetime.datetime(datetime.MINYEAR, 1, 1, 0, 0, 0)
     oldest = datetime.datetime(9999, 1, 1, 0, 0, 0)
-    condition = threading.Condition()
-    last_count = 0  # Para rastrear cuándo hay nuevos datos
+    position: str | None = None
 
-    q: queue.Queue[list[domain.Events]] = queue.Queue()
-    producer_thread = threading.Thread(target=producer, args=(pathlib.Path(source), stop, q), daemon=True)
+    # Restaurar el reservorio y la posición de ingesta desde el último checkpoint
+    # La posición solo es fiable con nombres ordenables (ver `checkpoint`)
+    track_position = checkpoint.tracks_position(ingest)
+
+    checkpointer = None
+    if checkpoint_dir is not None:
+        checkpoint.require_resumable(ingest)
+        checkpointer = checkpoint.Checkpointer(checkpoint_dir, "task_3", checkpoint_interval)
+        state = checkpointer.load()
+        if state is not None:
+            if state.get("mode", "reservoir") == mode:
+                estimator.load_state(state)
+            else:
+                print("[CHECKPOINT] Estado guardado con otro modo, se reinicia", flush=True)
+            newest = datetime.datetime.fromisoformat(state["newest"])
+            oldest = datetime.datetime.fromisoformat(state["oldest"])
+            position = state["position"]
+        ingest = checkpoint.resume_ingest(ingest, state)
+
+    # El estimador solo lo toca el hilo de ingesta; el generador lee la
+    # última instantánea publicada, sin candados.
+    published: Published[ReservoirSnapshot] = Published()
+
+    def publish() -> None:
+        most_common = estimator.mode()
+        if most_common is not None:
+            published.publish(
+                ReservoirSnapshot(
+                    mode=most_common,
+                    count=estimator.seen,
+                    newest=newest,
+                    oldest=oldest,
+                    breakdown=estimator.breakdown(),
+                )
+            )
+
+    def snapshot() -> dict[str, Any]:
+        return {
+            "mode": mode,
+            **estimator.to_state(),
+            "newest": newest.isoformat(),
+            "oldest": oldest.isoformat(),
+            "position": position,
+        }
+
+    publish()
+
+    # Con checkpoint, un archivo solo se archiva cuando ya está guardado
+    directory = watcher.DirectoryWatcher(
+        source, defer_archive=checkpointer is not None, **(ingest or {})
+    )
+    unarchived: list[pathlib.Path] = []
+
+    def archive_saved() -> None:
+        directory.archive_files(unarchived)
+        unarchived.clear()
+
+    q: queue.Queue[tuple[list[pathlib.Path], domain.EventBatch | Partial]] = queue.Queue()
+    if workers > 1:
+        estimator_args = (mode, reservoir_size, sketch_size, top_k, json_backend)
+        producer_thread = threading.Thread(
+            target=parallel_producer,
+            args=(directory, stop, q, workers, estimator_args),
+            daemon=True,
+        )
+    else:
+        producer_thread = threading.Thread(
+            target=producer,
+            args=(directory, stop, q, json_backend),
+            daemon=True,
+        )
     producer_thread.start()
 
     def helper()-> None:
-        nonlocal sample, newest, oldest, last_count
-        count = 0
+        nonlocal estimator, newest, oldest, position
 
         while not stop.is_set():
             try:
-                batch = q.get(timeout=0.1)
+                files, item = q.get(timeout=0.1)
             except queue.Empty:
                 continue
-                
-            with condition:
-                for event in batch:
-                    code = event["message"].split(": ")[-1]
-                    timestamp = datetime.datetime.fromtimestamp(event["timestamp"])
-                    if len(sample) < reservoir_size:
-                        sample.append(code)
-                    else:
-                        j = np.random.randint(0, count)
-                        if j < reservoir_size:
-                            sample[j] = code
-                    count += 1
-
-                    newest = max(newest, timestamp)
-                    oldest = min(oldest, timestamp)
-
-                # Visualizar el estado actual del reservorio
-                print(f"[Reservoir Update] Size: {len(sample)}/{reservoir_size} | Content: {sample} | Total events: {count}")
-                
-                last_count = count  # Actualizar el contador
-                condition.notify_all()
 
+            if isinstance(item, Partial):
+                estimator = merge_estimators(estimator, item.estimator)
+                batch_newest, batch_oldest = item.newest, item.oldest
+            else:
+                estimator.update_batch(item)
+                batch_newest = item.newest if len(item) else None
+                batch_oldest = item.oldest if len(item) else None
+
+            if batch_newest is not None and batch_oldest is not None:
+                newest = max(newest, datetime.datetime.fromtimestamp(batch_newest))
+                oldest = min(oldest, datetime.datetime.fromtimestamp(batch_oldest))
+            file_name = max(path.name for path in files)
+            if track_position and (position is None or file_name > position):
+                position = file_name
+
+            publish()
+
+            if checkpointer is not None:
+                unarchived.extend(files)
+                if checkpointer.maybe_save(snapshot):
+                    archive_saved()
             q.task_done()
 
+        if checkpointer is not None:
+            checkpointer.save(snapshot())
+            archive_saved()
+
     helper_thread = threading.Thread(target=helper, daemon=True)
     helper_thread.start()
 
-    prev_count = 0
-    while not stop.is_set():
-        with condition:
-            # Esperar hasta que haya nuevos datos o timeout
-            if not sample:
-                condition.wait(timeout=0.5)
-                if not sample:
-                    continue
-            
-            # Si hay nuevos datos, actualizar prev_count
-            if last_count != prev_count:
-                prev_count = last_count
-            
-            most_common = Counter(sample).most_common(1)[0][0]
-            
+    try:
+        seen_version = 0
+        while not stop.is_set():
+            # Esperar una instantánea nueva; sin novedades, repetir la última tras el timeout
+            if seen_version:
+                published.wait(seen_version, timeout=0.5)
+            version = published.version
+            current = published.get()
+            if current is None:
+                # Esperar hasta que haya datos o timeout
+                published.wait(0, timeout=0.5)
+                continue
+            seen_version = version
+
             # Visualizar análisis del reservorio
-            counter = Counter(sample)
             # print(f"\n{'='*60}")
             # print(f"[Reservoir Analysis]")
-            # print(f"  Sample content: {sample}")
-            # print(f"  Frequency distribution: {dict(counter)}")
-            # print(f"  Most common code: {most_common}")
-            # print(f"  Time range: {oldest} to {newest}")
+            # print(f"  Most common code: {current.mode}")
+            # print(f"  Time range: {current.oldest} to {current.newest}")
             # print(f"{'='*60}\n")
-            
+
             yield domain.Result(
-                value=float(most_common),
-                newest_considered=newest,
-                oldest_considered=oldest,
+                value=float(current.mode),
+                newest_considered=current.newest,
+                oldest_considered=current.oldest,
+                breakdown=current.breakdown,
             )
+    finally:
+        # Cerrar el generador detiene la ingesta; el hilo auxiliar guarda el último checkpoint
+        stop.set()
+        helper_thread.join(timeout=1)
+        producer_thread.join(timeout=1)
 
-def producer(path: pathlib.Path, stop: threading.Event, q: queue.Queue[list[domain.Events]]) -> None:
-    seen = set()
-    while not stop.is_set():
-        found_new = False
-        for file_path in path.glob("*.json"):
-            if file_path in seen:
+def producer(
+    directory: watcher.DirectoryWatcher,
+    stop: threading.Event,
+    q: queue.Queue[tuple[list[pathlib.Path], domain.EventBatch]],
+    json_backend: str = "auto",
+) -> None:
+    events_decoder = decoder.get_decoder(json_backend)
+    # El observador solo entrega archivos nuevos, no hace falta recordar los vistos
+    for files in directory.batches(stop):
+        for file_path in files:
+            try:
+                batch = events_decoder.load_batch(file_path)
+            except (decoder.DecodeError, OSError) as e:
+                print(f"[PRODUCER] Ignorando {file_path.name}: {e}")
+                # No aporta eventos: se puede archivar sin esperar al checkpoint
+                directory.archive_files([file_path])
                 continue
-            else:
-                seen.add(file_path)
-                batch = json.loads(file_path.read_text())
-                q.put(batch)
-                found_new = True
-        
-        # Si no se encontraron archivos nuevos, esperar un poco antes de revisar de nuevo
-        if not found_new:
-            time.sleep(0.5)
+            q.put(([file_path], batch))
+
+
+def parallel_producer(
+    directory: watcher.DirectoryWatcher,
+    stop: threading.Event,
+    q: queue.Queue[tuple[list[pathlib.Path], Partial]],
+    workers: int,
+    estimator_args: tuple,
+) -> None:
+    """Reparte cada lote de archivos entre `workers` procesos y encola sus estimadores.
+
+    Los estimadores de un lote se combinan antes de encolarlos, así que un
+    checkpoint siempre cubre lotes completos (su posición y su archivado).
+    """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        for files in directory.batches(stop):
+            futures = [pool.submit(estimate_files, shard, *estimator_args) for shard in _shards(files, workers)]
+            # El lote se termina antes de pedir el siguiente (que puede archivar este)
+            partial = futures[0].result()
+            for future in futures[1:]:
+                partial = partial.merge(future.result())
+            q.put((files, partial))
 
 if __name__ == "__main__":
-    import tempfile
     import os
+    import tempfile
     
     # Prueba local creando archivos
     # Crear directorio data/task_3 si no existe
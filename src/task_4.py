@@ -1,13 +1,34 @@
 # src/task_4.py
+import concurrent.futures
 import datetime
+import functools
 import hashlib
-import json
+import math
+import os
 import pathlib
-import time
 import queue
-import concurrent.futures
-from typing import Any, Iterator
-import domain
+import tempfile
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Iterator
+
+import numpy as np
+
+try:
+    from src import decoder, domain, watcher
+except ModuleNotFoundError:
+    import decoder
+    import domain
+    import watcher
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - depende del entorno
+    xxhash = None
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - depende del entorno
+    ahocorasick = None
 
 
 class BloomFilter:
@@ -45,43 +66,654 @@ class BloomFilter:
     def __contains__(self, value: str) -> bool:
         return all(self._get_bit(idx) for idx in self._hash_indices(value))
 
+    def add_many(self, values: Iterable[str]) -> None:
+        for value in values:
+            self.add(value)
+
+    def contains_many(self, values: Iterable[str]) -> np.ndarray:
+        return np.array([value in self for value in values], dtype=bool)
+
+
+# Forma parte de la clave de caché: los bits dependen de la función de hash
+HASH_NAME = "xxh3_128" if xxhash is not None else "blake2b128"
+
+
+def _digest128(data: bytes) -> bytes:
+    """Un solo hash de 128 bits por valor: xxh3 si está instalado, si no BLAKE2b."""
+    if xxhash is not None:
+        return xxhash.xxh3_128_digest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class FastBloomFilter:
+    """Filtro de Bloom con doble hashing y bits en un arreglo de NumPy.
+
+    Los k índices salen de un único hash de 128 bits por valor, partido en
+    dos mitades h1 y h2: g_i = (h1 + i * h2) mod m (Kirsch–Mitzenmacher), con
+    la misma tasa de falsos positivos asintótica que k hashes independientes.
+    `add_many` y `contains_many` calculan y consultan los índices de todo un
+    lote con operaciones vectorizadas.
+    """
+
+    def __init__(self, bit_count: int, hash_count: int, bits: np.ndarray | None = None):
+        self.bit_count = bit_count
+        self.hash_count = hash_count
+        self.bits = np.zeros((bit_count + 7) // 8, dtype=np.uint8) if bits is None else bits
+        self._steps = np.arange(hash_count, dtype=np.uint64)
+
+    def _indices(self, values: Iterable[str]) -> np.ndarray:
+        """Matriz (valores x k) con los índices de bit de cada valor."""
+        digests = b"".join(_digest128(value.encode("utf-8")) for value in values)
+        halves = np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+        h1 = halves[:, :1]
+        h2 = halves[:, 1:] | np.uint64(1)  # h2 impar: los k índices no colapsan
+        # La suma desborda módulo 2**64 a propósito antes de reducir módulo m
+        return (h1 + self._steps * h2) % np.uint64(self.bit_count)
+
+    def add_many(self, values: Iterable[str]) -> None:
+        values = list(values)
+        if not values:
+            return
+        if not self.bits.flags.writeable:
+            # Filtro mapeado desde la caché (solo lectura): se copia al crecer
+            self.bits = np.array(self.bits)
+        indices = self._indices(values).ravel()
+        np.bitwise_or.at(
+            self.bits, indices >> np.uint64(3), np.left_shift(1, indices & np.uint64(7)).astype(np.uint8)
+        )
+
+    def add(self, value: str) -> None:
+        self.add_many([value])
+
+    def contains_many(self, values: Iterable[str] | domain.EventBatch) -> np.ndarray:
+        """Pertenencia de cada valor; con un `EventBatch`, de cada evento (por mensaje distinto)."""
+        if isinstance(values, domain.EventBatch):
+            return self.contains_many(values.messages)[values.message_ids]
+        values = list(values)
+        if not values:
+            return np.zeros(0, dtype=bool)
+        indices = self._indices(values)
+        hits = (self.bits[indices >> np.uint64(3)] >> (indices & np.uint64(7)).astype(np.uint8)) & 1
+        return hits.all(axis=1)
+
+    def __contains__(self, value: str) -> bool:
+        return bool(self.contains_many([value])[0])
+
+
+class ScalableBloomFilter:
+    """Filtro de Bloom escalable (Almeida et al., 2007).
+
+    Crece por tramos de `FastBloomFilter`: cuando el tramo actual llega a su
+    capacidad se agrega otro `growth` veces más grande y con una tasa de
+    error `tightening` veces menor. La tasa del primer tramo es
+    `error_rate * (1 - tightening)`, de modo que la suma sobre todos los
+    tramos queda por debajo de `error_rate` sin elegir `m_bits` de antemano.
+    """
+
+    def __init__(self, initial_capacity: int = 1000, error_rate: float = 0.01, growth: int = 2, tightening: float = 0.9):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.slices: list[FastBloomFilter] = []
+        self._capacities: list[int] = []
+        self._counts: list[int] = []
+        self._add_slice()
+
+    def _add_slice(self) -> None:
+        i = len(self.slices)
+        capacity = self.initial_capacity * self.growth**i
+        error = self.error_rate * (1 - self.tightening) * self.tightening**i
+        # Tamaño y número de hashes óptimos para `capacity` elementos con tasa `error`
+        bit_count = math.ceil(capacity * -math.log(error) / math.log(2) ** 2)
+        hash_count = max(1, math.ceil(-math.log2(error)))
+        self.slices.append(FastBloomFilter(bit_count, hash_count))
+        self._capacities.append(capacity)
+        self._counts.append(0)
+
+    def __len__(self) -> int:
+        return sum(self._counts)
+
+    def add_many(self, values: Iterable[str]) -> None:
+        values = list(values)
+        if not values:
+            return
+        # Los ya presentes, o repetidos dentro del lote, no consumen capacidad
+        new = list(dict.fromkeys(value for value, seen in zip(values, self.contains_many(values), strict=True) if not seen))
+        while new:
+            room = self._capacities[-1] - self._counts[-1]
+            chunk, new = new[:room], new[room:]
+            self.slices[-1].add_many(chunk)
+            self._counts[-1] += len(chunk)
+            if self._counts[-1] >= self._capacities[-1]:
+                self._add_slice()
+
+    def add(self, value: str) -> None:
+        self.add_many([value])
+
+    def contains_many(self, values: Iterable[str] | domain.EventBatch) -> np.ndarray:
+        if isinstance(values, domain.EventBatch):
+            return self.contains_many(values.messages)[values.message_ids]
+        values = list(values)
+        found = np.zeros(len(values), dtype=bool)
+        for bloom in self.slices:
+            found |= bloom.contains_many(values)
+        return found
+
+    def __contains__(self, value: str) -> bool:
+        return bool(self.contains_many([value])[0])
+
+
+AnyBloomFilter = BloomFilter | FastBloomFilter | ScalableBloomFilter
+
+
+class AhoCorasick:
+    """Autómata de Aho–Corasick para buscar muchas subcadenas a la vez.
+
+    Los patrones forman un trie (`_goto`, un dict de transiciones por estado)
+    con enlaces de fallo calculados por BFS; `_out[s]` indica si en el estado
+    `s`, o en alguno de sus sufijos, termina un patrón. Así cada mensaje se
+    recorre una sola vez, en tiempo lineal en su longitud sin importar
+    cuántos patrones haya, y la búsqueda se corta en la primera coincidencia.
+
+    Es Python puro: cada estado cuesta un dict (unos 140 bytes). Con 1M de
+    firmas `host-NNNNNNN`, que comparten prefijos, son 1.1M de estados, unos
+    150 MB y 10 s de construcción; patrones sin prefijos comunes ocupan un
+    estado por carácter. Conviene hasta unos 10^5 patrones; por encima,
+    `make_automaton` usa `CompiledAhoCorasick` si pyahocorasick está
+    instalado (ver benchmarks/bench_task_4_substring.py).
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._out: list[bool] = [False]
+        self.pattern_count = 0
+        for pattern in patterns:
+            self._insert(pattern)
+        self._fail = self._build_failure_links()
+
+    def _insert(self, pattern: str) -> None:
+        if not pattern:
+            return
+        goto, out = self._goto, self._out
+        state = 0
+        for ch in pattern:
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][ch] = nxt
+                goto.append({})
+                out.append(False)
+            state = nxt
+        if not out[state]:
+            out[state] = True
+            self.pattern_count += 1
+
+    def _build_failure_links(self) -> list[int]:
+        goto, out = self._goto, self._out
+        fail = [0] * len(goto)
+        frontier = list(goto[0].values())
+        while frontier:
+            following = []
+            for state in frontier:
+                for ch, child in goto[state].items():
+                    # El fallo del hijo es el estado más largo que es sufijo propio
+                    f = fail[state]
+                    while f and ch not in goto[f]:
+                        f = fail[f]
+                    target = goto[f].get(ch, 0)
+                    fail[child] = target if target != child else 0
+                    out[child] = out[child] or out[fail[child]]
+                    following.append(child)
+            frontier = following
+        return fail
+
+    def __len__(self) -> int:
+        return self.pattern_count
+
+    def search(self, text: str) -> bool:
+        """Indica si algún patrón aparece como subcadena de `text`."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt or 0
+            if out[state]:
+                return True
+        return False
+
+    __contains__ = search
+
+    def is_pattern(self, text: str) -> bool:
+        """Comprobación exacta: sigue solo las transiciones del trie, sin enlaces de fallo.
+
+        Es cierta si `text` es un patrón (o termina en uno, lo que también
+        es una coincidencia).
+        """
+        goto = self._goto
+        state = 0
+        for ch in text:
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                return False
+            state = nxt
+        return self._out[state]
+
+    def contains_many(self, values: Iterable[str] | domain.EventBatch) -> np.ndarray:
+        if isinstance(values, domain.EventBatch):
+            return values.map_messages(self.search)
+        return np.fromiter((self.search(value) for value in values), dtype=bool)
+
+
+class CompiledAhoCorasick:
+    """`AhoCorasick` sobre el autómata en C de pyahocorasick (`import ahocorasick`).
+
+    El trie vive en estructuras de C en lugar de un dict por estado, así que
+    la memoria y el tiempo de construcción escalan a millones de patrones.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        if ahocorasick is None:
+            raise RuntimeError("CompiledAhoCorasick requiere pyahocorasick (pip install pyahocorasick)")
+        self._automaton = ahocorasick.Automaton()
+        for pattern in patterns:
+            if pattern:
+                self._automaton.add_word(pattern, True)
+        if len(self._automaton):
+            self._automaton.make_automaton()
+
+    def __len__(self) -> int:
+        return len(self._automaton)
+
+    def search(self, text: str) -> bool:
+        """Indica si algún patrón aparece como subcadena de `text`."""
+        if not len(self._automaton):
+            return False
+        for _ in self._automaton.iter(text):
+            return True
+        return False
+
+    __contains__ = search
+
+    def is_pattern(self, text: str) -> bool:
+        """Indica si `text` es exactamente un patrón."""
+        return bool(self._automaton.exists(text))
+
+    def contains_many(self, values: Iterable[str] | domain.EventBatch) -> np.ndarray:
+        if isinstance(values, domain.EventBatch):
+            return values.map_messages(self.search)
+        return np.fromiter((self.search(value) for value in values), dtype=bool)
+
+
+AnyAutomaton = AhoCorasick | CompiledAhoCorasick
 
-def load_bloom_filter(path: pathlib.Path, bit_count: int, hash_count: int) -> BloomFilter:
-    """Carga un filtro de Bloom con las cadenas contenidas en un archivo."""
-    bf = BloomFilter(bit_count, hash_count)
+
+def make_automaton(patterns: Iterable[str]) -> AnyAutomaton:
+    """Autómata de `patterns`: `CompiledAhoCorasick` si pyahocorasick está instalado, si no `AhoCorasick`."""
+    if ahocorasick is not None:
+        return CompiledAhoCorasick(patterns)
+    return AhoCorasick(patterns)
+
+
+class SubstringMatcher:
+    """Mensajes que contienen algún patrón, con un filtro de Bloom opcional delante.
+
+    El filtro (`prefilter`) solo decide si vale la pena la comprobación
+    exacta: si da negativo el mensaje no es un patrón y va directo a la
+    búsqueda de subcadenas; si da positivo (que puede ser falso) el trie
+    confirma el patrón y, si no lo confirma, también se busca. Así un falso
+    positivo del filtro nunca cuenta como coincidencia. Expone la misma
+    interfaz que los filtros, así que funciona detrás de `MembershipCache`.
+    """
+
+    def __init__(self, automaton: AnyAutomaton, prefilter: AnyBloomFilter | None = None):
+        self.automaton = automaton
+        self.prefilter = prefilter
+
+    def contains_many(self, values: Iterable[str] | domain.EventBatch) -> np.ndarray:
+        if isinstance(values, domain.EventBatch):
+            return self.contains_many(values.messages)[values.message_ids]
+        values = list(values)
+        automaton = self.automaton
+        if self.prefilter is None:
+            return automaton.contains_many(values)
+        candidates = self.prefilter.contains_many(values).tolist()
+        return np.fromiter(
+            (
+                (candidate and automaton.is_pattern(value)) or automaton.search(value)
+                for value, candidate in zip(values, candidates, strict=True)
+            ),
+            dtype=bool,
+            count=len(values),
+        )
+
+    def __contains__(self, value: str) -> bool:
+        return bool(self.contains_many([value])[0])
+
+
+class MembershipCache:
+    """Memoriza la pertenencia de cada mensaje distinto delante del filtro.
+
+    Los mensajes tienen muy poca cardinalidad (el generador produce una
+    decena), así que tras el primer lote casi todos se resuelven con un
+    acceso a diccionario. Guarda como mucho `maxsize` mensajes (0 desactiva
+    la caché) y al llenarse expulsa el menos usado (`eviction="lru"`) o el
+    más antiguo (`"fifo"`). `hits`, `misses` y `evictions` cuentan su uso.
+    """
+
+    def __init__(self, bloom_filter: AnyBloomFilter | SubstringMatcher, maxsize: int = 4096, eviction: str = "lru"):
+        if eviction not in ("lru", "fifo"):
+            raise ValueError(f"Invalid eviction policy: {eviction}")
+        self.bloom_filter = bloom_filter
+        self.maxsize = maxsize
+        self.eviction = eviction
+        self._entries: OrderedDict[str, bool] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Olvida los resultados (p. ej. si cambia el filtro)."""
+        self._entries.clear()
+
+    def contains_many(self, values: Iterable[str]) -> np.ndarray:
+        values = list(values)
+        result = np.zeros(len(values), dtype=bool)
+        missing: list[int] = []
+        entries = self._entries
+        for i, value in enumerate(values):
+            cached = entries.get(value)
+            if cached is None:
+                missing.append(i)
+                continue
+            result[i] = cached
+            if self.eviction == "lru":
+                entries.move_to_end(value)
+        self.hits += len(values) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            # Los mensajes nuevos se consultan al filtro de una vez
+            found = self.bloom_filter.contains_many([values[i] for i in missing]).tolist()
+            for i, member in zip(missing, found, strict=True):
+                result[i] = member
+                self._store(values[i], member)
+        return result
+
+    def _store(self, value: str, member: bool) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[value] = member
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def contains_batch(self, batch: domain.EventBatch) -> np.ndarray:
+        """Pertenencia de cada evento: una consulta por mensaje distinto del lote."""
+        return self.contains_many(batch.messages)[batch.message_ids]
+
+    def __contains__(self, value: str) -> bool:
+        return bool(self.contains_many([value])[0])
+
+
+class PatternFileFollower:
+    """Sigue el archivo de patrones por sondeo de `os.stat`.
+
+    `poll` devuelve `("append", líneas)` con las líneas completas añadidas al
+    final desde la última lectura, o `("rewrite", [])` si el archivo se
+    reemplazó o se reescribió: otro inodo, menor tamaño, otra fecha de
+    modificación sin haber crecido (una edición del mismo tamaño) o un
+    SHA-256 distinto de la parte ya leída. En ese caso hay que reconstruir
+    el filtro y llamar a `reset`.
+    """
+
+    def __init__(self, path: str | pathlib.Path):
+        self.path = pathlib.Path(path)
+        self.reset()
+
+    def _stat(self) -> tuple[int, int, int] | None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def reset(self) -> None:
+        """Toma el contenido actual como ya aplicado."""
+        self._identity = self._stat()
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            data = b""
+        # Una última línea sin salto se vuelve a leer cuando se complete
+        self.offset = data.rfind(b"\n") + 1
+        self._digest = hashlib.sha256(data[: self.offset])
+
+    def _prefix_digest(self, f: Any) -> bytes:
+        """SHA-256 de los primeros `offset` bytes de `f`, leídos por bloques."""
+        digest = hashlib.sha256()
+        remaining = self.offset
+        while remaining:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+        return digest.digest()
+
+    def poll(self) -> tuple[str, list[str]] | None:
+        identity = self._stat()
+        if identity is None or identity == self._identity:
+            return None
+        inode, size, _ = identity
+        if self._identity is not None and (inode != self._identity[0] or size < self.offset or size == self._identity[1]):
+            return ("rewrite", [])
+
+        with open(self.path, "rb") as f:
+            if self._prefix_digest(f) != self._digest.digest():
+                return ("rewrite", [])
+            data = f.read()
+        self._identity = identity
+
+        cut = data.rfind(b"\n") + 1
+        if not cut:
+            return None
+        chunk = data[:cut]
+        self.offset += cut
+        self._digest.update(chunk)
+        lines = (line.strip() for line in chunk.decode("utf-8").splitlines())
+        return ("append", [line for line in lines if line])
+
+
+def _read_patterns(path: pathlib.Path) -> list[str]:
     try:
         with path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    bf.add(line)
-    except FileNotFoundError:
-        raise RuntimeError(f"No se encontró el archivo de filtro: {path}")
+            return [line for line in (raw.strip() for raw in f) if line]
+    except FileNotFoundError as e:
+        raise RuntimeError(f"No se encontró el archivo de filtro: {path}") from e
+
+
+def _bloom_cache_prefix(path: pathlib.Path, bit_count: int, hash_count: int) -> str:
+    """Parte de la clave que no cambia al editar el archivo: su ruta, m, k y hash."""
+    location = hashlib.sha256(os.fsencode(path.resolve())).hexdigest()[:16]
+    return f"{location}-m{bit_count}-k{hash_count}-{HASH_NAME}"
+
+
+def bloom_cache_key(path: pathlib.Path, bit_count: int, hash_count: int) -> str:
+    """Clave del filtro construido: ruta y contenido del archivo de patrones, m, k y hash."""
+    digest = hashlib.sha256()
+    try:
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except FileNotFoundError as e:
+        raise RuntimeError(f"No se encontró el archivo de filtro: {path}") from e
+    return f"{_bloom_cache_prefix(path, bit_count, hash_count)}-{digest.hexdigest()[:32]}"
+
+
+def load_cached_bloom_filter(
+    path: pathlib.Path,
+    bit_count: int,
+    hash_count: int,
+    cache_dir: str | pathlib.Path,
+) -> FastBloomFilter:
+    """`FastBloomFilter` mapeado en memoria desde `cache_dir`, construyéndolo si falta.
+
+    Los bits se guardan tal cual en `<cache_dir>/<clave>.bloom`; con la misma
+    clave el arranque solo abre el archivo con mmap (las páginas se leen a
+    demanda y se comparten entre procesos). Un filtro cargado así es de solo
+    lectura.
+
+    Varios procesos pueden compartir `cache_dir` con distintos archivos de
+    patrones o m/k: al cargar una entrada solo se borran las versiones
+    anteriores del mismo archivo con los mismos m/k (misma ruta, otro
+    contenido). Un proceso que aún las tenga mapeadas sigue leyéndolas.
+    """
+    cache_dir = pathlib.Path(cache_dir)
+    target = cache_dir / f"{bloom_cache_key(path, bit_count, hash_count)}.bloom"
+    size = (bit_count + 7) // 8
+
+    if not target.is_file() or target.stat().st_size != size:
+        bf = FastBloomFilter(bit_count, hash_count)
+        bf.add_many(_read_patterns(path))
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_dir, prefix=f".{target.name}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(bf.bits.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, target)
+        except BaseException:
+            pathlib.Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    bits = np.memmap(target, dtype=np.uint8, mode="r", shape=(size,))
+    for stale in cache_dir.glob(f"{_bloom_cache_prefix(path, bit_count, hash_count)}-*.bloom"):
+        if stale != target:
+            stale.unlink(missing_ok=True)
+    return FastBloomFilter(bit_count, hash_count, bits=bits)
+
+
+def make_bloom_filter(engine: str, bit_count: int, hash_count: int, error_rate: float = 0.01, initial_capacity: int = 1000) -> AnyBloomFilter:
+    """Filtro vacío del `engine` pedido ("sha256", "fast" o "scalable")."""
+    if engine == "fast":
+        return FastBloomFilter(bit_count, hash_count)
+    if engine == "scalable":
+        return ScalableBloomFilter(initial_capacity, error_rate)
+    if engine == "sha256":
+        return BloomFilter(bit_count, hash_count)
+    raise ValueError(f"Invalid Bloom filter engine: {engine}")
+
+
+def load_bloom_filter(
+    path: pathlib.Path,
+    bit_count: int,
+    hash_count: int,
+    engine: str = "sha256",
+    cache_dir: str | pathlib.Path | None = None,
+    error_rate: float = 0.01,
+    initial_capacity: int = 1000,
+) -> AnyBloomFilter:
+    """Carga un filtro de Bloom con las cadenas contenidas en un archivo.
+
+    `engine` elige la implementación: "sha256" (`BloomFilter`, un SHA-256
+    por índice), "fast" (`FastBloomFilter`, doble hashing vectorizado) o
+    "scalable" (`ScalableBloomFilter`, dimensionado por `error_rate` en lugar
+    de `bit_count`/`hash_count`). Con "fast" y `cache_dir` el filtro
+    construido se persiste y se reutiliza con mmap (ver
+    `load_cached_bloom_filter`); con otro motor `cache_dir` es un error.
+    """
+    if cache_dir is not None:
+        if engine != "fast":
+            raise ValueError(f"cache_dir requires the 'fast' Bloom filter engine, got: {engine}")
+        return load_cached_bloom_filter(path, bit_count, hash_count, cache_dir)
+    bf = make_bloom_filter(engine, bit_count, hash_count, error_rate, initial_capacity)
+    bf.add_many(_read_patterns(path))
     return bf
 
 
-def producer(source_dir: str, output_queue: queue.Queue, stop_signal: Any) -> None:
-    """Lee archivos JSON nuevos del directorio y los envía por la cola."""
-    path = pathlib.Path(source_dir)
-    processed_files: set[str] = set()
+def load_matcher(
+    path: pathlib.Path,
+    match: str = "exact",
+    prefilter: bool = True,
+    **bloom_args: Any,
+) -> AnyBloomFilter | SubstringMatcher:
+    """Construye el clasificador de mensajes a partir del archivo de patrones.
+
+    `match="exact"` es el filtro de Bloom de `load_bloom_filter` (el mensaje
+    completo debe ser un patrón); `match="substring"` busca los patrones como
+    subcadenas con el autómata de `make_automaton`, con el filtro de Bloom
+    delante si `prefilter`.
+    """
+    if match == "exact":
+        return load_bloom_filter(path, **bloom_args)
+    if match != "substring":
+        raise ValueError(f"Invalid match mode: {match}")
+    automaton = make_automaton(_read_patterns(path))
+    return SubstringMatcher(automaton, load_bloom_filter(path, **bloom_args) if prefilter else None)
 
-    while not stop_signal.is_set():
-        for file in path.glob("*.json"):
-            if file.name in processed_files:
-                continue
 
-            processed_files.add(file.name)
+def producer(
+    source_dir: str,
+    output_queue: queue.Queue,
+    stop_signal: Any,
+    ingest: dict[str, Any] | None = None,
+    json_backend: str = "auto",
+) -> None:
+    """Lee archivos JSON nuevos del directorio y los envía por la cola."""
+    events_decoder = decoder.get_decoder(json_backend)
+    for files in watcher.watch(source_dir, stop_signal, **(ingest or {})):
+        for file in files:
             try:
-                with file.open("r", encoding="utf-8") as f:
-                    data = json.load(f)
-                if isinstance(data, dict):
-                    data = [data]
-                output_queue.put(data)
-            except (json.JSONDecodeError, OSError):
+                output_queue.put(events_decoder.load_batch(file))
+            except (decoder.DecodeError, OSError):
                 
                 continue
 
-        time.sleep(0.5)
+
+def follow_patterns(
+    follower: PatternFileFollower,
+    build: Callable[[], Any],
+    updates: queue.Queue,
+    stop_signal: Any,
+    interval: float,
+    incremental: bool = True,
+) -> None:
+    """Sondea el archivo de patrones y encola líneas nuevas o un filtro reconstruido.
+
+    Sin `incremental` (el autómata de Aho–Corasick no admite patrones nuevos
+    sin recalcular sus enlaces) también las líneas añadidas reconstruyen.
+    """
+    while not stop_signal.wait(interval):
+        change = follower.poll()
+        if change is None:
+            continue
+        kind, lines = change
+        if kind == "append" and incremental:
+            if lines:
+                updates.put(("append", lines))
+            continue
+        if kind == "append" and not lines:
+            continue
+
+        print(f"[FILTER] {follower.path.name} cambió, reconstruyendo el filtro", flush=True)
+        follower.reset()
+        try:
+            updates.put(("swap", build()))
+        except RuntimeError as e:
+            print(f"[FILTER] No se pudo reconstruir: {e}", flush=True)
 
 
 def compute(
@@ -90,14 +722,70 @@ def compute(
     filter_file: str,
     m_bits: int = 1_000_000,
     k_hashes: int = 7,
+    ingest: dict[str, Any] | None = None,
+    json_backend: str = "auto",
+    engine: str = "fast",
+    cache_dir: str | None = None,
+    membership_cache_size: int = 4096,
+    membership_cache_eviction: str = "lru",
+    reload_interval: float | None = 1.0,
+    error_rate: float = 0.01,
+    initial_capacity: int = 1000,
+    match: str = "exact",
+    prefilter: bool = True,
     **_: Any,
 ) -> Iterator[domain.Result]:
+    """Proporción de eventos cuyo mensaje coincide con el archivo de patrones.
 
-    data_queue: queue.Queue[list[dict]] = queue.Queue()
-    bloom_filter = load_bloom_filter(pathlib.Path(filter_file), m_bits, k_hashes)
+    Con `match="exact"` el mensaje completo debe ser un patrón; con
+    `match="substring"` basta con que contenga alguno (ver `load_matcher`).
+    Con `reload_interval` (segundos) se sigue `filter_file`: las líneas
+    añadidas se agregan al filtro en vivo y, si el archivo se reescribe, se
+    reconstruye en segundo plano y se reemplaza entre dos lotes.
+    """
+    filter_path = pathlib.Path(filter_file)
+    build = functools.partial(
+        load_matcher,
+        filter_path,
+        match,
+        prefilter,
+        bit_count=m_bits,
+        hash_count=k_hashes,
+        engine=engine,
+        cache_dir=cache_dir,
+        error_rate=error_rate,
+        initial_capacity=initial_capacity,
+    )
+    data_queue: queue.Queue[domain.EventBatch] = queue.Queue()
+    updates: queue.Queue[tuple[str, Any]] = queue.Queue()
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-        executor.submit(producer, source, data_queue, stop)
+    follower = PatternFileFollower(filter_path)
+    bloom_filter = build()
+    membership = MembershipCache(bloom_filter, membership_cache_size, membership_cache_eviction)
+
+    def apply_updates() -> None:
+        nonlocal bloom_filter
+        changed = False
+        while True:
+            try:
+                kind, payload = updates.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "swap":
+                bloom_filter = payload
+            elif not isinstance(bloom_filter, SubstringMatcher):
+                # El autómata no recibe líneas sueltas: follow_patterns lo reconstruye
+                bloom_filter.add_many(payload)
+            changed = True
+        if changed:
+            # Un mensaje que no estaba puede estar ahora
+            membership.bloom_filter = bloom_filter
+            membership.clear()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        executor.submit(producer, source, data_queue, stop, ingest, json_backend)
+        if reload_interval:
+            executor.submit(follow_patterns, follower, build, updates, stop, reload_interval, match == "exact")
 
         while not stop.is_set():
             try:
@@ -105,18 +793,19 @@ def compute(
             except queue.Empty:
                 continue
 
-            if not batch:
+            if not len(batch):
                 continue
 
-            timestamps = [float(e["timestamp"]) for e in batch if "timestamp" in e]
-            if not timestamps:
-                continue
+            # Los cambios del archivo de patrones se aplican entre lotes, en este hilo
+            apply_updates()
 
-            fwd_hits = sum(1 for e in batch if str(e.get("message", "")) in bloom_filter)
+            # Una consulta por mensaje distinto; los ya vistos salen de la caché
+            fwd_hits = int(membership.contains_batch(batch).sum())
             ratio = fwd_hits / len(batch)
 
             yield domain.Result(
                 value=ratio,
-                newest_considered=datetime.datetime.fromtimestamp(max(timestamps)),
-                oldest_considered=datetime.datetime.fromtimestamp(min(timestamps)),
+                newest_considered=datetime.datetime.fromtimestamp(batch.newest),
+                oldest_considered=datetime.datetime.fromtimestamp(batch.oldest),
+                breakdown={"cache_hit_rate": membership.hit_rate},
             )
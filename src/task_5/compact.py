@@ -0,0 +1,213 @@
+"""
+Compactación de la carpeta de entrada de task_5 a Parquet.
+
+El generador escribe un archivo JSON pequeño por lote, y leer decenas de
+miles de archivos cuesta una apertura y un parseo por archivo. Este script
+pasa los JSON terminados (sin modificar hace al menos `--min_age` segundos)
+a Parquet con columnas tipadas, particionado por fecha y hora del evento:
+
+    <entrada>/_compacted/date=AAAA-MM-DD/hour=HH/part-<generación>-<n>.parquet
+
+Columnas: `service` (categórica), `timestamp` (float64), `status` (int16, el
+código HTTP ya extraído del mensaje), `message` y `source` (el archivo JSON
+de origen). `_compacted/_manifest.json` registra las partes y resume los
+archivos ya compactados con una marca de agua sobre los nombres ordenables
+del generador (ver `load_compaction_manifest`), así que no crece con el
+histórico; qué archivos tiene cada parte se guarda en una tabla por
+generación, `_compacted/_sources/<generación>.parquet`. El manifiesto se
+reemplaza de forma atómica después de escribir las partes, así que una
+ejecución interrumpida no deja datos a medias y se puede volver a lanzar.
+`main.py` lee las partes del manifiesto y solo la cola de JSON aún sin
+compactar.
+
+Uso:
+  python compact.py --input data [--min_age 5] [--delete]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from typing import Optional
+
+import polars as pl
+
+try:
+    from .main import (
+        _SORTABLE_NAME,
+        COMPACTED_DIR,
+        COMPACTED_MANIFEST,
+        EVENT_SCHEMA,
+        FILES_PER_BATCH,
+        SOURCES_SCHEMA,
+        _list_json_files,
+        extract_status,
+        is_compacted,
+        load_compaction_manifest,
+        sources_path,
+        write_json_atomic,
+    )
+except ImportError:
+    from main import (
+        _SORTABLE_NAME,
+        COMPACTED_DIR,
+        COMPACTED_MANIFEST,
+        EVENT_SCHEMA,
+        FILES_PER_BATCH,
+        SOURCES_SCHEMA,
+        _list_json_files,
+        extract_status,
+        is_compacted,
+        load_compaction_manifest,
+        sources_path,
+        write_json_atomic,
+    )
+
+# Cada archivo se envuelve como {"source": nombre, "events": contenido}
+_SOURCE_SCHEMA: dict[str, pl.DataType] = {"source": pl.String(), "events": pl.List(pl.Struct(EVENT_SCHEMA))}
+
+
+def _wrap(path: str) -> bytes:
+    """Contenido de `path` como `{"source": nombre, "events": [...]}`."""
+    with open(path, "rb") as f:
+        data = f.read().strip()
+    if data.startswith(b"{"):
+        data = b"[" + data + b"]"
+    name = os.path.basename(path).replace("\\", "\\\\").replace('"', '\\"')
+    return b'{"source":"' + name.encode("utf-8") + b'","events":' + data + b"}"
+
+
+def _decode(wrapped: list[bytes]) -> pl.DataFrame:
+    return (
+        pl.read_json(io.BytesIO(b"[" + b",".join(wrapped) + b"]"), schema=_SOURCE_SCHEMA)
+        .filter(pl.col("events").list.len() > 0)
+        .explode("events")
+        .unnest("events")
+    )
+
+
+def _read_with_sources(paths: list[str]) -> tuple[pl.DataFrame, set[str]]:
+    """Eventos de varios archivos con una sola llamada a `pl.read_json`, con su archivo de origen.
+
+    Devuelve también los archivos que no se pudieron leer: no se compactan
+    (ni se borran) y quedan en la cola JSON.
+    """
+    try:
+        return _decode([_wrap(path) for path in paths]), set()
+    except Exception:
+        # Algún archivo está mal formado: se leen uno a uno y se omite el inválido
+        frames, failed = [], set()
+        for path in paths:
+            try:
+                frames.append(_decode([_wrap(path)]))
+            except Exception as e:
+                print(f"Omitiendo {path}: {e}", file=sys.stderr)
+                failed.add(path)
+        if not frames:
+            return pl.DataFrame(schema={"source": pl.String, **EVENT_SCHEMA}), failed
+        return pl.concat(frames), failed
+
+
+def _write_sources(path: str, rows: list[tuple[str, Optional[str]]]) -> None:
+    """Escribe la tabla (`source`, `part`) de una generación."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pl.DataFrame(rows, schema=SOURCES_SCHEMA, orient="row").write_parquet(path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def compact(
+    source_folder: str,
+    *,
+    min_age: float = 5.0,
+    delete: bool = False,
+    files_per_batch: int = FILES_PER_BATCH,
+) -> int:
+    """Compacta los JSON nuevos de `source_folder`; devuelve cuántos archivos compactó."""
+    output = os.path.join(source_folder, COMPACTED_DIR)
+    manifest = load_compaction_manifest(source_folder) or {
+        "generation": 0, "position": None, "pending": set(), "files": set(), "parts": [],
+    }
+    now = time.time()
+    candidates = [
+        path for path in _list_json_files(source_folder)
+        if not is_compacted(manifest, os.path.basename(path))
+    ]
+    # Solo archivos terminados: el generador podría estar escribiendo los más recientes
+    young = {path for path in candidates if now - os.path.getmtime(path) < min_age}
+    paths = [path for path in candidates if path not in young]
+    if not paths:
+        return 0
+
+    generation = manifest["generation"] + 1
+    parts = list(manifest["parts"])
+    sources: list[tuple[str, Optional[str]]] = []
+    failed: set[str] = set()
+    for index in range(0, len(paths), files_per_batch):
+        events, unreadable = _read_with_sources(paths[index:index + files_per_batch])
+        failed |= unreadable
+        events = (
+            events
+            .with_columns(
+                pl.col("service").cast(pl.Categorical),
+                extract_status(pl.col("message")),
+                pl.col("source").cast(pl.Categorical),
+                pl.from_epoch("timestamp", time_unit="s").dt.date().alias("date"),
+                pl.from_epoch("timestamp", time_unit="s").dt.hour().alias("hour"),
+            )
+            .select("service", "timestamp", "status", "message", "source", "date", "hour")
+        )
+        for (date, hour), group in events.partition_by(["date", "hour"], as_dict=True, include_key=False).items():
+            part = f"date={date}/hour={hour:02d}/part-{generation:06d}-{index // files_per_batch:04d}.parquet"
+            target = os.path.join(output, part)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            group.write_parquet(target + ".tmp")
+            os.replace(target + ".tmp", target)
+            parts.append(part)
+            sources.extend((name, part) for name in group["source"].unique().cast(pl.String).sort())
+
+    paths = [path for path in paths if path not in failed]
+    names = [os.path.basename(path) for path in paths]
+    located = {name for name, _ in sources}
+    sources.extend((name, None) for name in names if name not in located)
+    if "legacy" in manifest:
+        # Manifiesto anterior: sus fuentes pasan a la tabla de su última generación
+        _write_sources(sources_path(source_folder, manifest["generation"]), manifest["legacy"].rows())
+    _write_sources(sources_path(source_folder, generation), sources)
+
+    position = max(filter(None, [manifest["position"], *(n for n in names if _SORTABLE_NAME.match(n))]), default=None)
+    # Los nombres ordenables hasta `position` que no se compactaron (recientes o
+    # ilegibles) quedan pendientes y se reintentan en la siguiente ejecución
+    pending = sorted(
+        name for name in map(os.path.basename, young | failed)
+        if _SORTABLE_NAME.match(name) and position is not None and name <= position
+    )
+    manifest = {
+        "generation": generation,
+        "position": position,
+        "pending": pending,
+        "files": sorted(manifest["files"].union(n for n in names if not _SORTABLE_NAME.match(n))),
+        "parts": parts,
+    }
+    write_json_atomic(os.path.join(output, COMPACTED_MANIFEST), manifest)
+
+    if delete:
+        for path in paths:
+            os.unlink(path)
+    return len(paths)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compacta los JSON de la carpeta de entrada a Parquet particionado por fecha y hora.")
+    parser.add_argument('--input', dest='source_folder', type=str, default='data', help='Carpeta con los archivos JSON. Por defecto: data')
+    parser.add_argument('--min_age', type=float, default=5.0, help='Segundos sin modificarse para considerar un archivo terminado. Por defecto: 5')
+    parser.add_argument('--delete', action='store_true', help='Borra los JSON una vez compactados.')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    count = compact(args.source_folder, min_age=args.min_age, delete=args.delete)
+    print(f"{count} archivos compactados en {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
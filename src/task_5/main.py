@@ -11,15 +11,235 @@ Uso:
 El argumento --input es opcional y por defecto usa 'data' para ejecución local.
 """
 
-import polars as pl
-from typing import Optional
 import argparse
+import concurrent.futures
+import datetime
+import functools
+import glob
+import io
+import json
+import math
+import os  # Importamos os para manejar rutas
+import re
 import sys
-import os # Importamos os para manejar rutas
+import tempfile
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
+
+import polars as pl
+
+try:
+    from polars.io.plugins import register_io_source
+except ImportError:  # pragma: no cover - Polars < 1.14
+    register_io_source = None  # type: ignore[assignment]
 
 # Expresión regular para extraer el código HTTP del mensaje
 _STATUS_RE = r'HTTP Status Code:\s*(\d+)'
 
+# Esquema de los eventos que escribe scripts/generator.py
+EVENT_SCHEMA = {"service": pl.String, "timestamp": pl.Float64, "message": pl.String}
+
+# El escaneo agrega `batch`: el número del grupo de archivos de cada evento
+SCAN_SCHEMA = {**EVENT_SCHEMA, "batch": pl.Int64}
+
+# Archivos que se decodifican juntos en una sola llamada a `pl.read_json`
+FILES_PER_BATCH = 512
+
+# Memoria aproximada que ocupa, al ejecutar el plan, cada byte de entrada
+# (JSON o Parquet) de un trozo: con ella `--memory_budget` fija su tamaño
+INPUT_EXPANSION = 4
+
+# Salida de compact.py: Parquet en `<entrada>/_compacted/date=AAAA-MM-DD/hour=HH/`
+COMPACTED_DIR = "_compacted"
+COMPACTED_MANIFEST = "_manifest.json"
+COMPACTED_SOURCES = "_sources"
+HIVE_SCHEMA = {"date": pl.Date, "hour": pl.Int8}
+SOURCES_SCHEMA = {"source": pl.String, "part": pl.String}
+
+# Nombres del generador: ordenarlos por nombre es ordenarlos por llegada
+_SORTABLE_NAME = re.compile(r"^\d{8}_\d{6}")
+
+# Duraciones de ventana: "10s"/"1m" (Polars) o "10 seconds"/"1 minute" (Spark)
+_DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]+)\s*$")
+_DURATION_UNITS = {
+    **dict.fromkeys(("ms", "millisecond", "milliseconds"), 0.001),
+    **dict.fromkeys(("s", "sec", "second", "seconds"), 1),
+    **dict.fromkeys(("m", "min", "minute", "minutes"), 60),
+    **dict.fromkeys(("h", "hour", "hours"), 3600),
+    **dict.fromkeys(("d", "day", "days"), 86400),
+}
+
+# Tamaños de memoria: "512MB", "2GB", "512 MiB" o un número de bytes
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*$")
+_SIZE_UNITS = {
+    **dict.fromkeys(("", "b"), 1),
+    **dict.fromkeys(("k", "kb", "kib"), 1024),
+    **dict.fromkeys(("m", "mb", "mib"), 1024 ** 2),
+    **dict.fromkeys(("g", "gb", "gib"), 1024 ** 3),
+}
+
+
+def _list_json_files(source_folder: str) -> list[str]:
+    """Archivos `*.json` de la carpeta, ordenados por nombre."""
+    with os.scandir(source_folder) as entries:
+        return sorted(
+            entry.path for entry in entries
+            if entry.name.endswith(".json") and not entry.name.startswith(".") and entry.is_file()
+        )
+
+
+def _read_files(paths: list[str], columns: list[str]) -> pl.DataFrame:
+    """Decodifica varios archivos con una sola llamada a `pl.read_json`.
+
+    Cada archivo es una lista JSON de eventos (o un único evento), así que
+    basta con unir sus contenidos en una sola lista. El esquema solo incluye
+    `columns`: el lector descarta los demás campos sin materializarlos.
+    """
+    schema = {name: EVENT_SCHEMA[name] for name in columns}
+    parts = []
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read().strip()
+        if data.startswith(b"["):
+            data = data[1:-1].strip()
+        if data:
+            parts.append(data)
+    try:
+        return pl.read_json(io.BytesIO(b"[" + b",".join(parts) + b"]"), schema=schema)
+    except Exception:
+        # Algún archivo está mal formado: se leen uno a uno y se omite el inválido
+        frames = []
+        for path in paths:
+            try:
+                frames.append(pl.read_json(path, schema=schema))
+            except Exception as e:
+                print(f"Omitiendo {path}: {e}", file=sys.stderr)
+        return pl.concat(frames) if frames else pl.DataFrame(schema=schema)
+
+
+def _event_batches(
+    source_folder: str,
+    columns: list[str],
+    files_per_batch: int = FILES_PER_BATCH,
+    workers: Optional[int] = None,
+    paths: Optional[list[str]] = None,
+    exclude: Optional[Callable[[str], bool]] = None,
+    triggers: Optional[dict[str, int]] = None,
+) -> Iterator[pl.DataFrame]:
+    """Lee la carpeta (o solo `paths`) por grupos de archivos en un pool de hilos.
+
+    `pl.read_json` libera el GIL mientras decodifica, así que los grupos se
+    leen en paralelo; como mucho hay `2 * workers` grupos en vuelo, de modo
+    que la memoria no depende del número de archivos. Los grupos salen en
+    orden de nombre y, si se pide la columna `batch`, cada uno lleva su número,
+    o con `triggers` el disparador de sus archivos (nombre -> disparador; un
+    grupo nunca mezcla disparadores).
+    Se omiten los archivos para cuyo nombre `exclude` da True (ya compactados).
+    """
+    if paths is None:
+        paths = _list_json_files(source_folder)
+    if exclude is not None:
+        paths = [path for path in paths if not exclude(os.path.basename(path))]
+    if triggers is None:
+        chunks = [paths[i:i + files_per_batch] for i in range(0, len(paths), files_per_batch)]
+        batches = list(range(len(chunks)))
+    else:
+        chunks, batches = [], []
+        for path in paths:
+            trigger = triggers[os.path.basename(path)]
+            if not chunks or batches[-1] != trigger or len(chunks[-1]) >= files_per_batch:
+                chunks.append([])
+                batches.append(trigger)
+            chunks[-1].append(path)
+    workers = workers or os.cpu_count() or 1
+    event_columns = [name for name in columns if name in EVENT_SCHEMA]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = [executor.submit(_read_files, chunk, event_columns) for chunk in chunks[:2 * workers]]
+        for index, chunk in enumerate(chunks[2 * workers:] + [None] * len(pending)):
+            df = pending.pop(0).result()
+            if chunk is not None:
+                pending.append(executor.submit(_read_files, chunk, event_columns))
+            if "batch" in columns:
+                df = df.with_columns(pl.lit(batches[index], dtype=pl.Int64).alias("batch")).select(columns)
+            yield df
+
+
+def scan_events(
+    source_folder: str,
+    *,
+    files_per_batch: int = FILES_PER_BATCH,
+    workers: Optional[int] = None,
+    paths: Optional[list[str]] = None,
+    exclude: Optional[Callable[[str], bool]] = None,
+    triggers: Optional[dict[str, int]] = None,
+) -> pl.LazyFrame:
+    """LazyFrame con los eventos de todos los `*.json` de `source_folder`.
+
+    Los archivos no se listan ni se leen hasta ejecutar el plan. Polars
+    empuja al escaneo las columnas que usa el plan (solo esas se
+    decodifican), el filtro y el límite de filas. Con `paths` solo se leen
+    esos archivos. La columna `batch` numera los grupos de `files_per_batch`
+    archivos (los disparadores de `max_files_per_trigger`), o con `triggers`
+    el disparador de cada archivo.
+    """
+    if register_io_source is None:
+        columns = list(SCAN_SCHEMA)
+        frames = list(_event_batches(source_folder, columns, files_per_batch, workers, paths, exclude, triggers))
+        return pl.concat(frames).lazy() if frames else pl.LazyFrame(schema=SCAN_SCHEMA)
+
+    def source(
+        with_columns: Optional[list[str]],
+        predicate: Optional[pl.Expr],
+        n_rows: Optional[int],
+        batch_size: Optional[int],
+    ) -> Iterator[pl.DataFrame]:
+        columns = with_columns or list(SCAN_SCHEMA)
+        for df in _event_batches(source_folder, columns, files_per_batch, workers, paths, exclude, triggers):
+            if predicate is not None:
+                df = df.filter(predicate)
+            if n_rows is not None:
+                df = df.head(n_rows)
+                n_rows -= df.height
+            yield df
+            if n_rows is not None and n_rows <= 0:
+                break
+
+    return register_io_source(source, schema=SCAN_SCHEMA)
+
+def parse_duration(text: str) -> datetime.timedelta:
+    """Duración en formato de Polars ("10s", "1m") o de Spark ("10 seconds", "1 minute")."""
+    match = _DURATION_RE.match(text)
+    if not match or match.group(2).lower() not in _DURATION_UNITS:
+        raise ValueError(f"Duración no válida: {text!r}")
+    return datetime.timedelta(seconds=float(match.group(1)) * _DURATION_UNITS[match.group(2).lower()])
+
+
+def parse_size(text: str) -> int:
+    """Tamaño en bytes a partir de "512MB", "2GB" o un número de bytes."""
+    match = _SIZE_RE.match(text)
+    if not match or match.group(2).lower() not in _SIZE_UNITS:
+        raise ValueError(f"Tamaño no válido: {text!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def _window_args(
+    window_duration: str,
+    slide_duration: Optional[str],
+    watermark: Optional[str],
+    output_mode: Optional[str],
+) -> tuple[datetime.timedelta, datetime.timedelta, Optional[datetime.timedelta], str]:
+    """(ventana, paso, retraso de la marca de agua, modo de salida) validados."""
+    window = parse_duration(window_duration)
+    slide = parse_duration(slide_duration) if slide_duration else window
+    delay = parse_duration(watermark) if watermark else None
+    mode = output_mode or ("append" if delay is not None else "complete")
+    if mode not in ("complete", "append"):
+        raise ValueError(f"Invalid output mode: {mode}")
+    if mode == "append" and delay is None:
+        raise ValueError("El modo append requiere una marca de agua (watermark)")
+    return window, slide, delay, mode
+
+
 def process_data_lazy(
     source_folder: str, 
     *,
@@ -27,61 +247,258 @@ def process_data_lazy(
     slide_duration: Optional[str] = None,
     watermark: Optional[str] = None, 
     max_files_per_trigger: Optional[int] = None,
+    output_mode: Optional[str] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
 ) -> pl.LazyFrame:
     """
     Procesa logs de servicios para calcular la tasa de éxito en ventanas de tiempo.
-    El 'source_folder' es una carpeta que contiene múltiples archivos JSON.
+    El 'source_folder' es una carpeta que contiene múltiples archivos JSON
+    (y, si se ejecutó compact.py, su parte ya compactada en Parquet).
+
+    El resultado es el mismo que el de `task_6.producer`: ventanas deslizantes
+    de `window_duration` cada `slide_duration`, alineadas a la época, con una
+    fila por (ventana, servicio) ordenadas por inicio de ventana y servicio.
+    Los archivos se procesan en orden de nombre, en disparadores de
+    `max_files_per_trigger` archivos (uno solo si no se indica).
+    `output_mode` sigue a Spark:
+
+    - "complete" (por defecto sin `watermark`): todas las ventanas.
+    - "append" (por defecto con `watermark`): después de cada disparador la
+      marca de agua es el evento más reciente visto menos `watermark`; en
+      los disparadores siguientes se descartan los eventos de las ventanas
+      que terminan antes de ella, y solo se emiten las ventanas finalizadas
+      (las que terminan antes de la marca de agua final).
+
+    `since`/`until` (UTC) limitan los eventos a `[since, until)`.
     """
+    window, slide, delay, mode = _window_args(window_duration, slide_duration, watermark, output_mode)
 
-    # --- Cambio clave aquí: Construir el patrón glob ---
-    # Polars necesita un patrón glob (ej: 'data/*.json') para leer múltiples archivos.
-    # El método os.path.join() crea la ruta de forma segura en cualquier sistema operativo.
-    # Si la carpeta es '.', el patrón será './*.json'
-    # Si la carpeta es 'data', el patrón será 'data/*.json'
     json_pattern = os.path.join(source_folder, "*.json")
 
     print(f"Buscando archivos con el patrón: {json_pattern}")
 
-    # 1. Carga de datos de forma Lazy
-    try:
-        # Para Polars, necesitamos leer todos los archivos JSON y concatenarlos
-        # Usamos glob para encontrar todos los archivos
-        import glob
-        json_files = glob.glob(json_pattern)
-        
-        if not json_files:
-            print(f"Error: No se encontraron archivos JSON en '{json_pattern}'.", file=sys.stderr)
-            sys.exit(1)
-        
-        print(f"Encontrados {len(json_files)} archivos JSON")
-        
-        # Leemos todos los archivos y los concatenamos
-        # Usamos scan_ndjson si son archivos de líneas o read_json + concat para arrays JSON
-        dataframes = []
-        for json_file in json_files:
-            df = pl.read_json(json_file)
-            dataframes.append(df)
-        
-        # Concatenamos todos los dataframes y convertimos a LazyFrame
-        raw_lf = pl.concat(dataframes).lazy()
-        
-    except Exception as e:
-        # Capturamos errores si no encuentra archivos o hay un error de I/O
-        print(f"Error: No se pudo escanear archivos JSON en '{json_pattern}'. Asegúrate de que la ruta de la carpeta es correcta y contiene archivos JSON. Detalles: {e}", file=sys.stderr)
+    # 1. Carga de datos de forma Lazy: el listado y la lectura de los archivos
+    # ocurren dentro del escaneo, al ejecutar el plan (ver `scan_input`)
+    manifest = load_compaction_manifest(source_folder)
+    if manifest is None and not any(True for _ in glob.iglob(json_pattern)):
+        print(f"Error: No se encontraron archivos JSON en '{json_pattern}'.", file=sys.stderr)
         sys.exit(1)
 
-    # El resto de la lógica de Polars permanece igual...
+    raw_lf = scan_input(
+        source_folder,
+        max_files_per_trigger=max_files_per_trigger,
+        since=since,
+        until=until,
+        manifest=manifest,
+    )
+
+    # 2. Agregados por (ventana, servicio); en modo complete no se descarta nada
+    windowed_lf, newest_lf = _windowed(
+        _parse(raw_lf), window, slide, delay if mode == "append" else None
+    )
+    return _finalize(_merge([windowed_lf]), mode, delay, newest_lf)
+
+
+def load_compaction_manifest(source_folder: str) -> Optional[dict]:
+    """Manifiesto de compact.py, o None si la carpeta no se ha compactado.
+
+    Como el estado incremental, resume los nombres ordenables compactados en
+    `position`: están compactados todos los que no pasan de ella salvo los
+    de `pending` (recientes o ilegibles al compactar). `files` lista solo los
+    demás nombres y `parts` las partes Parquet; qué archivos tiene cada
+    parte se guarda aparte por generación (ver `compacted_sources`). Un
+    manifiesto anterior, con todos los nombres y las fuentes de cada parte,
+    se resume al leerlo y compact.py lo reescribe en la siguiente ejecución.
+    """
+    try:
+        with open(os.path.join(source_folder, COMPACTED_DIR, COMPACTED_MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if isinstance(manifest["parts"], dict):
+        names = set(manifest["files"])
+        rows = [(name, part) for part, sources in manifest["parts"].items() for name in sources]
+        located = {name for name, _ in rows}
+        rows += [(name, None) for name in sorted(names - located)]
+        position = max((name for name in names if _SORTABLE_NAME.match(name)), default=None)
+        listed = (os.path.basename(path) for path in _list_json_files(source_folder))
+        manifest = {
+            "generation": manifest["generation"],
+            "position": position,
+            "pending": [
+                name for name in listed
+                if _SORTABLE_NAME.match(name) and position is not None and name <= position and name not in names
+            ],
+            "files": [name for name in names if not _SORTABLE_NAME.match(name)],
+            "parts": list(manifest["parts"]),
+            "legacy": pl.DataFrame(rows, schema=SOURCES_SCHEMA, orient="row"),
+        }
+    manifest["pending"] = set(manifest["pending"])
+    manifest["files"] = set(manifest["files"])
+    return manifest
+
+
+def is_compacted(manifest: Optional[dict], name: str) -> bool:
+    """Indica si el archivo JSON `name` ya está en las partes compactadas."""
+    if manifest is None:
+        return False
+    if _SORTABLE_NAME.match(name):
+        position = manifest["position"]
+        return position is not None and name <= position and name not in manifest["pending"]
+    return name in manifest["files"]
+
+
+def sources_path(source_folder: str, generation: int) -> str:
+    """Tabla (`source`, `part`) que escribe compact.py en la generación `generation`."""
+    return os.path.join(source_folder, COMPACTED_DIR, COMPACTED_SOURCES, f"{generation:06d}.parquet")
+
+
+def compacted_sources(source_folder: str, manifest: Optional[dict], after: int = 0) -> pl.DataFrame:
+    """Archivos compactados en las generaciones posteriores a `after` y sus partes.
 
-    slide = slide_duration if slide_duration is not None else window_duration
+    Una fila (`source`, `part`) por archivo de origen y parte; `part` es
+    nulo para los archivos sin eventos. Una ejecución incremental solo lee
+    las tablas de las generaciones que aún no incorporó.
+    """
+    if manifest is None:
+        return pl.DataFrame(schema=SOURCES_SCHEMA)
+    frames = [manifest["legacy"]] if "legacy" in manifest and after < manifest["generation"] else []
+    paths = [sources_path(source_folder, generation) for generation in range(after + 1, manifest["generation"] + 1)]
+    frames += [pl.read_parquet(path) for path in paths if os.path.exists(path)]
+    return pl.concat(frames) if frames else pl.DataFrame(schema=SOURCES_SCHEMA)
+
+
+def extract_status(message: pl.Expr) -> pl.Expr:
+    """Código HTTP del mensaje como Int16 (nulo si no lo trae)."""
+    return (
+        message
+        .str.extract(pattern=_STATUS_RE, group_index=1)
+        .cast(pl.Int16, strict=False)
+        .alias('status')
+    )
+
+
+def _partition_filter(
+    since: Optional[datetime.datetime], until: Optional[datetime.datetime]
+) -> Optional[pl.Expr]:
+    """Predicado sobre las columnas `date`/`hour` para abrir solo esas particiones."""
+    predicates = []
+    if since is not None:
+        predicates.append(
+            (pl.col('date') > since.date())
+            | ((pl.col('date') == since.date()) & (pl.col('hour') >= since.hour))
+        )
+    if until is not None:
+        predicates.append(
+            (pl.col('date') < until.date())
+            | ((pl.col('date') == until.date()) & (pl.col('hour') <= until.hour))
+        )
+    return pl.all_horizontal(predicates) if predicates else None
 
-    parsed_lf = (
+
+def file_triggers(names: Iterable[str], max_files_per_trigger: Optional[int]) -> Optional[dict[str, int]]:
+    """Disparador de cada archivo: su posición en orden de nombre dividida por `max_files_per_trigger`.
+
+    Se calcula sobre los nombres compactados y los de la cola JSON juntos,
+    así que compactar no cambia los disparadores. Sin `max_files_per_trigger`
+    todo es un solo disparador (None).
+    """
+    if not max_files_per_trigger:
+        return None
+    return {name: index // max_files_per_trigger for index, name in enumerate(sorted(names))}
+
+
+def scan_input(
+    source_folder: str,
+    *,
+    max_files_per_trigger: Optional[int] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    manifest: Optional[dict] = None,
+    paths: Optional[list[str]] = None,
+    sources: Optional[set[str]] = None,
+    parts: Optional[list[str]] = None,
+    triggers: Optional[dict[str, int]] = None,
+    **options: Any,
+) -> pl.LazyFrame:
+    """Eventos de la carpeta: la parte compactada en Parquet más la cola JSON.
+
+    Columnas: `service`, `timestamp`, `status` (ya extraído) y `batch`, el
+    disparador de cada evento. Los archivos, compactados o no, forman
+    disparadores de `max_files_per_trigger` en orden de nombre (uno solo si
+    no se indica), como si no se hubiera compactado; `triggers` da esa
+    asignación ya calculada (ver `file_triggers`). Con `since`/`until` solo
+    se abren las particiones de esas horas. `paths` y `sources` restringen la
+    lectura a esos archivos JSON y a las filas compactadas de esos archivos
+    de origen (ejecución incremental o por trozos), y `parts` a esas partes
+    Parquet (por omisión, todas las del manifiesto). `options` se pasa a
+    `scan_events`.
+    """
+    exclude = functools.partial(is_compacted, manifest) if manifest else None
+    if max_files_per_trigger:
+        options["files_per_batch"] = max_files_per_trigger
+        if triggers is None:
+            # Los disparadores dependen de todos los nombres: la cola se lista ya
+            if paths is None:
+                paths = [path for path in _list_json_files(source_folder) if not is_compacted(manifest, os.path.basename(path))]
+            in_scope = sources
+            if in_scope is None:
+                in_scope = set(compacted_sources(source_folder, manifest)['source'])
+            triggers = file_triggers(in_scope.union(os.path.basename(path) for path in paths), max_files_per_trigger)
+    json_lf = scan_events(source_folder, paths=paths, exclude=exclude, triggers=triggers, **options)
+    if triggers is None:
+        # Un solo disparador: los grupos de lectura no cuentan como disparadores
+        json_lf = json_lf.with_columns(pl.lit(0, dtype=pl.Int64).alias('batch'))
+    frames = [json_lf.select('service', 'timestamp', extract_status(pl.col('message')), 'batch')]
+
+    if parts is None:
+        parts = manifest["parts"] if manifest else []
+    if parts:
+        compacted_lf = pl.scan_parquet(
+            [os.path.join(source_folder, COMPACTED_DIR, part) for part in parts],
+            hive_partitioning=True,
+            hive_schema=HIVE_SCHEMA,
+        )
+        partitions = _partition_filter(since, until)
+        if partitions is not None:
+            compacted_lf = compacted_lf.filter(partitions)
+        compacted_lf = compacted_lf.with_columns(pl.col('source').cast(pl.String))
+        if triggers is None:
+            if sources is not None:
+                compacted_lf = compacted_lf.filter(pl.col('source').is_in(list(sources)))
+            compacted_lf = compacted_lf.with_columns(pl.lit(0, dtype=pl.Int64).alias('batch'))
+        else:
+            # El disparador de cada fila sale de su archivo de origen; el join
+            # también descarta las filas de archivos fuera de `sources`
+            names = sorted(triggers if sources is None else sources)
+            batches = pl.LazyFrame(
+                {'source': names, 'batch': [triggers[name] for name in names]},
+                schema={'source': pl.String, 'batch': pl.Int64},
+            )
+            compacted_lf = compacted_lf.join(batches, on='source', how='inner')
+        frames.insert(0, compacted_lf.select(pl.col('service').cast(pl.String), 'timestamp', 'status', 'batch'))
+
+    events_lf = pl.concat(frames)
+    if since is not None:
+        events_lf = events_lf.filter(pl.col('timestamp') >= _epoch(since))
+    if until is not None:
+        events_lf = events_lf.filter(pl.col('timestamp') < _epoch(until))
+    return events_lf
+
+
+def _epoch(moment: datetime.datetime) -> float:
+    """Segundos desde la época; las fechas sin zona horaria se toman en UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return moment.timestamp()
+
+
+def _parse(raw_lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Calcula el instante de cada evento y descarta los que no traen código HTTP."""
+    return (
         raw_lf
         .with_columns([
-            pl.col('message')
-              .str.extract(pattern=_STATUS_RE, group_index=1)
-              .cast(pl.Int32)
-              .alias('status'),
-
             pl.from_epoch(pl.col('timestamp'), time_unit='s')
               .alias('event_time'),
         ])
@@ -92,37 +509,491 @@ def process_data_lazy(
         ])
     )
 
-    # Simplificamos: agrupar por servicio y obtener estadísticas generales
-    windowed_lf = (
+
+def _windowed(
+    parsed_lf: pl.LazyFrame,
+    window: datetime.timedelta,
+    slide: datetime.timedelta,
+    delay: Optional[datetime.timedelta] = None,
+    newest: Optional[datetime.datetime] = None,
+    history: Optional[pl.DataFrame] = None,
+) -> tuple[pl.LazyFrame, pl.LazyFrame]:
+    """Agregados parciales por (ventana, servicio) y el evento más reciente de cada disparador.
+
+    Cada evento cuenta en todas las ventanas `[inicio, inicio + window)` con
+    `inicio` múltiplo de `slide` que lo contienen, como `F.window` de Spark:
+    el `offset` negativo hace que `group_by_dynamic` abra también las
+    ventanas que empiezan antes del primer evento. Con `delay` se descartan,
+    por disparador (`batch`), los eventos de ventanas que terminan antes de
+    la marca de agua vigente al empezarlo: el evento más reciente de los
+    disparadores anteriores (o `newest`, de ejecuciones anteriores) menos `delay`.
+    `history` trae el evento más reciente de los disparadores leídos en trozos
+    anteriores de la misma ejecución (columnas `batch` y `newest`).
+    """
+    offset = -(math.ceil(window / slide) - 1) * slide
+    # Las dos ramas (ventanas y marcas de agua) comparten un solo escaneo
+    parsed_lf = parsed_lf.cache()
+    partials = (
         parsed_lf
-        .group_by(['service'])
+        .sort('event_time')
+        .group_by_dynamic(
+            'event_time',
+            every=slide,
+            period=window,
+            offset=offset,
+            closed='left',
+            label='left',
+            include_boundaries=True,
+            start_by='window',
+            group_by=['service', 'batch'],
+        )
         .agg([
-            pl.len().alias('total'),
-            pl.sum('is_success').alias('successes'),
-            pl.min('event_time').alias('window_start'),
-            pl.max('event_time').alias('window_end'),
+            pl.len().cast(pl.Int64).alias('total'),
+            pl.sum('is_success').cast(pl.Int64).alias('successes'),
         ])
+        .rename({'_lower_boundary': 'window_start', '_upper_boundary': 'window_end'})
+        .drop('event_time')
+    )
+
+    batch_newest = parsed_lf.group_by('batch').agg(pl.max('event_time').alias('newest'))
+    if delay is not None:
+        seen = pl.col('newest').cum_max().shift(1)
+        if newest is not None:
+            seen = pl.max_horizontal(seen, pl.lit(newest))
+        batches = batch_newest
+        if history is not None:
+            batches = pl.concat([history.lazy(), batch_newest]).group_by('batch').agg(pl.max('newest'))
+        watermarks = batches.sort('batch').select('batch', (seen - delay).alias('watermark'))
+        partials = (
+            partials
+            .join(watermarks, on='batch', how='left')
+            .filter(pl.col('watermark').is_null() | (pl.col('window_end') > pl.col('watermark')))
+            .drop('watermark')
+        )
+
+    partials = partials.select(['window_start', 'window_end', 'service', 'total', 'successes'])
+    return partials, batch_newest
+
+
+def _merge(partials: list[pl.LazyFrame]) -> pl.LazyFrame:
+    """Combina agregados parciales de la misma ventana y servicio sumando sus conteos."""
+    return (
+        pl.concat(partials)
+        .group_by(['window_start', 'window_end', 'service'])
+        .agg([
+            pl.sum('total'),
+            pl.sum('successes'),
+        ])
+    )
+
+
+def _finalize(
+    aggregated_lf: pl.LazyFrame,
+    mode: str,
+    delay: Optional[datetime.timedelta],
+    newest_lf: pl.LazyFrame,
+) -> pl.LazyFrame:
+    if mode == "append":
+        # Solo las ventanas que la marca de agua final ya cerró
+        aggregated_lf = (
+            aggregated_lf
+            .join(newest_lf.select(pl.max('newest')), how='cross')
+            .filter(pl.col('window_end') <= pl.col('newest') - delay)
+            .drop('newest')
+        )
+    return (
+        aggregated_lf
         .with_columns([
             (pl.col('successes') / pl.col('total')).cast(pl.Float64).alias('success_rate'),
         ])
         .select([
-            'service', 
             'window_start', 
             'window_end', 
+            'service', 
             'total', 
             'successes', 
             'success_rate'
         ])
-        .sort('service')
+        .sort(['window_start', 'service'])
+    )
+
+
+# ---------------------------------------------
+# EJECUCIÓN POR TROZOS
+# ---------------------------------------------
+#
+# Con `memory_budget` la entrada se divide en trozos de archivos (y de partes
+# compactadas) que caben en el presupuesto, y el plan se ejecuta trozo a
+# trozo: en memoria solo quedan los eventos de un trozo, los agregados por
+# (ventana, servicio) acumulados y el evento más reciente de cada disparador.
+# Como cada evento suma a sus ventanas de forma independiente y la marca de
+# agua de un disparador solo depende de los anteriores, el resultado es el
+# mismo que con un único plan. Los trozos respetan los disparadores: o son
+# disparadores completos, o partes de uno solo cuando no cabe entero.
+
+
+class _Chunk(NamedTuple):
+    sources: set[str]  # archivos ya compactados: se leen sus filas de las partes Parquet
+    paths: list[str]  # archivos JSON de la cola
+    parts: list[str]  # partes Parquet con filas de `sources`
+
+
+def _split_by_size(items: list[str], sizes: dict[str, float], limit: int) -> Iterator[list[str]]:
+    """Grupos consecutivos de `items` cuyo tamaño total no pasa de `limit` (al menos uno)."""
+    group: list[str] = []
+    total = 0.0
+    for item in items:
+        if group and total + sizes[item] > limit:
+            yield group
+            group, total = [], 0.0
+        group.append(item)
+        total += sizes[item]
+    if group:
+        yield group
+
+
+def _pruned_parts(
+    parts: list[str], since: Optional[datetime.datetime], until: Optional[datetime.datetime]
+) -> list[str]:
+    """Las partes de `parts` cuyas particiones caen en `[since, until)`."""
+    partitions = _partition_filter(since, until)
+    if partitions is None or not parts:
+        return parts
+    hive = pl.DataFrame({'part': parts}).with_columns(
+        pl.col('part').str.extract(r'date=([^/]+)').str.to_date().alias('date'),
+        pl.col('part').str.extract(r'hour=(\d+)').cast(pl.Int8).alias('hour'),
+    )
+    return hive.filter(partitions)['part'].to_list()
+
+
+def _plan_chunks(
+    source_folder: str,
+    compacted: pl.DataFrame,
+    paths: list[str],
+    max_files_per_trigger: Optional[int],
+    memory_budget: Optional[int],
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+) -> list[_Chunk]:
+    """Divide los archivos (los compactados de `compacted` y los JSON de `paths`) en trozos para `memory_budget` bytes.
+
+    `compacted` tiene las filas (`source`, `part`) de `compacted_sources`.
+    Los archivos se recorren en orden de nombre, en los mismos disparadores
+    que `file_triggers`. El tamaño de un archivo compactado se estima
+    repartiendo el de cada parte (dentro de `[since, until)`) entre sus
+    archivos de origen.
+    """
+    sources = set(compacted['source'])
+    parts = _pruned_parts(compacted['part'].drop_nulls().unique().sort().to_list(), since, until)
+    if memory_budget is None:
+        return [_Chunk(sources, paths, parts)]
+    limit = max(memory_budget // INPUT_EXPANSION, 1)
+    tail = {os.path.basename(path): path for path in paths}
+    sizes = dict.fromkeys(sources, 0.0)
+    sizes.update({name: float(os.path.getsize(path)) for name, path in tail.items()})
+    located = compacted.filter(pl.col('part').is_in(parts))
+    counts = dict(located.group_by('part').len().iter_rows())
+    shares = {part: os.path.getsize(os.path.join(source_folder, COMPACTED_DIR, part)) / counts[part] for part in counts}
+    parts_of: dict[str, list[str]] = {}
+    for name, part in located.iter_rows():
+        sizes[name] += shares[part]
+        parts_of.setdefault(name, []).append(part)
+
+    def chunk(names: list[str]) -> _Chunk:
+        origin = {name for name in names if name not in tail}
+        return _Chunk(
+            origin,
+            [tail[name] for name in names if name in tail],
+            sorted({part for name in origin for part in parts_of.get(name, ())}),
+        )
+
+    order = sorted(sizes)
+    per_trigger = max_files_per_trigger or len(order) or 1
+    chunks: list[_Chunk] = []
+    current: list[str] = []
+    size = 0.0
+    for start in range(0, len(order), per_trigger):
+        trigger = order[start:start + per_trigger]
+        trigger_size = sum(sizes[name] for name in trigger)
+        if current and size + trigger_size > limit:
+            chunks.append(chunk(current))
+            current, size = [], 0.0
+        if trigger_size > limit:
+            # El disparador no cabe entero: se parte en trozos del mismo disparador
+            chunks.extend(chunk(group) for group in _split_by_size(trigger, sizes, limit))
+            continue
+        current += trigger
+        size += trigger_size
+    if current:
+        chunks.append(chunk(current))
+    return chunks or [_Chunk(set(), [], [])]
+
+
+def _aggregate_chunks(
+    source_folder: str,
+    chunks: list[_Chunk],
+    manifest: Optional[dict],
+    window: datetime.timedelta,
+    slide: datetime.timedelta,
+    delay: Optional[datetime.timedelta],
+    newest: Optional[datetime.datetime] = None,
+    *,
+    aggregates: Optional[pl.DataFrame] = None,
+    **scan_options: Any,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Ejecuta el plan trozo a trozo sobre `aggregates`.
+
+    Devuelve los agregados por (ventana, servicio) acumulados y el evento
+    más reciente de cada disparador. `scan_options` se pasa a `scan_input`.
+    """
+    history = pl.DataFrame(schema={'batch': pl.Int64, 'newest': pl.Datetime('us')})
+    for number, chunk in enumerate(chunks, start=1):
+        if len(chunks) > 1:
+            print(f"Trozo {number}/{len(chunks)}: {len(chunk.sources)} compactados, {len(chunk.paths)} archivos")
+        raw_lf = scan_input(
+            source_folder, manifest=manifest, paths=chunk.paths, sources=chunk.sources, parts=chunk.parts, **scan_options
+        )
+        windowed_lf, batch_newest_lf = _windowed(_parse(raw_lf), window, slide, delay, newest, history)
+        partials = [windowed_lf] if aggregates is None else [aggregates.lazy(), windowed_lf]
+        aggregates, batch_newest = pl.collect_all([_merge(partials), batch_newest_lf])
+        history = pl.concat([history, batch_newest]).group_by('batch').agg(pl.max('newest'))
+    if aggregates is None:
+        raise ValueError("Se necesita al menos un trozo")
+    return aggregates, history
+
+
+def process_data_chunked(
+    source_folder: str,
+    *,
+    memory_budget: str | int,
+    window_duration: str = '10s',
+    slide_duration: Optional[str] = None,
+    watermark: Optional[str] = None,
+    max_files_per_trigger: Optional[int] = None,
+    output_mode: Optional[str] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    **options: Any,
+) -> pl.DataFrame:
+    """Como `process_data_lazy`, pero con la memoria acotada por `memory_budget`.
+
+    `memory_budget` ("512MB", "2GB" o bytes) limita lo que ocupan los
+    eventos de cada trozo; el intérprete y Polars ocupan algo más aparte.
+    El resultado es idéntico al de `process_data_lazy`. `options` se pasa a
+    `scan_events`.
+    """
+    window, slide, delay, mode = _window_args(window_duration, slide_duration, watermark, output_mode)
+    budget = parse_size(memory_budget) if isinstance(memory_budget, str) else memory_budget
+
+    manifest = load_compaction_manifest(source_folder)
+    compacted = compacted_sources(source_folder, manifest)
+    paths = [path for path in _list_json_files(source_folder) if not is_compacted(manifest, os.path.basename(path))]
+    if manifest is None and not paths:
+        print(f"Error: No se encontraron archivos JSON en '{source_folder}'.", file=sys.stderr)
+        sys.exit(1)
+
+    chunks = _plan_chunks(source_folder, compacted, paths, max_files_per_trigger, budget, since, until)
+    names = set(compacted['source']).union(os.path.basename(path) for path in paths)
+    aggregates, history = _aggregate_chunks(
+        source_folder,
+        chunks,
+        manifest,
+        window,
+        slide,
+        delay if mode == "append" else None,
+        max_files_per_trigger=max_files_per_trigger,
+        triggers=file_triggers(names, max_files_per_trigger),
+        since=since,
+        until=until,
+        **options,
+    )
+    return _finalize(aggregates.lazy(), mode, delay, history.lazy()).collect()
+
+
+# ---------------------------------------------
+# EJECUCIÓN INCREMENTAL
+# ---------------------------------------------
+#
+# `state_dir` guarda los agregados parciales por (ventana, servicio) en
+# `aggregates-<generación>.parquet` y en `manifest.json` la generación
+# vigente, qué archivos ya se incorporaron, el evento más reciente (de él
+# sale la marca de agua de la ejecución siguiente) y la configuración de
+# ventanas con que se calcularon. Los nombres ordenables del generador
+# (`%Y%m%d_%H%M%S_%f.json`) se resumen en una marca de agua, `position`: el
+# mayor nombre incorporado; solo los demás nombres se guardan uno a uno, así
+# que el manifiesto no crece con el histórico. Como en `ingest.high_water_mark`
+# de las tareas en vivo, un archivo ordenable que llegue tarde con un nombre
+# menor que `position` se omite. `compaction` es la última generación de
+# compact.py incorporada: solo se leen las tablas de fuentes de las
+# generaciones siguientes (ver `compacted_sources`). El manifiesto se reemplaza de forma atómica
+# después de escribir el Parquet, así que una ejecución interrumpida deja el
+# estado anterior intacto y sus archivos se vuelven a procesar.
+
+MANIFEST_NAME = "manifest.json"
+
+
+class _State(NamedTuple):
+    generation: int
+    files: set[str]  # archivos incorporados con nombres no ordenables
+    aggregates: Optional[pl.DataFrame]
+    newest: Optional[datetime.datetime]
+    position: Optional[str] = None  # mayor nombre ordenable incorporado
+    compaction: int = 0  # última generación de compact.py incorporada
+
+    def processed(self, name: str) -> bool:
+        if _SORTABLE_NAME.match(name):
+            return self.position is not None and name <= self.position
+        return name in self.files
+
+    def advance(self, names: Iterable[str]) -> tuple[set[str], Optional[str]]:
+        """`files` y `position` después de incorporar `names`."""
+        files = self.files.union(names)
+        sortable = {name for name in files if _SORTABLE_NAME.match(name)}
+        return files - sortable, max(filter(None, [self.position, *sortable]), default=None)
+
+
+def _load_state(state_dir: str, layout: dict) -> _State:
+    """Último estado guardado, o uno vacío si no hay o si cambió `layout`."""
+    try:
+        with open(os.path.join(state_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return _State(0, set(), None, None)
+    if manifest.get("layout") != layout:
+        print("El estado guardado usa otra configuración de ventanas: se recalcula desde cero")
+        return _State(0, set(), None, None)
+    aggregates = pl.read_parquet(os.path.join(state_dir, manifest["aggregates"]))
+    newest = datetime.datetime.fromisoformat(manifest["newest"]) if manifest["newest"] else None
+    # Los manifiestos anteriores a `position` listan todos los nombres: se resumen al guardar
+    state = _State(
+        manifest["generation"], set(manifest["files"]), aggregates, newest, manifest.get("position"),
+        manifest.get("compaction", 0),
     )
+    files, position = state.advance(())
+    return state._replace(files=files, position=position)
+
+
+def write_json_atomic(path: str, payload: dict) -> None:
+    """Escribe `payload` en `path` (archivo temporal + fsync + `os.replace`)."""
+    directory, name = os.path.split(path)
+    fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=f".{name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def _save_state(state_dir: str, state: _State, layout: dict) -> None:
+    if state.aggregates is None:
+        raise ValueError("El estado a guardar no tiene agregados")
+    os.makedirs(state_dir, exist_ok=True)
+    name = f"aggregates-{state.generation:06d}.parquet"
+    state.aggregates.write_parquet(os.path.join(state_dir, name))
+
+    manifest = {
+        "generation": state.generation,
+        "aggregates": name,
+        "layout": layout,
+        "newest": state.newest.isoformat() if state.newest else None,
+        "position": state.position,
+        "files": sorted(state.files),
+        "compaction": state.compaction,
+    }
+    write_json_atomic(os.path.join(state_dir, MANIFEST_NAME), manifest)
+
+    # Los agregados de generaciones anteriores ya no los referencia el manifiesto
+    for old in glob.glob(os.path.join(state_dir, "aggregates-*.parquet")):
+        if os.path.basename(old) != name:
+            os.unlink(old)
+
+
+def process_data_incremental(
+    source_folder: str,
+    state_dir: str,
+    *,
+    window_duration: str = '10s',
+    slide_duration: Optional[str] = None,
+    watermark: Optional[str] = None,
+    max_files_per_trigger: Optional[int] = None,
+    output_mode: Optional[str] = None,
+    memory_budget: Optional[str | int] = None,
+    **options: Any,
+) -> pl.DataFrame:
+    """Como `process_data_lazy`, pero solo lee los archivos nuevos desde la última ejecución.
+
+    Los agregados de los archivos nuevos se combinan con los guardados en
+    `state_dir`, de modo que el costo depende de los datos nuevos y no de
+    todo el histórico. Cada ejecución continúa los disparadores de la
+    anterior: la marca de agua parte del evento más reciente guardado. Los
+    archivos que compact.py ya pasó a Parquet se leen de sus partes, una sola
+    vez, aunque se hayan borrado los JSON. Con `memory_budget` los archivos
+    nuevos se leen por trozos, como en `process_data_chunked`. `options` se
+    pasa a `scan_events`; no admite `since`/`until`, porque los agregados
+    guardados deben cubrir todos los eventos de los archivos incorporados.
+    """
+    if options.get("since") is not None or options.get("until") is not None:
+        raise ValueError("La ejecución incremental no admite since/until")
+    window, slide, delay, mode = _window_args(window_duration, slide_duration, watermark, output_mode)
+    if mode == "complete":
+        delay = None  # Como en Spark, en modo complete no se descarta nada
+    layout = {
+        "window": window.total_seconds(),
+        "slide": slide.total_seconds(),
+        "watermark": delay.total_seconds() if delay is not None else None,
+    }
+
+    state = _load_state(state_dir, layout)
+    manifest = load_compaction_manifest(source_folder)
+    generation = manifest["generation"] if manifest else 0
+    # Si la carpeta se volvió a compactar desde cero, se revisan todas las generaciones
+    compacted = compacted_sources(source_folder, manifest, state.compaction if state.compaction <= generation else 0)
+    sources = {name for name in compacted['source'].unique() if not state.processed(name)}
+    compacted = compacted.filter(pl.col('source').is_in(list(sources)))
+    paths = [
+        path for path in _list_json_files(source_folder)
+        if not state.processed(os.path.basename(path)) and not is_compacted(manifest, os.path.basename(path))
+    ]
+    print(f"{len(paths) + len(sources)} archivos nuevos (ya procesados hasta {state.position})")
 
-    return windowed_lf
+    if not paths and not sources:
+        if state.aggregates is None:
+            print(f"Error: No se encontraron archivos JSON en '{source_folder}'.", file=sys.stderr)
+            sys.exit(1)
+        saved_lf = pl.LazyFrame({'newest': [state.newest]}, schema={'newest': pl.Datetime('us')})
+        return _finalize(state.aggregates.lazy(), mode, delay, saved_lf).collect()
+
+    budget = parse_size(memory_budget) if isinstance(memory_budget, str) else memory_budget
+    chunks = _plan_chunks(source_folder, compacted, paths, max_files_per_trigger, budget)
+    aggregates, history = _aggregate_chunks(
+        source_folder,
+        chunks,
+        manifest,
+        window,
+        slide,
+        delay,
+        state.newest,
+        aggregates=state.aggregates,
+        max_files_per_trigger=max_files_per_trigger,
+        triggers=file_triggers(sources.union(os.path.basename(path) for path in paths), max_files_per_trigger),
+        **options,
+    )
+    candidates = [history['newest'].max(), state.newest]
+    newest_event = max((t for t in candidates if isinstance(t, datetime.datetime)), default=None)
+    files, position = state.advance(sources.union(os.path.basename(p) for p in paths))
+    _save_state(state_dir, _State(state.generation + 1, files, aggregates, newest_event, position, generation), layout)
+    newest_lf = pl.LazyFrame({'newest': [newest_event]}, schema={'newest': pl.Datetime('us')})
+    return _finalize(aggregates.lazy(), mode, delay, newest_lf).collect()
 
 # ---------------------------------------------
 # PARTE DE EJECUCIÓN DEL SCRIPT
 # ---------------------------------------------
 
-def main():
+def main() -> None:
     """Configura el analizador de argumentos y ejecuta el plan Lazy de Polars."""
     parser = argparse.ArgumentParser(
         description="Calcula la tasa de éxito de servicios en ventanas de tiempo usando Polars LazyFrame."
@@ -151,20 +1022,88 @@ def main():
         help='El paso o "slide" de la ventana. Valor predeterminado: 10s.'
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        '--state_dir',
+        type=str,
+        default=None,
+        help='Carpeta con el estado de la ejecución incremental: solo se leen los archivos nuevos desde la anterior.'
+    )
 
-    # 1. Definir el plan de ejecución Lazy
-    print(f"Procesando archivos en la carpeta: {args.source_folder}")
+    parser.add_argument(
+        '--watermark',
+        type=str,
+        default=None,
+        help='Retraso de la marca de agua (ej: "30s"). Con ella solo se emiten las ventanas finalizadas.'
+    )
+    parser.add_argument(
+        '--max_files_per_trigger',
+        type=int,
+        default=None,
+        help='Archivos por disparador; la marca de agua avanza entre disparadores, como en Spark.'
+    )
+    parser.add_argument(
+        '--output_mode',
+        choices=['complete', 'append'],
+        default=None,
+        help='complete: todas las ventanas; append: solo las finalizadas. Por defecto append si hay --watermark.'
+    )
 
-    lazy_plan = process_data_lazy(
-        args.source_folder, # Pasamos la carpeta
+    parser.add_argument(
+        '--since',
+        type=datetime.datetime.fromisoformat,
+        default=None,
+        help='Solo eventos desde este instante UTC (ej: "2025-10-15T10:00"); la parte compactada solo abre esas particiones.'
+    )
+    parser.add_argument(
+        '--until',
+        type=datetime.datetime.fromisoformat,
+        default=None,
+        help='Solo eventos anteriores a este instante UTC.'
+    )
+
+    parser.add_argument(
+        '--memory_budget',
+        type=str,
+        default=None,
+        help='Memoria para los eventos (ej: "512MB", "2GB"): la carpeta se procesa por trozos que caben en ella.'
+    )
+
+    args = parser.parse_args()
+    if args.state_dir and (args.since or args.until):
+        parser.error("--since/--until no se pueden combinar con --state_dir")
+    window_options = dict(
         window_duration=args.window_duration,
-        slide_duration=args.slide_duration
+        slide_duration=args.slide_duration,
+        watermark=args.watermark,
+        max_files_per_trigger=args.max_files_per_trigger,
+        output_mode=args.output_mode,
     )
 
+    # 1. Definir el plan de ejecución Lazy
+    print(f"Procesando archivos en la carpeta: {args.source_folder}")
+
     # 2. Ejecutar el plan y obtener el resultado
     try:
-        df_result = lazy_plan.collect()
+        if args.state_dir:
+            df_result = process_data_incremental(
+                args.source_folder, args.state_dir, memory_budget=args.memory_budget, **window_options
+            )
+        elif args.memory_budget:
+            df_result = process_data_chunked(
+                args.source_folder,
+                memory_budget=args.memory_budget,
+                since=args.since,
+                until=args.until,
+                **window_options
+            )
+        else:
+            lazy_plan = process_data_lazy(
+                args.source_folder, # Pasamos la carpeta
+                since=args.since,
+                until=args.until,
+                **window_options
+            )
+            df_result = lazy_plan.collect()
 
         # 3. Mostrar los resultados
         print("\n--- Resultados (Tasa de Éxito por Ventana) ---")
@@ -1,10 +1,13 @@
 from __future__ import annotations
+
+import datetime
 import queue as _q
 import threading
-from typing import Optional
-from pyspark.sql import SparkSession, DataFrame, functions as F, types as T
-import datetime
-from typing import NamedTuple, TypedDict
+from typing import NamedTuple, Optional, TypedDict
+
+from pyspark.sql import DataFrame, SparkSession
+from pyspark.sql import functions as F
+from pyspark.sql import types as T
 
 
 class Result(NamedTuple):
@@ -19,6 +22,11 @@ class Events(TypedDict):
     message: str
 
 
+# Modos de salida de `writeStream.outputMode`; `compute` y `producer` usan el mismo por defecto
+OUTPUT_MODES = ('complete', 'update', 'append')
+DEFAULT_OUTPUT_MODE = 'update'
+
+
 def compute(
     source: str,
     stop: threading.Event,
@@ -28,8 +36,20 @@ def compute(
     window_duration: str = '10 seconds',
     slide_duration: str = '10 seconds',
     watermark: str = '30 seconds',
-    max_files_per_trigger: int = 10
+    max_files_per_trigger: int = 10,
+    output_mode: str = DEFAULT_OUTPUT_MODE,
 ):
+    """Tasa de éxito por (ventana, servicio) de cada micro-lote.
+
+    `output_mode` sigue a Spark: "update" emite en cada disparador solo las
+    ventanas que cambiaron y "append" solo las que la marca de agua ya
+    cerró; en ambos la marca de agua descarta el estado de las ventanas
+    cerradas. "complete" vuelve a emitir, ordenadas, todas las ventanas
+    vistas en cada disparador, así que su costo crece con el estado.
+    """
+    if output_mode not in OUTPUT_MODES:
+        raise ValueError(f"Invalid output mode: {output_mode}")
+
     spark = (
         SparkSession.builder
         .appName('task_6.compute_success_rate')
@@ -40,12 +60,15 @@ def compute(
     outbox: _q.Queue = _q.Queue()
 
     def _foreach_batch(df, batch_id):
-        if df.rdd.isEmpty():
-            return
-
+        # Un solo job por lote: el `collect` ya dice si está vacío (sin `df.rdd.isEmpty()`)
         rows = df.select(
             'service', 'window_start', 'window_end', 'total', 'successes', 'success_rate'
         ).collect()
+        if not rows:
+            return
+        if output_mode != 'complete':
+            # Fuera de complete el plan no ordena; las pocas filas del lote se ordenan aquí
+            rows.sort(key=lambda r: (r['window_start'], r['service']))
 
         for r in rows:
             outbox.put(
@@ -64,12 +87,13 @@ def compute(
             slide_duration=slide_duration,
             watermark=watermark,
             max_files_per_trigger=max_files_per_trigger,
+            output_mode=output_mode,
         )
 
         query = (
             sdf.writeStream
             .foreachBatch(_foreach_batch)
-            .outputMode('complete')
+            .outputMode(output_mode)
             .option('checkpointLocation', checkpoint)
             .trigger(processingTime=processing_time)
             .start()
@@ -112,7 +136,18 @@ def producer(
     slide_duration: Optional[str],
     watermark: str,
     max_files_per_trigger: int,
+    output_mode: str = DEFAULT_OUTPUT_MODE,
 ) -> DataFrame:
+    """Agregados por (ventana, servicio) del directorio `source` en streaming.
+
+    `output_mode` debe ser el mismo que se pase a `writeStream.outputMode`.
+    Solo en modo "complete" el resultado se ordena por inicio de ventana y
+    servicio: Spark no admite ordenar una agregación en streaming en los
+    otros modos, y ahí cada disparador emite solo una parte de las ventanas.
+    """
+    if output_mode not in OUTPUT_MODES:
+        raise ValueError(f"Invalid output mode: {output_mode}")
+
     raw = (
         spark.readStream.format('json')
         .schema(_SCHEMA)
@@ -148,8 +183,9 @@ def producer(
             'successes',
             'success_rate',
         )
-        .orderBy(F.col('window_start').asc(), F.col('service').asc())
     )
+    if output_mode == 'complete':
+        windowed = windowed.orderBy(F.col('window_start').asc(), F.col('service').asc())
 
     return windowed
 
@@ -158,8 +194,8 @@ def producer(
 #  EJECUCIÓN DIRECTA
 # =====================
 if __name__ == "__main__":
-    import time
     import os
+    import time
 
     # Ruta de prueba: cambia esto por la carpeta donde tienes tus JSONs
     SOURCE_DIR = os.path.abspath("data/input")
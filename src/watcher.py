@@ -0,0 +1,328 @@
+"""
+Observador de directorios compartido por las tareas en vivo.
+
+En Linux se usa inotify y solo se emiten los archivos que terminan de
+escribirse (IN_CLOSE_WRITE) o que se mueven dentro del directorio
+(IN_MOVED_TO), de modo que no hay que re-escanear la carpeta completa en cada
+iteración. En otras plataformas se recurre a un sondeo periódico.
+
+Para que la memoria y el costo de escaneo no crezcan con el tiempo, el
+observador puede archivar los archivos ya procesados en un subdirectorio
+(`archive`, opcionalmente particionado por fecha) o llevar una marca de agua
+sobre los nombres ordenables `%Y%m%d_%H%M%S_%f.json` que produce
+`scripts/generator.py` (`high_water_mark`).
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import pathlib
+import re
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Any, Iterator
+
+# ---------------------------------------------------------------------
+# Constantes de inotify (ver <sys/inotify.h>)
+# ---------------------------------------------------------------------
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+_READ_SIZE = 64 * 1024
+
+# Prefijo de fecha de los nombres que genera scripts/generator.py
+_DATED_NAME_RE = re.compile(r"^(\d{8})_")
+
+
+def _load_libc() -> Any:
+    """Carga libc solo si expone la API de inotify (Linux)."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+_LIBC = _load_libc()
+
+
+def inotify_available() -> bool:
+    """Indica si el backend de inotify puede usarse en esta plataforma."""
+    return _LIBC is not None
+
+
+# ---------------------------------------------------------------------
+# Observador
+# ---------------------------------------------------------------------
+class DirectoryWatcher:
+    """Emite, por lotes, los archivos nuevos de un directorio.
+
+    Los archivos que ya existen al arrancar se emiten primero (ordenados por
+    nombre); después solo se emiten los que aparecen mientras se observa.
+
+    Opciones de seguimiento:
+
+    - `archive`: subdirectorio (relativo a `path`) al que se mueven los
+      archivos de un lote cuando el consumidor pide el siguiente. Con
+      `partition_by_date` se agrupan en `archive/YYYYMMDD/`. Con
+      `defer_archive` no se mueven solos: el consumidor los archiva con
+      `archive_files` (p. ej. tras guardar el checkpoint que los cubre) y
+      hasta entonces no se vuelven a emitir.
+    - `high_water_mark`: en lugar de recordar cada nombre, solo se recuerda el
+      mayor nombre emitido (`position`) y se ignoran los nombres menores o
+      iguales. Requiere nombres ordenables como los del generador.
+    - `start_after`: posición inicial; se ignoran los archivos existentes con
+      nombre menor o igual (p. ej. la posición guardada en un checkpoint).
+
+    Con `archive` o `high_water_mark` la memoria del observador es constante
+    (con inotify se conservan además los nombres del escaneo inicial, para no
+    repetir los que aún se estaban escribiendo); con `archive` además el
+    directorio observado deja de crecer.
+    """
+
+    def __init__(
+        self,
+        path: str | pathlib.Path,
+        *,
+        pattern: str = "*.json",
+        backend: str = "auto",
+        poll_interval: float = 0.5,
+        archive: str | None = None,
+        partition_by_date: bool = False,
+        high_water_mark: bool = False,
+        start_after: str | None = None,
+        defer_archive: bool = False,
+    ):
+        if backend == "auto":
+            backend = "inotify" if inotify_available() else "poll"
+        if backend not in ("inotify", "poll"):
+            raise ValueError(f"Invalid watcher backend: {backend}")
+        if backend == "inotify" and not inotify_available():
+            raise RuntimeError("inotify no está disponible en esta plataforma")
+
+        self.path = pathlib.Path(path)
+        self.pattern = pattern
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.archive = archive
+        self.partition_by_date = partition_by_date
+        self.high_water_mark = high_water_mark
+        self.start_after = start_after
+        self.position = start_after
+        self.defer_archive = defer_archive
+        # Emitidos y aún sin archivar (solo con `defer_archive`); el candado
+        # evita que un escaneo vea un archivo a medio mover
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+
+    def batches(self, stop: threading.Event) -> Iterator[list[pathlib.Path]]:
+        """Genera listas no vacías de archivos nuevos hasta que se active `stop`."""
+        while not stop.is_set():
+            if not self.path.is_dir():
+                print(f"[WATCHER] Directorio no encontrado: {self.path}", flush=True)
+                stop.wait(1)
+                continue
+
+            if self.backend == "inotify":
+                source = self._inotify_batches(stop)
+            else:
+                source = self._poll_batches(stop)
+
+            for paths in source:
+                yield paths
+                # El consumidor pidió el siguiente lote: el anterior ya se leyó.
+                if self.archive is not None and not self.defer_archive:
+                    self._archive(self.archive, paths)
+
+    def archive_files(self, paths: list[pathlib.Path]) -> None:
+        """Archiva archivos ya emitidos (con `defer_archive`); sin `archive` no hace nada."""
+        if self.archive is None:
+            return
+        with self._lock:
+            self._archive(self.archive, paths)
+            self._pending.difference_update(path.name for path in paths)
+
+    # -----------------------------------------------------------------
+    # Utilidades internas
+    # -----------------------------------------------------------------
+    def _matches(self, name: str) -> bool:
+        return fnmatch.fnmatchcase(name, self.pattern)
+
+    def _threshold(self) -> str | None:
+        """Nombre hasta el que (inclusive) los archivos ya se consideran procesados."""
+        return self.position if self.high_water_mark else self.start_after
+
+    def _scan(self) -> list[str]:
+        """Lista (ordenada) de archivos del directorio pendientes de procesar."""
+        position = self._threshold()
+        try:
+            with self._lock, os.scandir(self.path) as entries:
+                return sorted(
+                    entry.name
+                    for entry in entries
+                    if self._matches(entry.name)
+                    and (position is None or entry.name > position)
+                    and entry.name not in self._pending
+                    and entry.is_file()
+                )
+        except FileNotFoundError:
+            return []
+
+    def _paths(self, names: list[str]) -> list[pathlib.Path]:
+        newest = max(names, default=None)
+        if newest is not None and (self.position is None or newest > self.position):
+            self.position = newest
+        if self.archive is not None and self.defer_archive:
+            with self._lock:
+                self._pending.update(names)
+        return [self.path / name for name in names]
+
+    def _archive(self, archive: str, paths: list[pathlib.Path]) -> None:
+        """Mueve los archivos ya procesados fuera del directorio observado."""
+        root = self.path / archive
+        for path in paths:
+            target = root
+            if self.partition_by_date:
+                target = root / _date_partition(path)
+            try:
+                target.mkdir(parents=True, exist_ok=True)
+                os.replace(path, target / path.name)
+            except FileNotFoundError:
+                continue  # Otro proceso ya lo movió o eliminó
+            except OSError as e:
+                print(f"[WATCHER] No se pudo archivar {path.name}: {e}", flush=True)
+
+    def _poll_batches(self, stop: threading.Event) -> Iterator[list[pathlib.Path]]:
+        # Con archivo o marca de agua el propio directorio (o `position`)
+        # indica qué falta por procesar; solo sin ellos hay que recordar nombres.
+        seen: set[str] | None = None
+        if self.archive is None and not self.high_water_mark:
+            seen = set()
+
+        while not stop.is_set() and self.path.is_dir():
+            names = self._scan()
+            if seen is not None:
+                names = [name for name in names if name not in seen]
+                seen.update(names)
+            if names:
+                yield self._paths(names)
+            else:
+                stop.wait(self.poll_interval)
+
+    def _inotify_batches(self, stop: threading.Event) -> Iterator[list[pathlib.Path]]:
+        fd = _LIBC.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        try:
+            # El watch se registra antes del escaneo inicial para no perder
+            # archivos que se cierren mientras se lista el directorio.
+            wd = _LIBC.inotify_add_watch(fd, os.fsencode(self.path), _WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                raise OSError(err, os.strerror(err), str(self.path))
+
+            existing = self._scan()
+            if existing:
+                yield self._paths(existing)
+            # Un archivo del escaneo que aún se estaba escribiendo produce su
+            # evento de cierre más tarde: se ignora una vez, cuando llegue.
+            initial = set(existing)
+            recoverable = self.archive is not None or self.high_water_mark
+
+            poller = select.poll()
+            poller.register(fd, select.POLLIN)
+            timeout_ms = int(self.poll_interval * 1000)
+
+            while not stop.is_set():
+                if not poller.poll(timeout_ms):
+                    continue
+
+                names, alive, overflow = self._read_events(fd)
+                if overflow and recoverable:
+                    # Se perdieron eventos: el directorio (o la marca de agua)
+                    # permite reconstruir qué archivos faltan.
+                    print("[WATCHER] Cola de inotify desbordada, re-escaneando", flush=True)
+                    names = sorted(set(names) | set(self._scan()))
+                elif overflow:
+                    print("[WATCHER] Cola de inotify desbordada", flush=True)
+                if initial:
+                    repeated = initial.intersection(names)
+                    names = [name for name in names if name not in repeated]
+                    initial -= repeated
+                position = self._threshold()
+                if position is not None:
+                    # Como en `_scan`: la marca de agua también filtra los eventos
+                    names = [name for name in names if name > position]
+                if names:
+                    yield self._paths(names)
+                if not alive:
+                    # El directorio se eliminó o se movió: volver a esperarlo.
+                    return
+        finally:
+            os.close(fd)
+
+    def _read_events(self, fd: int) -> tuple[list[str], bool, bool]:
+        """Vacía la cola de inotify: (nombres nuevos, watch vivo, hubo desborde)."""
+        names: list[str] = []
+        alive = True
+        overflow = False
+        while True:
+            try:
+                buffer = os.read(fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            if not buffer:
+                break
+
+            offset = 0
+            while offset < len(buffer):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                raw_name = buffer[offset : offset + length].split(b"\0", 1)[0]
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif mask & IN_IGNORED:
+                    alive = False
+                elif mask & _WATCH_MASK and raw_name:
+                    name = os.fsdecode(raw_name)
+                    if self._matches(name):
+                        names.append(name)
+
+        # Un mismo archivo puede cerrarse varias veces antes de leerse.
+        return sorted(set(names)), alive, overflow
+
+
+def _date_partition(path: pathlib.Path) -> str:
+    """Partición `YYYYMMDD` de un archivo: del nombre si es posible, si no de su mtime."""
+    match = _DATED_NAME_RE.match(path.name)
+    if match:
+        return match.group(1)
+    try:
+        return time.strftime("%Y%m%d", time.localtime(path.stat().st_mtime))
+    except OSError:
+        return time.strftime("%Y%m%d")
+
+
+def watch(
+    path: str | pathlib.Path, stop: threading.Event, **options: Any
+) -> Iterator[list[pathlib.Path]]:
+    """Atajo para `DirectoryWatcher(path, **options).batches(stop)`."""
+    return DirectoryWatcher(path, **options).batches(stop)
@@ -0,0 +1,59 @@
+import json
+import pathlib
+
+import pytest
+
+from src.checkpoint import Checkpointer, require_resumable, resume_ingest
+
+
+def test_checkpoint_roundtrip(tmp_path: pathlib.Path) -> None:
+    """El estado guardado se recupera igual y no quedan archivos temporales."""
+    checkpointer = Checkpointer(tmp_path / "ckpt", "task_x")
+    assert checkpointer.load() is None
+
+    state = {"counts": {"monitoring": [1, 2]}, "position": "20251015_214506_215493.json"}
+    checkpointer.save(state)
+
+    assert Checkpointer(tmp_path / "ckpt", "task_x").load() == state
+    assert [p.name for p in (tmp_path / "ckpt").iterdir()] == ["task_x.json"]
+
+
+def test_checkpoint_maybe_save_respects_interval(tmp_path: pathlib.Path) -> None:
+    checkpointer = Checkpointer(tmp_path, "task_x", interval=3600)
+    assert not checkpointer.maybe_save(lambda: {"n": 1})
+    assert checkpointer.load() is None
+
+    eager = Checkpointer(tmp_path, "task_x", interval=0)
+    assert eager.maybe_save(lambda: {"n": 2})
+    assert eager.load() == {"n": 2}
+
+
+def test_checkpoint_ignores_corrupt_file(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "task_x.json").write_text("{no es json")
+    assert Checkpointer(tmp_path, "task_x").load() is None
+
+    (tmp_path / "task_x.json").write_text(json.dumps({"version": 999, "state": {}}))
+    assert Checkpointer(tmp_path, "task_x").load() is None
+
+
+def test_resume_ingest_keeps_explicit_options() -> None:
+    assert resume_ingest(None, None) == {}
+    assert resume_ingest({"high_water_mark": True}, {"position": "b.json"}) == {
+        "high_water_mark": True,
+        "start_after": "b.json",
+    }
+    assert resume_ingest({"high_water_mark": True, "start_after": "a.json"}, {"position": "b.json"}) == {
+        "high_water_mark": True,
+        "start_after": "a.json",
+    }
+    # Sin marca de agua la posición no es fiable: lo pendiente es el directorio
+    assert resume_ingest({"archive": "processed"}, {"position": "b.json"}) == {"archive": "processed"}
+
+
+def test_require_resumable_needs_position_or_archive() -> None:
+    """Sin marca de agua ni archivo, reiniciar volvería a contar todo el directorio."""
+    require_resumable({"high_water_mark": True})
+    require_resumable({"archive": "processed"})
+    for ingest in (None, {}, {"backend": "poll"}):
+        with pytest.raises(ValueError):
+            require_resumable(ingest)
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from src.decoder import DecodeError, available_backends, get_decoder
+
+EVENTS = [
+    {"service": "monitoring", "timestamp": 1760564618.215106, "message": "HTTP Status Code: 201"},
+    {"service": "training", "timestamp": 1760564619, "message": "HTTP Status Code: 500"},
+]
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_decoder_returns_validated_events(backend: str) -> None:
+    events = get_decoder(backend).decode(json.dumps(EVENTS).encode())
+
+    assert [e["service"] for e in events] == ["monitoring", "training"]
+    assert [e["message"] for e in events] == [EVENTS[0]["message"], EVENTS[1]["message"]]
+    # Los timestamps enteros se normalizan a float
+    assert all(type(e["timestamp"]) is float for e in events)
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_decoder_wraps_single_event(backend: str) -> None:
+    events = get_decoder(backend).decode(json.dumps(EVENTS[0]))
+    assert events == [EVENTS[0]]
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize(
+    "payload",
+    [
+        b"",
+        b"[{\"service\": \"monitoring\"",
+        json.dumps([{"service": "monitoring", "timestamp": 1.0}]).encode(),
+        json.dumps([{"service": 1, "timestamp": 1.0, "message": "x"}]).encode(),
+        json.dumps([{"service": "s", "timestamp": "ayer", "message": "x"}]).encode(),
+        json.dumps([1, 2, 3]).encode(),
+    ],
+)
+def test_decoder_rejects_invalid_files(backend: str, payload: bytes) -> None:
+    with pytest.raises(DecodeError):
+        get_decoder(backend).decode(payload)
+
+
+def test_get_decoder_rejects_unknown_backend() -> None:
+    assert available_backends()[-1] == "json"
+    with pytest.raises(ValueError):
+        get_decoder("simdjson")
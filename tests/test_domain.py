@@ -0,0 +1,44 @@
+import numpy as np
+
+from src.domain import NO_STATUS, EventBatch, parse_status
+
+
+def test_parse_status() -> None:
+    assert parse_status("HTTP Status Code: 200") == 200
+    assert parse_status("upstream HTTP Status Code: 503 after retry") == 503
+    assert parse_status("HTTP Status Code: ") == NO_STATUS
+    assert parse_status("HTTP Status Code: abc") == NO_STATUS
+    assert parse_status("sin código") == NO_STATUS
+
+
+def test_event_batch_from_events() -> None:
+    batch = EventBatch.from_events(
+        [
+            {"service": "training", "timestamp": 30.0, "message": "HTTP Status Code: 200"},
+            {"service": "monitoring", "timestamp": 10.0, "message": "HTTP Status Code: 500"},
+            {"service": "training", "timestamp": 20.0, "message": "HTTP Status Code: 200"},
+            {"service": "training", "timestamp": 40.0, "message": "otro mensaje"},
+        ]
+    )
+
+    assert len(batch) == 4
+    assert batch.timestamps.dtype == np.float64
+    assert batch.status.dtype == np.int16
+    assert batch.services == ("training", "monitoring")
+    assert batch.service_ids.tolist() == [0, 1, 0, 0]
+    assert batch.messages == ("HTTP Status Code: 200", "HTTP Status Code: 500", "otro mensaje")
+    assert batch.status.tolist() == [200, 500, 200, NO_STATUS]
+    assert (batch.oldest, batch.newest) == (10.0, 40.0)
+
+    # Se evalúa una vez por mensaje distinto y se expande a cada evento
+    calls = []
+    mask = batch.map_messages(lambda m: calls.append(m) or m.endswith("200"))
+    assert mask.tolist() == [True, False, True, False]
+    assert len(calls) == 3
+
+
+def test_event_batch_empty() -> None:
+    batch = EventBatch.from_events([])
+    assert len(batch) == 0
+    assert batch.services == ()
+    assert batch.map_messages(bool).tolist() == []
@@ -0,0 +1,20 @@
+import threading
+
+from src.published import Published
+
+
+def test_published_get_and_wait() -> None:
+    """Los lectores ven la última instantánea y pueden esperar la siguiente."""
+    cell: Published[tuple[int, int]] = Published()
+    assert cell.get() is None
+    assert cell.wait(cell.version, timeout=0.01) is None
+
+    cell.publish((1, 1))
+    assert cell.get() == (1, 1)
+    version = cell.version
+
+    timer = threading.Timer(0.05, cell.publish, args=((2, 2),))
+    timer.start()
+    assert cell.wait(version, timeout=2) == (2, 2)
+    assert cell.version == version + 1
+    timer.join()
@@ -3,7 +3,9 @@ import json
 import pathlib
 import threading
 import time
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
+
+import pytest
 
 # Importaciones del código fuente
 from src.task_1 import compute
@@ -103,3 +105,149 @@ def test_streaming_log_aggregator(tmp_path: pathlib.Path) -> None:
 
     # Detener el generador
     stop.set()
+
+
+def test_streaming_log_aggregator_resumes_from_checkpoint(tmp_path: pathlib.Path) -> None:
+    """
+    Tras un reinicio con checkpoint, las métricas se restauran y los archivos
+    ya procesados no se vuelven a leer.
+    """
+    source = tmp_path / "source_logs"
+    source.mkdir(parents=True, exist_ok=True)
+    checkpoints = tmp_path / "checkpoints"
+    basetime = datetime.datetime(2025, 10, 26, 17, 0, 0)
+
+    with open(source / "20251026_170000_000000.json", "w") as file:
+        json.dump(
+            [
+                {"service": "monitoring", "timestamp": basetime.timestamp(), "message": "HTTP Status Code: 200"},
+                {"service": "monitoring", "timestamp": basetime.timestamp(), "message": "HTTP Status Code: 500"},
+            ],
+            file,
+        )
+
+    stop = threading.Event()
+    ingest = {"high_water_mark": True}
+    generator = compute(
+        str(source), stop=stop, ingest=ingest, checkpoint_dir=str(checkpoints), checkpoint_interval=0
+    )
+    assert next(generator).value == 0.5
+    generator.close()
+
+    # Reinicio: solo el archivo nuevo debe leerse
+    with open(source / "20251026_170001_000000.json", "w") as file:
+        json.dump(
+            [{"service": "monitoring", "timestamp": basetime.timestamp(), "message": "HTTP Status Code: 200"}],
+            file,
+        )
+
+    stop = threading.Event()
+    generator = compute(str(source), stop=stop, ingest=ingest, checkpoint_dir=str(checkpoints))
+    assert next(generator).value == 2 / 3
+    generator.close()
+
+
+def test_checkpoint_with_archive_keeps_unsortable_names(tmp_path: pathlib.Path) -> None:
+    """
+    Con nombres uuid y `archive`, un archivo que llega durante la caída con
+    un nombre menor que el último procesado se cuenta al reiniciar.
+    """
+    source = tmp_path / "source_logs"
+    source.mkdir(parents=True, exist_ok=True)
+    checkpoints = tmp_path / "checkpoints"
+    ingest = {"archive": "processed"}
+    timestamp = datetime.datetime(2025, 10, 26, 17, 0, 0).timestamp()
+
+    with open(source / "d3b07384-d113-4ec6-a3b1-5f2a0c9e7a10.json", "w") as file:
+        json.dump(
+            [
+                {"service": "monitoring", "timestamp": timestamp, "message": "HTTP Status Code: 200"},
+                {"service": "monitoring", "timestamp": timestamp, "message": "HTTP Status Code: 500"},
+            ],
+            file,
+        )
+
+    stop = threading.Event()
+    generator = compute(
+        str(source), stop=stop, ingest=ingest, checkpoint_dir=str(checkpoints), checkpoint_interval=0
+    )
+    assert next(generator).value == 0.5
+    generator.close()
+
+    late = source / "0a1b2c3d-4e5f-4a6b-8c7d-9e0f1a2b3c4d.json"
+    with open(late, "w") as file:
+        json.dump([{"service": "monitoring", "timestamp": timestamp, "message": "HTTP Status Code: 200"}], file)
+
+    stop = threading.Event()
+    generator = compute(str(source), stop=stop, ingest=ingest, checkpoint_dir=str(checkpoints))
+    assert next(generator).value == 2 / 3
+    generator.close()
+    assert not late.exists()
+
+
+def test_checkpoint_requires_resumable_ingest(tmp_path: pathlib.Path) -> None:
+    """Sin `high_water_mark` ni `archive` cada reinicio duplicaría las métricas."""
+    generator = compute(str(tmp_path), stop=threading.Event(), checkpoint_dir=str(tmp_path / "ckpt"))
+    with pytest.raises(ValueError):
+        next(generator)
+
+
+def test_checkpoint_archives_only_saved_files(tmp_path: pathlib.Path) -> None:
+    """Con `archive`, un archivo procesado sigue en el directorio hasta que un checkpoint lo cubre."""
+    source = tmp_path / "source_logs"
+    source.mkdir(parents=True, exist_ok=True)
+    checkpoints = tmp_path / "checkpoints"
+    timestamp = datetime.datetime(2025, 10, 26, 17, 0, 0).timestamp()
+    first = source / "d3b07384-d113-4ec6-a3b1-5f2a0c9e7a10.json"
+    with open(first, "w") as file:
+        json.dump([{"service": "monitoring", "timestamp": timestamp, "message": "HTTP Status Code: 200"}], file)
+
+    stop = threading.Event()
+    generator = compute(
+        str(source),
+        stop=stop,
+        ingest={"archive": "processed", "poll_interval": 0.05},
+        checkpoint_dir=str(checkpoints),
+        checkpoint_interval=3600,
+    )
+    assert next(generator).value == 1.0
+    # Una caída aquí no perdería nada: el archivo sigue pendiente
+    assert first.exists()
+    generator.close()
+
+    assert not first.exists()
+    assert (source / "processed" / first.name).exists()
+    assert (checkpoints / "task_1.json").exists()
+
+
+def test_success_rate_engine_all_services() -> None:
+    """Un solo motor calcula la tasa de todos los servicios, lote a lote."""
+    from src.domain import EventBatch
+    from src.task_1 import SuccessRateEngine
+
+    engine = SuccessRateEngine()
+    engine.update(
+        EventBatch.from_events(
+            [
+                {"service": "training", "timestamp": 1.0, "message": "HTTP Status Code: 200"},
+                {"service": "training", "timestamp": 1.0, "message": "HTTP Status Code: 404"},
+                {"service": "monitoring", "timestamp": 1.0, "message": "HTTP Status Code: 201"},
+                {"service": "monitoring", "timestamp": 1.0, "message": "sin código"},
+            ]
+        )
+    )
+    engine.update(
+        EventBatch.from_events(
+            [
+                {"service": "inference", "timestamp": 2.0, "message": "HTTP Status Code: 500"},
+                {"service": "training", "timestamp": 2.0, "message": "HTTP Status Code: 203"},
+            ]
+        )
+    )
+
+    assert engine.rates() == {"training": 2 / 3, "monitoring": 1.0, "inference": 0.0}
+    assert engine.rate("evaluation") == 0.0
+
+    restored = SuccessRateEngine(["monitoring", "training"])
+    restored.load_metrics(engine.to_metrics())
+    assert restored.rates() == {"monitoring": 1.0, "training": 2 / 3}
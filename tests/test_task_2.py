@@ -1,9 +1,13 @@
+import datetime
 import json
 import pathlib
-import datetime
 import threading
-import time
-from src.task_2 import compute # Asume que src/task_2.py es el módulo de tu función compute
+
+import pytest
+
+from src.task_2 import (
+    compute,  # Asume que src/task_2.py es el módulo de tu función compute
+)
 
 # Define la constante que se usa en task_2.py para la ventana
 WINDOW_SECONDS = 60
@@ -117,4 +121,139 @@ def test_task_2_sliding_window(tmp_path: pathlib.Path) -> None:
     assert (result_3.oldest_considered - expected_oldest_3).total_seconds() < 1
     
     # Detener el generador para una salida limpia, aunque pytest lo manejará.
-    stop_event.set()
\ No newline at end of file
+    stop_event.set()
+
+def test_failure_window_deque() -> None:
+    """La ventana expulsa por la izquierda y ubica en orden los eventos tardíos."""
+    from src.task_2 import FailureWindow
+
+    window = FailureWindow(WINDOW_SECONDS)
+    window.add("monitoring", [90.0, 30.0])
+    assert window.advance(90.0) == 30.0
+    assert window.count("monitoring") == 2
+
+    # Evento tardío dentro de la ventana: se inserta en orden
+    window.add("monitoring", [100.0, 50.0])
+    assert window.to_state() == {"monitoring": [30.0, 50.0, 90.0, 100.0]}
+
+    assert window.advance(155.0) == 95.0
+    assert window.to_state() == {"monitoring": [100.0]}
+
+    # Evento anterior al inicio de la ventana: se descarta
+    window.add("monitoring", [10.0])
+    assert window.count("monitoring") == 1
+
+    assert window.advance(500.0) == 440.0
+    assert window.count("monitoring") == 0
+    assert window.to_state() == {}
+
+
+def test_bucketed_failure_window_watermark() -> None:
+    """Los eventos tardíos caen en su bucket hasta que la marca de agua los supera."""
+    from src.task_2 import BucketedFailureWindow
+
+    window = BucketedFailureWindow(WINDOW_SECONDS, bucket_seconds=10, allowed_lateness=30)
+    window.add("monitoring", [100.0, 105.0])
+    # Marca de agua en 75: el bucket [100, 110) aún no entra en la ventana
+    assert window.window_end == 75.0
+    assert window.count("monitoring") == 0
+
+    window.add("monitoring", [140.0])
+    assert window.window_end == 110.0
+    assert window.window_start == 60.0
+    assert window.count("monitoring") == 2
+
+    # Tardío pero dentro de la ventana: se cuenta en su bucket
+    window.add("monitoring", [70.0])
+    assert window.count("monitoring") == 3
+
+    # Anterior al inicio de la ventana: se descarta y se contabiliza
+    window.add("monitoring", [50.0])
+    assert window.count("monitoring") == 3
+    assert window.late_events == 1
+
+    restored = BucketedFailureWindow(WINDOW_SECONDS, bucket_seconds=10, allowed_lateness=30)
+    restored.load_state(json.loads(json.dumps(window.to_state())))
+    assert restored.count("monitoring") == 3
+    assert restored.window_start == 60.0
+
+    window.advance(1000.0)
+    assert window.count("monitoring") == 0
+
+
+def test_multi_horizon_window_matches_brute_force() -> None:
+    """Cada horizonte coincide con contar los timestamps de su ventana."""
+    import numpy as np
+
+    from src.task_2 import MultiHorizonFailureWindow, horizon_label
+
+    horizons = [60, 300, 900, 3600]
+    window = MultiHorizonFailureWindow(horizons, bucket_seconds=1, rollup_seconds=60)
+    timestamps = np.sort(np.random.default_rng(0).uniform(0, 5000, 20_000))
+    for chunk in np.array_split(timestamps, 50):
+        window.add("monitoring", chunk)
+    window.advance(float(timestamps.max()))
+
+    for horizon in horizons:
+        start = window.window_start(horizon)
+        assert horizon - 60 < window.window_end - start <= horizon
+        expected = ((timestamps >= start) & (timestamps <= window.window_end)).sum()
+        assert window.count("monitoring", horizon) == expected
+
+    assert [horizon_label(h) for h in horizons] == ["1m", "5m", "15m", "1h"]
+    assert horizon_label(45) == "45s"
+
+
+def test_checkpoint_resets_window_when_buckets_change(tmp_path: pathlib.Path, capsys) -> None:
+    """Un checkpoint con otro `bucket_seconds` no se carga: sus ids de bucket no valen."""
+    source = tmp_path / "source"
+    source.mkdir(parents=True, exist_ok=True)
+    checkpoints = tmp_path / "checkpoints"
+    basetime = datetime.datetime.now().timestamp()
+    ingest = {"high_water_mark": True}
+
+    def write(name: str, offsets: list[float]) -> None:
+        with open(source / name, "w") as file:
+            json.dump(
+                [
+                    {"service": "monitoring", "timestamp": basetime + offset, "message": "HTTP Status Code: 500"}
+                    for offset in offsets
+                ],
+                file,
+            )
+
+    def run(bucket_seconds: float) -> float:
+        stop_event = threading.Event()
+        generator = compute(
+            str(source),
+            stop_event,
+            ingest=ingest,
+            checkpoint_dir=str(checkpoints),
+            checkpoint_interval=0,
+            engine="bucketed",
+            bucket_seconds=bucket_seconds,
+        )
+        value = next(generator).value
+        generator.close()
+        return value
+
+    write("a.json", [0.0, 1.0, 2.0])
+    assert run(1.0) == 3.0
+    write("b.json", [3.0])
+    assert run(1.0) == 4.0
+    assert "otra configuración" not in capsys.readouterr().out
+    write("c.json", [4.0])
+    assert run(5.0) == 1.0
+    assert "otra configuración" in capsys.readouterr().out
+
+
+def test_make_window_does_not_ignore_bucketed_options() -> None:
+    """Las opciones de buckets eligen la ventana por buckets; con la exacta son un error."""
+    from src.task_2 import FailureWindow, MultiHorizonFailureWindow, make_window
+
+    assert isinstance(make_window(), FailureWindow)
+    window = make_window(allowed_lateness=30)
+    assert isinstance(window, MultiHorizonFailureWindow) and window.fine.allowed_lateness == 30
+    assert isinstance(make_window(bucket_seconds=10), MultiHorizonFailureWindow)
+    with pytest.raises(ValueError, match="allowed_lateness"):
+        make_window("exact", allowed_lateness=30)
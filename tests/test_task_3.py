@@ -2,11 +2,11 @@ import datetime
 import json
 import pathlib
 import threading
-import numpy as np
 import time
 import uuid
-import pytest
-from src import domain
+
+import numpy as np
+
 from src.task_3 import compute
 
 """
@@ -121,7 +121,6 @@ def test_reservoir_sampling_probability(tmp_path: pathlib.Path) -> None:
     
     # Count occurrences
     count_200 = values.count(200.0)
-    count_500 = values.count(500.0)
     
     # With reservoir size 1 and equal distribution, we expect roughly 50/50
     # Allow for 30% deviation due to randomness
@@ -203,3 +202,169 @@ def test_empty_source(tmp_path: pathlib.Path) -> None:
     
     stop.set()
 
+
+
+def test_skip_reservoir_is_uniform() -> None:
+    """Con saltos (Algoritmo L) cada evento termina en el reservorio con probabilidad k/n."""
+    from src.task_3 import SkipReservoir
+
+    np.random.seed(0)
+    size, length, trials = 5, 50, 4000
+    hits = np.zeros(length)
+    for _ in range(trials):
+        reservoir = SkipReservoir(size)
+        for batch in np.array_split(np.arange(length), 7):
+            reservoir.update(batch)
+        assert len(reservoir.sample) == size
+        assert reservoir.seen == length
+        hits[reservoir.sample] += 1
+
+    frequency = hits / trials
+    assert np.all(np.abs(frequency - size / length) < 0.03)
+
+
+def test_mode_counter_matches_counter() -> None:
+    """La moda incremental coincide con recontar el reservorio tras cada cambio."""
+    from collections import Counter
+
+    from src.task_3 import ModeCounter
+
+    rng = np.random.default_rng(1)
+    sample = rng.choice([200, 404, 500, 503], size=20).tolist()
+    frequencies = ModeCounter()
+    for code in sample:
+        frequencies.add(code)
+
+    for _ in range(2000):
+        slot = int(rng.integers(len(sample)))
+        code = int(rng.choice([200, 404, 500, 503]))
+        frequencies.replace(sample[slot], code)
+        sample[slot] = code
+
+        counter = Counter(sample)
+        assert frequencies.counts == dict(counter)
+        assert counter[frequencies.mode()] == max(counter.values())
+
+
+def test_space_saving_bounds_and_merge() -> None:
+    """Los conteos acotan a los reales y dos resúmenes combinados conservan las cotas."""
+    from collections import Counter
+
+    from src.task_3 import SpaceSaving
+
+    rng = np.random.default_rng(2)
+    codes = np.concatenate([
+        np.full(3000, 200), np.full(1500, 500), rng.integers(300, 340, size=2000)
+    ])
+    rng.shuffle(codes)
+    left, right = np.array_split(codes, 2)
+    truth = Counter(codes.tolist())
+
+    sketches = []
+    for part in (left, right):
+        sketch = SpaceSaving(capacity=8)
+        for batch in np.array_split(part, 10):
+            sketch.update(batch)
+        sketches.append(sketch)
+    merged = sketches[0].merge(sketches[1])
+
+    assert merged.total == len(codes)
+    assert [code for code, _, _ in merged.top(2)] == [200, 500]
+    for code, count, error in merged.top():
+        assert count - error <= truth[code] <= count
+    for code in truth.keys() - merged.counts.keys():
+        assert truth[code] <= merged.max_error
+
+
+def test_space_saving_mode(tmp_path: pathlib.Path) -> None:
+    """El modo space_saving reporta el código más común y sus conteos por servicio."""
+    source = tmp_path / "source"
+    source.mkdir(parents=True, exist_ok=True)
+    basetime = datetime.datetime.now()
+    _batch_producer(source, basetime, 200, 30)
+    _batch_producer(source, basetime + datetime.timedelta(seconds=40), 500, 10)
+
+    stop = threading.Event()
+    generator = compute(str(source), stop, mode="space_saving", sketch_size=4)
+    # Los nombres son uuid: se lee hasta que ambos archivos estén procesados
+    deadline = time.monotonic() + 5
+    result = next(generator)
+    while not {"status 200", "status 500"} <= result.breakdown.keys() and time.monotonic() < deadline:
+        time.sleep(0.05)
+        result = next(generator)
+    stop.set()
+
+    assert result.value == 200.0
+    assert result.breakdown["status 200"] == 30.0
+    assert result.breakdown["status 200 error"] == 0.0
+    assert result.breakdown["monitoring mode"] == 200.0
+    assert result.breakdown["monitoring status 200"] == 30.0
+    assert result.breakdown["monitoring status 200 error"] == 0.0
+    assert result.breakdown["monitoring status 500"] == 10.0
+
+
+def test_merged_reservoirs_are_uniform() -> None:
+    """Combinar reservorios de partes de distinto tamaño sigue siendo uniforme."""
+    from src.task_3 import SkipReservoir
+
+    np.random.seed(3)
+    size, trials = 5, 4000
+    parts = np.split(np.arange(100), [10, 35])  # 10, 25 y 65 eventos
+    hits = np.zeros(100)
+    for _ in range(trials):
+        shards = []
+        for part in parts:
+            reservoir = SkipReservoir(size)
+            reservoir.update(part)
+            shards.append(reservoir)
+        merged = shards[0].merge(shards[1]).merge(shards[2])
+        assert merged.seen == 100
+        assert len(merged.sample) == size
+        hits[merged.sample] += 1
+
+    # Cada evento con probabilidad k/n = 0.05; por parte, el promedio también
+    frequency = hits / trials
+    assert np.all(np.abs(frequency - 0.05) < 0.02)
+    for part in parts:
+        assert abs(frequency[part].mean() - 0.05) < 0.005
+
+
+def test_sample_directory_with_workers(tmp_path: pathlib.Path) -> None:
+    """Varios procesos construyen reservorios por archivo y el coordinador los combina."""
+    from src.task_3 import sample_directory
+
+    basetime = datetime.datetime.now()
+    for i in range(6):
+        _batch_producer(tmp_path, basetime + datetime.timedelta(seconds=i), 200 if i < 5 else 500, 10)
+
+    reservoir = sample_directory(tmp_path, reservoir_size=8, workers=2)
+    assert reservoir.seen == 60
+    assert len(reservoir.sample) == 8
+    assert reservoir.mode() == 200
+
+
+def test_closing_generator_stops_threads_and_saves_checkpoint(tmp_path: pathlib.Path) -> None:
+    """Cerrar el generador sin `stop` detiene la ingesta y guarda el checkpoint final."""
+    source = tmp_path / "source"
+    source.mkdir(parents=True, exist_ok=True)
+    _batch_producer(source, datetime.datetime.now(), 200, 5)
+
+    stop = threading.Event()
+    checkpoints = tmp_path / "checkpoints"
+    generator = compute(
+        str(source),
+        stop,
+        ingest={"archive": "processed"},
+        checkpoint_dir=str(checkpoints),
+        checkpoint_interval=3600,
+    )
+    assert next(generator).value == 200.0
+    # El checkpoint aún no cubre el archivo: no se ha archivado
+    assert len(list(source.glob("*.json"))) == 1
+    generator.close()
+
+    assert stop.is_set()
+    assert not list(source.glob("*.json"))
+    assert len(list((source / "processed").glob("*.json"))) == 1
+    state = json.loads((checkpoints / "task_3.json").read_text())["state"]
+    assert state["newest"] != datetime.datetime(datetime.MINYEAR, 1, 1).isoformat()
@@ -4,8 +4,11 @@ import json
 import pathlib
 import threading
 
+import pytest
+
 from src.task_4 import compute
 
+
 def test_task_4_bloom(tmp_path: pathlib.Path) -> None:
     source = tmp_path / "src"
     source.mkdir()
@@ -26,3 +29,247 @@ def test_task_4_bloom(tmp_path: pathlib.Path) -> None:
     r1 = next(gen)
     assert abs(r1.value - 0.5) < 1e-9
     stop.set()
+
+
+def test_fast_bloom_filter_false_positive_rate() -> None:
+    """Sin falsos negativos y con una tasa de falsos positivos cercana a la teórica."""
+    import math
+
+    from src.task_4 import FastBloomFilter
+
+    n, m, k = 10_000, 100_000, 7
+    bloom = FastBloomFilter(m, k)
+    bloom.add_many(f"known-{i}" for i in range(n))
+
+    assert bloom.contains_many([f"known-{i}" for i in range(n)]).all()
+    assert "known-42" in bloom
+
+    probes = 100_000
+    fpr = bloom.contains_many([f"unknown-{i}" for i in range(probes)]).mean()
+    expected = (1 - math.exp(-k * n / m)) ** k
+    assert fpr < expected * 1.3
+
+
+def test_bloom_filter_mmap_cache(tmp_path: pathlib.Path) -> None:
+    """El filtro construido se reutiliza con mmap mientras no cambien patrones, m ni k."""
+    import numpy as np
+
+    from src.task_4 import load_bloom_filter
+
+    patterns = tmp_path / "patterns.txt"
+    patterns.write_text("HTTP Status Code: 500\nHTTP Status Code: 503\n")
+    cache = tmp_path / "cache"
+
+    built = load_bloom_filter(patterns, 8192, 3, engine="fast", cache_dir=cache)
+    assert len(list(cache.glob("*.bloom"))) == 1
+    cached = load_bloom_filter(patterns, 8192, 3, engine="fast", cache_dir=cache)
+    assert isinstance(cached.bits, np.memmap)
+    assert np.array_equal(np.asarray(built.bits), np.asarray(cached.bits))
+    assert "HTTP Status Code: 503" in cached
+
+    # Otro contenido reemplaza la entrada del mismo archivo
+    patterns.write_text("HTTP Status Code: 404\n")
+    rebuilt = load_bloom_filter(patterns, 8192, 3, engine="fast", cache_dir=cache)
+    assert "HTTP Status Code: 404" in rebuilt
+    assert len(list(cache.glob("*.bloom"))) == 1
+
+    # Otro k u otro archivo (p. ej. de otro proceso) conviven en la misma carpeta
+    other = tmp_path / "other.txt"
+    other.write_text("HTTP Status Code: 418\n")
+    load_bloom_filter(patterns, 8192, 4, engine="fast", cache_dir=cache)
+    load_bloom_filter(other, 8192, 3, engine="fast", cache_dir=cache)
+    entries = sorted(cache.glob("*.bloom"))
+    assert len(entries) == 3
+    load_bloom_filter(patterns, 8192, 3, engine="fast", cache_dir=cache)
+    assert sorted(cache.glob("*.bloom")) == entries
+
+    patterns.write_text("HTTP Status Code: 500\n")
+    load_bloom_filter(patterns, 8192, 3, engine="fast", cache_dir=cache)
+    assert len(list(cache.glob("*.bloom"))) == 3
+    # El filtro ya mapeado sigue leyendo su entrada borrada
+    assert "HTTP Status Code: 404" in rebuilt
+
+    for engine in ("sha256", "scalable"):
+        with pytest.raises(ValueError):
+            load_bloom_filter(patterns, 8192, 3, engine=engine, cache_dir=cache)
+
+
+def test_membership_cache_counts_and_eviction() -> None:
+    """Cada mensaje distinto se consulta al filtro una vez; la LRU respeta su tamaño."""
+    from src.task_4 import FastBloomFilter, MembershipCache
+
+    bloom = FastBloomFilter(8192, 3)
+    bloom.add_many(["HTTP Status Code: 500"])
+    cache = MembershipCache(bloom, maxsize=2)
+
+    assert cache.contains_many(["HTTP Status Code: 500", "HTTP Status Code: 200"]).tolist() == [True, False]
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert cache.contains_many(["HTTP Status Code: 500"] * 3).tolist() == [True] * 3
+    assert (cache.hits, cache.misses) == (3, 2)
+
+    # "500" es el más reciente: al entrar "404" se expulsa "200"
+    assert "HTTP Status Code: 404" not in cache
+    assert (len(cache), cache.evictions) == (2, 1)
+    assert "HTTP Status Code: 500" in cache
+    assert cache.misses == 3
+    assert cache.hit_rate == 4 / 7
+
+
+def test_scalable_bloom_filter_grows_within_error_rate() -> None:
+    """Se agregan tramos al crecer y la tasa total de falsos positivos se mantiene."""
+    from src.task_4 import ScalableBloomFilter
+
+    bloom = ScalableBloomFilter(initial_capacity=1000, error_rate=0.01)
+    bloom.add_many(f"known-{i}" for i in range(20_000))
+    bloom.add_many(["known-1", "known-2"])  # Repetidos: no consumen capacidad
+
+    assert len(bloom.slices) > 1
+    assert len(bloom) <= 20_000
+    assert bloom.contains_many([f"known-{i}" for i in range(20_000)]).all()
+    assert bloom.contains_many([f"unknown-{i}" for i in range(50_000)]).mean() < 0.01
+
+
+def test_scalable_bloom_filter_counts_batch_duplicates_once() -> None:
+    from src.task_4 import ScalableBloomFilter
+
+    bloom = ScalableBloomFilter(initial_capacity=10, error_rate=0.01)
+    bloom.add_many(["a", "b", "a", "a", "b"] * 100)
+
+    assert len(bloom) == 2 and len(bloom.slices) == 1
+
+
+def test_pattern_file_follower_appends_and_rewrites(tmp_path: pathlib.Path) -> None:
+    from src.task_4 import PatternFileFollower
+
+    patterns = tmp_path / "patterns.txt"
+    patterns.write_text("HTTP Status Code: 500\n")
+    follower = PatternFileFollower(patterns)
+    assert follower.poll() is None
+
+    with open(patterns, "a") as f:
+        f.write("HTTP Status Code: 503\nHTTP Status")  # Última línea incompleta
+    assert follower.poll() == ("append", ["HTTP Status Code: 503"])
+    with open(patterns, "a") as f:
+        f.write(" Code: 504\n")
+    assert follower.poll() == ("append", ["HTTP Status Code: 504"])
+
+    # Mismo tamaño o mayor, pero con otro contenido: reescritura
+    patterns.write_text("HTTP Status Code: 404\n" * 4)
+    assert follower.poll() == ("rewrite", [])
+    follower.reset()
+    assert follower.poll() is None
+
+    # Edición en el mismo lugar, con el mismo tamaño
+    with open(patterns, "r+") as f:
+        f.write("HTTP Status Code: 405\n")
+    assert follower.poll() == ("rewrite", [])
+    follower.reset()
+
+    # Edición lejos del final y luego una línea añadida: el resumen de lo leído cambia
+    data = patterns.read_text().replace("405", "406", 1) + "HTTP Status Code: 410\n"
+    with open(patterns, "r+") as f:
+        f.write(data)
+    assert follower.poll() == ("rewrite", [])
+
+
+def test_task_4_hot_reload(tmp_path: pathlib.Path) -> None:
+    """Las líneas añadidas y las reescrituras del archivo de patrones se aplican en vivo."""
+    import time
+
+    source = tmp_path / "src"
+    source.mkdir()
+    patterns = tmp_path / "patterns.txt"
+    patterns.write_text("HTTP Status Code: 500\n")
+    t0 = datetime.datetime(2025, 1, 1).timestamp()
+
+    def write_batch(name: str) -> None:
+        with open(source / name, "w") as f:
+            json.dump([
+                {"service": "s", "timestamp": t0, "message": "HTTP Status Code: 500"},
+                {"service": "s", "timestamp": t0, "message": "HTTP Status Code: 503"},
+            ], f)
+
+    write_batch("b1.json")
+    stop = threading.Event()
+    gen = compute(str(source), stop=stop, filter_file=str(patterns), engine="scalable", reload_interval=0.05)
+    assert next(gen).value == 0.5
+
+    with open(patterns, "a") as f:
+        f.write("HTTP Status Code: 503\n")
+    time.sleep(0.3)
+    write_batch("b2.json")
+    assert next(gen).value == 1.0
+
+    patterns.write_text("HTTP Status Code: 404\n")
+    time.sleep(0.3)
+    write_batch("b3.json")
+    assert next(gen).value == 0.0
+    stop.set()
+
+
+def test_aho_corasick_matches_naive_substring_search() -> None:
+    import random
+
+    from src.task_4 import AhoCorasick, FastBloomFilter, SubstringMatcher
+
+    rng = random.Random(7)
+    patterns = ["".join(rng.choices("abc", k=rng.randint(1, 5))) for _ in range(30)]
+    texts = ["".join(rng.choices("abcd", k=rng.randint(0, 12))) for _ in range(2000)]
+    automaton = AhoCorasick(patterns)
+    expected = [any(p in text for p in patterns) for text in texts]
+
+    assert automaton.contains_many(texts).tolist() == expected
+    assert "xx" + patterns[0] + "yy" in automaton
+    assert len(automaton) == len(set(patterns))
+
+    bloom = FastBloomFilter(8192, 3)
+    bloom.add_many(patterns)
+    assert SubstringMatcher(automaton, bloom).contains_many(texts).tolist() == expected
+
+
+def test_substring_prefilter_false_positive_is_not_a_match() -> None:
+    from src.task_4 import AhoCorasick, FastBloomFilter, SubstringMatcher
+
+    # Un filtro saturado da positivo para todo
+    bloom = FastBloomFilter(64, 1)
+    bloom.bits[:] = 0xFF
+    matcher = SubstringMatcher(AhoCorasick(["error", "timeout"]), bloom)
+
+    assert matcher.contains_many(["all good", "error", "disk error", "timeou"]).tolist() == [False, True, True, False]
+
+
+def test_compiled_aho_corasick_matches_pure_python() -> None:
+    pytest.importorskip("ahocorasick")
+    import random
+
+    from src.task_4 import AhoCorasick, CompiledAhoCorasick, make_automaton
+
+    rng = random.Random(11)
+    patterns = ["".join(rng.choices("abc", k=rng.randint(1, 5))) for _ in range(30)]
+    texts = ["".join(rng.choices("abcd", k=rng.randint(0, 12))) for _ in range(2000)]
+    compiled = make_automaton(patterns)
+
+    assert isinstance(compiled, CompiledAhoCorasick) and len(compiled) == len(set(patterns))
+    assert compiled.contains_many(texts).tolist() == AhoCorasick(patterns).contains_many(texts).tolist()
+    assert not CompiledAhoCorasick([]).search("abc")
+
+
+def test_task_4_substring_mode(tmp_path: pathlib.Path) -> None:
+    source = tmp_path / "src"
+    source.mkdir()
+    patterns = tmp_path / "patterns.txt"
+    patterns.write_text("Status Code: 5\ndb-primary.internal\n")
+    t0 = datetime.datetime(2025, 1, 1).timestamp()
+    messages = [
+        "HTTP Status Code: 503",
+        "timeout connecting to db-primary.internal:5432",
+        "HTTP Status Code: 200",
+        "Status Code: 5",
+    ]
+    with open(source / "b1.json", "w") as f:
+        json.dump([{"service": "s", "timestamp": t0, "message": m} for m in messages], f)
+
+    stop = threading.Event()
+    gen = compute(str(source), stop=stop, filter_file=str(patterns), match="substring", reload_interval=None)
+    assert next(gen).value == 0.75
+    stop.set()
@@ -0,0 +1,290 @@
+# tests/test_task_5.py
+import datetime
+import json
+import math
+import os
+import pathlib
+import random
+import re
+
+import pytest
+
+from src.task_5.main import (
+    process_data_chunked,
+    process_data_incremental,
+    process_data_lazy,
+)
+
+BASE = 1_760_000_000  # Múltiplo de 5 y 10: ventanas alineadas con la época
+
+
+def _write_files(folder: pathlib.Path) -> list[list[dict]]:
+    """Seis archivos con eventos desordenados, tardíos y sin código HTTP."""
+    rng = random.Random(5)
+    files = []
+    for i in range(6):
+        events = []
+        for _ in range(30):
+            # Cada archivo avanza ~10 s; algunos eventos llegan hasta 25 s tarde
+            t = BASE + 10 * i + rng.uniform(-25, 10)
+            message = rng.choice(["HTTP Status Code: 200", "HTTP Status Code: 503", "HTTP Status Code: 404", "sin código"])
+            events.append({"service": rng.choice(["auth", "billing"]), "timestamp": t, "message": message})
+        (folder / f"20251015_{i:06d}.json").write_text(json.dumps(events))
+        files.append(events)
+    return files
+
+
+def _spark_reference(files, window, slide, delay, max_files, mode):
+    """Semántica de `task_6.producer` en Python puro.
+
+    Cada evento cuenta en todas las ventanas `[s, s + window)` con `s`
+    múltiplo de `slide` que lo contienen. Los archivos se procesan en
+    disparadores de `max_files`; al terminar cada uno la marca de agua pasa a
+    ser el evento más reciente menos `delay`, y en los disparadores
+    siguientes se descartan las ventanas que terminan antes de ella. En modo
+    append solo se emiten las ventanas que terminan antes de la marca final.
+    """
+    state: dict[tuple[float, str], list[int]] = {}
+    newest = None
+    step = max_files or len(files)
+    for first in range(0, len(files), step):
+        watermark = newest - delay if delay is not None and newest is not None else None
+        for events in files[first:first + step]:
+            for event in events:
+                match = re.search(r"HTTP Status Code:\s*(\d+)", event["message"])
+                if not match:
+                    continue
+                t = event["timestamp"]
+                newest = t if newest is None else max(newest, t)
+                start = math.floor(t / slide) * slide
+                while start + window > t:
+                    if watermark is None or start + window > watermark:
+                        acc = state.setdefault((start, event["service"]), [0, 0])
+                        acc[0] += 1
+                        acc[1] += int(match.group(1)) < 400
+                    start -= slide
+    rows = sorted((start, start + window, service, *acc) for (start, service), acc in state.items())
+    if mode == "append":
+        rows = [row for row in rows if row[1] <= newest - delay]
+    return rows
+
+
+def _rows(df) -> list[tuple]:
+    starts = (df["window_start"].dt.epoch("us") / 1e6).to_list()
+    ends = (df["window_end"].dt.epoch("us") / 1e6).to_list()
+    for row in df.iter_rows(named=True):
+        assert row["success_rate"] == pytest.approx(row["successes"] / row["total"])
+    return [
+        (start, end, row["service"], row["total"], row["successes"])
+        for row, start, end in zip(df.iter_rows(named=True), starts, ends, strict=True)
+    ]
+
+
+@pytest.mark.parametrize(
+    "options, reference",
+    [
+        (dict(window_duration="10s", slide_duration="5s"), (10, 5, None, None, "complete")),
+        (dict(window_duration="10 seconds", slide_duration="10 seconds"), (10, 10, None, None, "complete")),
+        (
+            dict(window_duration="10s", slide_duration="5s", watermark="5s", max_files_per_trigger=2),
+            (10, 5, 5, 2, "append"),
+        ),
+        (
+            dict(window_duration="15s", slide_duration="10s", watermark="5 seconds", max_files_per_trigger=1),
+            (15, 10, 5, 1, "append"),
+        ),
+        (
+            dict(window_duration="10s", slide_duration="5s", watermark="5s", max_files_per_trigger=2, output_mode="complete"),
+            (10, 5, None, 2, "complete"),
+        ),
+    ],
+)
+def test_windows_match_spark_semantics(tmp_path: pathlib.Path, options: dict, reference: tuple) -> None:
+    files = _write_files(tmp_path)
+    expected = _spark_reference(files, *reference)
+    assert expected
+
+    result = process_data_lazy(str(tmp_path), **options).collect()
+    assert result.columns == ["window_start", "window_end", "service", "total", "successes", "success_rate"]
+    assert _rows(result) == expected
+
+
+def test_incremental_runs_continue_triggers(tmp_path: pathlib.Path) -> None:
+    """Dos ejecuciones incrementales equivalen a una completa con los mismos disparadores."""
+    source = tmp_path / "data"
+    source.mkdir()
+    files = _write_files(source)
+    options = dict(window_duration="10s", slide_duration="5s", watermark="5s", max_files_per_trigger=2)
+
+    later = sorted(source.iterdir())[4:]
+    for path in later:
+        path.rename(tmp_path / path.name)
+    process_data_incremental(str(source), str(tmp_path / "state"), **options)
+    for path in later:
+        (tmp_path / path.name).rename(path)
+    result = process_data_incremental(str(source), str(tmp_path / "state"), **options)
+
+    assert _rows(result) == _spark_reference(files, 10, 5, 5, 2, "append")
+    assert result.equals(process_data_lazy(str(source), **options).collect())
+
+    # Los nombres del generador se resumen en una marca de agua: el manifiesto no crece
+    manifest = json.loads((tmp_path / "state" / "manifest.json").read_text())
+    assert manifest["position"] == "20251015_000005.json" and manifest["files"] == []
+
+    with pytest.raises(ValueError):
+        process_data_incremental(str(source), str(tmp_path / "state"), since=datetime.datetime(2025, 10, 15), **options)
+
+
+def test_incremental_tracks_unsortable_names(tmp_path: pathlib.Path) -> None:
+    """Con nombres uuid se recuerda cada archivo: uno nuevo con nombre menor se incorpora."""
+    files = _write_files(tmp_path)
+    names = sorted(tmp_path.glob("*.json"))
+    uuids = ["c3d1", "f0a2", "a9b8", "e1e1", "b7c6", "d4d5"]
+    for path, prefix in zip(names, uuids, strict=True):
+        path.rename(tmp_path / f"{prefix}0000-1111-4222-8333-444455556666.json")
+    options = dict(window_duration="10s", slide_duration="5s")
+
+    late = [path for path in tmp_path.glob("*.json") if path.name.startswith(("a9b8", "b7c6"))]
+    for path in late:
+        path.rename(tmp_path / (path.name + ".pending"))
+    process_data_incremental(str(tmp_path), str(tmp_path / "state"), **options)
+    for path in late:
+        (tmp_path / (path.name + ".pending")).rename(path)
+    result = process_data_incremental(str(tmp_path), str(tmp_path / "state"), **options)
+
+    assert _rows(result) == _spark_reference(files, 10, 5, None, None, "complete")
+    manifest = json.loads((tmp_path / "state" / "manifest.json").read_text())
+    assert manifest["position"] is None and len(manifest["files"]) == 6
+
+
+def test_compacted_parquet_plus_json_tail(tmp_path: pathlib.Path) -> None:
+    """Compactar no cambia el resultado; lo nuevo se lee de la cola JSON."""
+    import polars as pl
+
+    from src.task_5.compact import compact
+
+    files = _write_files(tmp_path)
+    later = sorted(tmp_path.glob("*.json"))[4:]
+    for path in later:
+        path.rename(tmp_path / (path.name + ".pending"))
+    assert compact(str(tmp_path), min_age=0, delete=True) == 4
+    assert compact(str(tmp_path), min_age=0) == 0
+    for path in later:
+        (tmp_path / (path.name + ".pending")).rename(path)
+
+    parts = list((tmp_path / "_compacted").rglob("part-*.parquet"))
+    assert parts and all("date=" in str(p) and "hour=" in str(p) for p in parts)
+    schema = pl.read_parquet_schema(parts[0])
+    assert schema["service"] == pl.Categorical and schema["status"] == pl.Int16
+
+    options = dict(window_duration="10s", slide_duration="5s")
+    result = process_data_lazy(str(tmp_path), **options).collect()
+    assert _rows(result) == _spark_reference(files, 10, 5, None, None, "complete")
+
+    # Con `since` solo cuentan los eventos desde ese instante
+    since = datetime.datetime.fromtimestamp(BASE + 20, datetime.timezone.utc).replace(tzinfo=None)
+    recent = [[e for e in events if e["timestamp"] >= BASE + 20] for events in files]
+    result = process_data_lazy(str(tmp_path), since=since, **options).collect()
+    assert _rows(result) == _spark_reference(recent, 10, 5, None, None, "complete")
+
+
+def test_incremental_reads_compacted_files_once(tmp_path: pathlib.Path) -> None:
+    """Los archivos ya incorporados no se vuelven a contar al compactarse."""
+    from src.task_5.compact import compact
+
+    files = _write_files(tmp_path)
+    options = dict(window_duration="10s", slide_duration="5s")
+    later = sorted(tmp_path.glob("*.json"))[3:]
+    for path in later:
+        path.rename(tmp_path / (path.name + ".pending"))
+    process_data_incremental(str(tmp_path), str(tmp_path / "state"), **options)
+
+    for path in later[:2]:
+        (tmp_path / (path.name + ".pending")).rename(path)
+    compact(str(tmp_path), min_age=0, delete=True)
+    (tmp_path / (later[2].name + ".pending")).rename(later[2])
+    result = process_data_incremental(str(tmp_path), str(tmp_path / "state"), **options)
+
+    assert _rows(result) == _spark_reference(files, 10, 5, None, None, "complete")
+
+
+CHUNKED_OPTIONS = [
+    dict(window_duration="10s", slide_duration="5s"),
+    dict(window_duration="10s", slide_duration="5s", watermark="5s", max_files_per_trigger=2),
+    dict(window_duration="15s", slide_duration="10s", watermark="5s", max_files_per_trigger=1),
+    dict(window_duration="10s", slide_duration="5s", watermark="5s"),
+]
+
+
+@pytest.mark.parametrize("compacted", [None, slice(0, 3), slice(1, 5), slice(0, 6)])
+def test_compaction_keeps_triggers(tmp_path: pathlib.Path, compacted) -> None:
+    """Con marca de agua, compactar (todo o parte) no cambia los disparadores ni el resultado."""
+    from src.task_5.compact import compact
+
+    files = _write_files(tmp_path)
+    expected = [process_data_lazy(str(tmp_path), **options).collect() for options in CHUNKED_OPTIONS]
+    assert _rows(expected[1]) == _spark_reference(files, 10, 5, 5, 2, "append")
+    if compacted is not None:
+        # Los archivos fuera de `compacted` son demasiado recientes para compactarse
+        names = sorted(tmp_path.glob("*.json"))
+        for path in names[compacted]:
+            os.utime(path, (0, 0))
+        compact(str(tmp_path), min_age=60, delete=True)
+
+    for options, reference in zip(CHUNKED_OPTIONS, expected, strict=True):
+        assert process_data_lazy(str(tmp_path), **options).collect().equals(reference)
+        for budget in ["1", "40KB"]:
+            assert process_data_chunked(str(tmp_path), memory_budget=budget, **options).equals(reference)
+
+
+def test_compact_leaves_malformed_files_out(tmp_path: pathlib.Path) -> None:
+    """Un archivo ilegible no se compacta, no entra al manifiesto y no se borra."""
+    from src.task_5.compact import compact
+
+    _write_files(tmp_path)
+    broken = tmp_path / "20251015_000003.json"
+    broken.write_text('[{"service": "auth", "timestamp": ')
+
+    assert compact(str(tmp_path), min_age=0, delete=True) == 5
+    manifest = json.loads((tmp_path / "_compacted" / "_manifest.json").read_text())
+    assert manifest["position"] == "20251015_000005.json" and manifest["pending"] == [broken.name]
+    assert broken.exists()
+
+    # Reparado, se compacta en la siguiente ejecución y deja de estar pendiente
+    broken.write_text("[]")
+    assert compact(str(tmp_path), min_age=0, delete=True) == 1
+    manifest = json.loads((tmp_path / "_compacted" / "_manifest.json").read_text())
+    assert manifest["pending"] == [] and manifest["files"] == [] and not broken.exists()
+
+
+def test_compaction_manifest_does_not_list_covered_files(tmp_path: pathlib.Path, monkeypatch) -> None:
+    """El manifiesto no lista los archivos ya cubiertos por `position`, y el incremental solo lee lo nuevo."""
+    from src.task_5 import main
+    from src.task_5.compact import compact
+
+    files = _write_files(tmp_path)
+    later = sorted(tmp_path.glob("*.json"))[3:]
+    for path in later:
+        path.rename(tmp_path / (path.name + ".pending"))
+    compact(str(tmp_path), min_age=0, delete=True)
+    options = dict(window_duration="10s", slide_duration="5s")
+    process_data_incremental(str(tmp_path), str(tmp_path / "state"), **options)
+
+    for path in later:
+        (tmp_path / (path.name + ".pending")).rename(path)
+    compact(str(tmp_path), min_age=0, delete=True)
+    manifest = json.loads((tmp_path / "_compacted" / "_manifest.json").read_text())
+    assert manifest["generation"] == 2 and manifest["files"] == [] and manifest["pending"] == []
+    assert all(isinstance(part, str) for part in manifest["parts"])
+
+    read = []
+    original = main.compacted_sources
+
+    def spy(source_folder, manifest, after=0):
+        read.append(after)
+        return original(source_folder, manifest, after)
+
+    monkeypatch.setattr(main, "compacted_sources", spy)
+    result = process_data_incremental(str(tmp_path), str(tmp_path / "state"), **options)
+    assert read == [1]
+    assert _rows(result) == _spark_reference(files, 10, 5, None, None, "complete")
@@ -0,0 +1,80 @@
+import inspect
+import json
+import pathlib
+
+import pytest
+
+pytest.importorskip("pyspark")
+
+from src import task_6  # noqa: E402
+
+
+def test_output_mode_default_is_shared() -> None:
+    """`compute` y `producer` usan el mismo modo de salida por defecto."""
+    for function in (task_6.compute, task_6.producer):
+        assert inspect.signature(function).parameters["output_mode"].default == task_6.DEFAULT_OUTPUT_MODE
+
+
+@pytest.fixture(scope="module")
+def spark():
+    session = (
+        task_6.SparkSession.builder
+        .master("local[1]")
+        .appName("test_task_6")
+        .config("spark.sql.session.timeZone", "UTC")
+        .config("spark.sql.shuffle.partitions", "1")
+        .getOrCreate()
+    )
+    yield session
+    session.stop()
+
+
+@pytest.mark.parametrize("output_mode", task_6.OUTPUT_MODES)
+def test_producer_query_runs_in_each_output_mode(spark, tmp_path: pathlib.Path, output_mode: str) -> None:
+    """La consulta de `producer` arranca con el mismo `output_mode` en `writeStream`."""
+    source = tmp_path / "input"
+    source.mkdir()
+    events = [
+        {"service": "auth", "timestamp": 1_700_000_000 + i, "message": f"HTTP Status Code: {200 if i % 2 else 500}"}
+        for i in range(4)
+    ]
+    (source / "20251015_000000.json").write_text(json.dumps(events))
+
+    sdf = task_6.producer(
+        spark,
+        str(source),
+        window_duration="10 seconds",
+        slide_duration="10 seconds",
+        watermark="30 seconds",
+        max_files_per_trigger=1,
+        output_mode=output_mode,
+    )
+    rows = []
+    query = (
+        sdf.writeStream
+        .foreachBatch(lambda df, _: rows.extend(df.collect()))
+        .outputMode(output_mode)
+        .option("checkpointLocation", str(tmp_path / "checkpoint"))
+        .start()
+    )
+    try:
+        query.processAllAvailable()
+    finally:
+        query.stop()
+
+    if output_mode != "append":
+        # La marca de agua aún no cierra la ventana: en append no sale nada
+        assert [(r["total"], r["successes"]) for r in rows] == [(4, 2)]
+
+
+def test_producer_rejects_unknown_output_mode(spark, tmp_path: pathlib.Path) -> None:
+    with pytest.raises(ValueError):
+        task_6.producer(
+            spark,
+            str(tmp_path),
+            window_duration="10 seconds",
+            slide_duration=None,
+            watermark="30 seconds",
+            max_files_per_trigger=1,
+            output_mode="replace",
+        )
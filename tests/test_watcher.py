@@ -0,0 +1,156 @@
+import json
+import pathlib
+import threading
+
+import pytest
+
+from src.watcher import DirectoryWatcher, inotify_available
+
+BACKENDS = [
+    "poll",
+    pytest.param(
+        "inotify",
+        marks=pytest.mark.skipif(not inotify_available(), reason="inotify no disponible"),
+    ),
+]
+
+
+def _write(path: pathlib.Path, events: list[dict]) -> None:
+    with open(path, "w") as file:
+        json.dump(events, file)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watcher_emits_existing_then_new_files(tmp_path: pathlib.Path, backend: str) -> None:
+    """Los archivos existentes salen primero; luego solo los nuevos, sin repetir."""
+    _write(tmp_path / "b.json", [])
+    _write(tmp_path / "a.json", [])
+    (tmp_path / "notes.txt").write_text("ignorar")
+
+    stop = threading.Event()
+    batches = DirectoryWatcher(tmp_path, backend=backend, poll_interval=0.05).batches(stop)
+
+    first = next(batches)
+    assert [p.name for p in first] == ["a.json", "b.json"]
+
+    _write(tmp_path / "c.json", [])
+    second = next(batches)
+    assert [p.name for p in second] == ["c.json"]
+
+    stop.set()
+    assert list(batches) == []
+
+
+def test_watcher_rejects_unknown_backend(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(ValueError):
+        DirectoryWatcher(tmp_path, backend="kqueue")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watcher_archives_processed_files(tmp_path: pathlib.Path, backend: str) -> None:
+    """Al pedir el siguiente lote, el anterior se mueve a processed/YYYYMMDD/."""
+    _write(tmp_path / "20251015_214506_215493.json", [])
+
+    stop = threading.Event()
+    watcher = DirectoryWatcher(
+        tmp_path,
+        backend=backend,
+        poll_interval=0.05,
+        archive="processed",
+        partition_by_date=True,
+    )
+    batches = watcher.batches(stop)
+
+    assert [p.name for p in next(batches)] == ["20251015_214506_215493.json"]
+
+    _write(tmp_path / "20251015_214507_215976.json", [])
+    assert [p.name for p in next(batches)] == ["20251015_214507_215976.json"]
+
+    archived = tmp_path / "processed" / "20251015" / "20251015_214506_215493.json"
+    assert archived.is_file()
+    assert not (tmp_path / "20251015_214506_215493.json").exists()
+    stop.set()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watcher_defer_archive_waits_for_consumer(tmp_path: pathlib.Path, backend: str) -> None:
+    """Con `defer_archive` el lote queda en su sitio, sin repetirse, hasta `archive_files`."""
+    _write(tmp_path / "a.json", [])
+
+    stop = threading.Event()
+    watcher = DirectoryWatcher(
+        tmp_path, backend=backend, poll_interval=0.05, archive="processed", defer_archive=True
+    )
+    batches = watcher.batches(stop)
+
+    first = next(batches)
+    _write(tmp_path / "b.json", [])
+    assert [p.name for p in next(batches)] == ["b.json"]
+    assert (tmp_path / "a.json").exists()
+
+    watcher.archive_files(first)
+    assert not (tmp_path / "a.json").exists()
+    assert (tmp_path / "processed" / "a.json").exists()
+    stop.set()
+    assert list(batches) == []
+
+
+def test_watcher_high_water_mark(tmp_path: pathlib.Path) -> None:
+    """Con marca de agua se ignoran los nombres ya superados, sin recordarlos."""
+    for name in ["20251015_214506_0.json", "20251015_214507_0.json", "20251015_214508_0.json"]:
+        _write(tmp_path / name, [])
+
+    stop = threading.Event()
+    watcher = DirectoryWatcher(
+        tmp_path,
+        backend="poll",
+        poll_interval=0.05,
+        high_water_mark=True,
+        start_after="20251015_214506_0.json",
+    )
+    batches = watcher.batches(stop)
+
+    assert [p.name for p in next(batches)] == ["20251015_214507_0.json", "20251015_214508_0.json"]
+    assert watcher.position == "20251015_214508_0.json"
+
+    _write(tmp_path / "20251015_214509_0.json", [])
+    assert [p.name for p in next(batches)] == ["20251015_214509_0.json"]
+    assert watcher.position == "20251015_214509_0.json"
+    stop.set()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watcher_high_water_mark_filters_new_files(tmp_path: pathlib.Path, backend: str) -> None:
+    """Los dos backends ignoran los archivos nuevos con nombre menor o igual a la posición."""
+    _write(tmp_path / "20251015_214507_0.json", [])
+
+    stop = threading.Event()
+    watcher = DirectoryWatcher(tmp_path, backend=backend, poll_interval=0.05, high_water_mark=True)
+    batches = watcher.batches(stop)
+    assert [p.name for p in next(batches)] == ["20251015_214507_0.json"]
+
+    _write(tmp_path / "20251015_214506_0.json", [])
+    _write(tmp_path / "20251015_214508_0.json", [])
+    assert [p.name for p in next(batches)] == ["20251015_214508_0.json"]
+    assert watcher.position == "20251015_214508_0.json"
+    stop.set()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watcher_does_not_repeat_file_written_during_startup(tmp_path: pathlib.Path, backend: str) -> None:
+    """Un archivo abierto durante el escaneo inicial no se emite otra vez al cerrarse."""
+    pending = open(tmp_path / "a.json", "w")
+    pending.write("[")
+
+    stop = threading.Event()
+    batches = DirectoryWatcher(tmp_path, backend=backend, poll_interval=0.05).batches(stop)
+    assert [p.name for p in next(batches)] == ["a.json"]
+
+    _write(tmp_path / "b.json", [])
+    assert [p.name for p in next(batches)] == ["b.json"]
+
+    pending.write("]")
+    pending.close()
+    _write(tmp_path / "c.json", [])
+    assert [p.name for p in next(batches)] == ["c.json"]
+    stop.set()